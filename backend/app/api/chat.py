@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.models.schemas import ChatRequest, ChatResponse
 from app.core.conversation_manager import ConversationManager, ConversationStep
 import uuid
@@ -6,6 +6,15 @@ import uuid
 router = APIRouter()
 conversation_manager = ConversationManager()
 
+
+@router.on_event("shutdown")
+async def close_session_store():
+    """Flush the session journal / release store and database connections"""
+    await conversation_manager.active_conversations.close()
+    await conversation_manager.verification_engine.close()
+    await conversation_manager.attempt_limiter.close()
+    await conversation_manager.extractor.close()
+
 @router.post("/chat/start")
 async def start_conversation():
     """Start a new conversation"""
@@ -23,12 +32,13 @@ async def start_conversation():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat/message")
-async def send_message(message: ChatRequest):
+async def send_message(message: ChatRequest, request: Request):
     """Send a message and get response"""
     try:
         response = await conversation_manager.process_message(
             session_id=message.session_id,
-            user_message=message.message
+            user_message=message.message,
+            client_ip=request.client.host if request.client else None
         )
         
         return {
@@ -36,7 +46,9 @@ async def send_message(message: ChatRequest):
             "current_step": response.current_step.value,
             "slots_needed": response.slots_needed or [],
             "verification_status": response.verification_status,
-            "escalate": response.escalate or False
+            "escalate": response.escalate or False,
+            "auto_follow_up": response.auto_follow_up,
+            "follow_up_delay": response.follow_up_delay
         }
         
     except Exception as e:
@@ -47,8 +59,8 @@ async def send_message(message: ChatRequest):
 async def get_session_status(session_id: str):
     """Get current session status"""
     try: 
-        if session_id in conversation_manager.active_conversations:
-            state = conversation_manager.active_conversations[session_id]
+        state = await conversation_manager.active_conversations.peek(session_id)
+        if state is not None:
             return {
                 "session_id": session_id,
                 "current_step": state.current_step.value,
@@ -68,12 +80,26 @@ async def get_session_status(session_id: str):
         print(f"Error in get_session_status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/chat/session/{session_id}/follow-ups")
+async def get_follow_ups(session_id: str):
+    """Collect follow-up messages the server scheduled for this session"""
+    state = await conversation_manager.active_conversations.peek(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {
+        "session_id": session_id,
+        "messages": await conversation_manager.pop_follow_ups(session_id),
+        "current_step": state.current_step.value
+    }
+
 @router.delete("/chat/session/{session_id}")
 async def end_conversation(session_id: str):
     """End a conversation and clean up session"""
     try:
-        if session_id in conversation_manager.active_conversations:
-            del conversation_manager.active_conversations[session_id]
+        conversation_manager.verification_engine.customers.forget(session_id)
+        await conversation_manager.verification_engine.sms_codes.discard(session_id)
+        if await conversation_manager.active_conversations.delete(session_id):
             return {"message": "Session ended successfully"}
         else:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -82,12 +108,41 @@ async def end_conversation(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/chat/metrics")
+async def get_metrics():
+    """Session store and scheduler gauges"""
+    return {
+        "sessions": await conversation_manager.active_conversations.stats(),
+        "session_locks": conversation_manager.session_locks.stats(),
+        "attempt_limiter": await conversation_manager.attempt_limiter.stats(),
+        "extraction": conversation_manager.extractor.stats(),
+        "customer_cache": conversation_manager.verification_engine.customers.stats(),
+        "customer_records": conversation_manager.verification_engine.customer_records.stats(),
+        "customer_db_pool": conversation_manager.verification_engine.customer_db.pool.stats(),
+        "sms_codes": conversation_manager.verification_engine.sms_codes.stats(),
+        "sms_outbox": (conversation_manager.verification_engine.sms_outbox.stats()
+                       if conversation_manager.verification_engine.sms_enabled else None),
+        "scheduled_timers": len(conversation_manager.scheduler)
+    }
+
+
+@router.get("/chat/flow")
+async def get_conversation_flow():
+    """Conversation state machine as a graph (step -> handler and allowed next steps)"""
+    return {
+        "start": ConversationStep.GREETING.value,
+        "steps": conversation_manager.state_machine.graph(),
+        "unreachable": conversation_manager.state_machine.unreachable()
+    }
+
+
 # Add this to your chat.py router
 @router.post("/chat/debug/skip-to-vbt")
 async def skip_to_vbt(session_id: str):
     """Debug endpoint - skip directly to VBT for testing"""
     try:
-        if session_id not in conversation_manager.active_conversations:
+        state = await conversation_manager.active_conversations.get(session_id)
+        if state is None:
             # Create a mock conversation state
             from app.models.schemas import ConversationState, ConversationStep
             state = ConversationState(
@@ -102,10 +157,9 @@ async def skip_to_vbt(session_id: str):
             state.home_number_confirmed = True
             state.sms_code_sent = True
             
-            conversation_manager.active_conversations[session_id] = state
+            await conversation_manager.active_conversations.put(state)
         else:
             # Update existing conversation
-            state = conversation_manager.active_conversations[session_id]
             state.current_step = ConversationStep.VBT_CODE_CHECK
             state.customer_name = state.customer_name or "John Smith"
             state.dob_verified = True
@@ -113,9 +167,12 @@ async def skip_to_vbt(session_id: str):
             state.email_verified = True
             state.home_number_confirmed = True
             state.sms_code_sent = True
+            await conversation_manager.active_conversations.put(state)
         
         # Get mobile number and send VBT message
-        mobile_number = await conversation_manager.verification_engine.get_customer_mobile_number(state.customer_name)
+        mobile_number = await conversation_manager.verification_engine.get_customer_mobile_number(state.customer_name, session_id)
+        if not await conversation_manager.verification_engine.send_sms_code(session_id, mobile_number):
+            raise HTTPException(status_code=503, detail="No SMS gateway configured (SMS_GATEWAY)")
         
         mobile_confirmation = f"I see your mobile number is {mobile_number}. "
         vbt_initiate_response = conversation_manager.script_manager.get_script_response("vbt_initiate")
@@ -130,6 +187,8 @@ async def skip_to_vbt(session_id: str):
             "message": "Skipped to VBT for testing"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in skip_to_vbt: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,191 @@
+"""
+Token-bucket limits on verification guesses, shared across sessions.
+
+``verification_attempts`` on a session resets with every new session, so it
+cannot stop someone from opening session after session to keep guessing a
+customer's DOB or SSN. These buckets are keyed by who is being guessed at
+(the customer record's id) and who is guessing (the client IP) instead:
+
+- a lookup is only made while every key involved still has a token
+- each failed verification takes a token from every key
+- tokens come back at a steady rate up to the bucket's capacity
+
+Checks are O(1). A bucket that has refilled completely holds no information,
+so it is dropped: memory follows the keys with recent failures, not every
+customer or address ever seen. ``RedisAttemptLimiter`` keeps the buckets in
+the Redis the session store uses, so every worker enforces the same limits.
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+# (kind, value), e.g. ("customer", "42") or ("ip", "203.0.113.7")
+Key = Tuple[str, str]
+
+
+class Bucket(NamedTuple):
+    capacity: int
+    refill_interval: float  # Seconds for one token to come back
+
+    @property
+    def refill_time(self) -> float:
+        """Seconds after which an emptied bucket is full again"""
+        return self.capacity * self.refill_interval
+
+
+DEFAULT_BUCKETS: Dict[str, Bucket] = {
+    "customer": Bucket(capacity=5, refill_interval=180.0),
+    # Higher: many customers can share an address behind a NAT
+    "ip": Bucket(capacity=20, refill_interval=45.0),
+}
+
+
+class AttemptsExhausted(Exception):
+    def __init__(self, keys: Sequence[Key]):
+        super().__init__(f"verification attempts exhausted for {', '.join(kind for kind, _ in keys)}")
+        self.keys = keys
+
+
+class AttemptLimiter(ABC):
+    def __init__(self, buckets: Optional[Dict[str, Bucket]] = None):
+        self.buckets = dict(DEFAULT_BUCKETS if buckets is None else buckets)
+        self._denied = 0
+        self._failures = 0
+
+    @abstractmethod
+    async def allowed(self, keys: Sequence[Key]) -> bool:
+        """True while every key has a token left"""
+
+    @abstractmethod
+    async def spend(self, keys: Sequence[Key]):
+        """Take one token from every key (a failed verification)"""
+
+    async def check(self, keys: Sequence[Key]):
+        """Raise ``AttemptsExhausted`` unless every key has a token left"""
+        if not await self.allowed(keys):
+            self._denied += 1
+            raise AttemptsExhausted(keys)
+
+    async def close(self):
+        pass
+
+    async def stats(self) -> Dict[str, int]:
+        return {"denied": self._denied, "failures": self._failures}
+
+
+class InMemoryAttemptLimiter(AttemptLimiter):
+    """Buckets for a single process"""
+
+    def __init__(self, buckets: Optional[Dict[str, Bucket]] = None, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(buckets)
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> (tokens, updated_at), least recently updated first
+        self._levels: "OrderedDict[Key, Tuple[float, float]]" = OrderedDict()
+        self._longest_refill = max(bucket.refill_time for bucket in self.buckets.values())
+
+    def _tokens(self, key: Key, now: float) -> float:
+        entry = self._levels.get(key)
+        bucket = self.buckets[key[0]]
+        if entry is None:
+            return bucket.capacity
+        tokens, updated_at = entry
+        return min(bucket.capacity, tokens + (now - updated_at) / bucket.refill_interval)
+
+    async def allowed(self, keys: Sequence[Key]) -> bool:
+        now = self.clock()
+        return all(self._tokens(key, now) >= 1 for key in keys)
+
+    async def spend(self, keys: Sequence[Key]):
+        now = self.clock()
+        for key in keys:
+            self._levels[key] = (max(0.0, self._tokens(key, now) - 1), now)
+            self._levels.move_to_end(key)
+        self._failures += 1
+        self._sweep(now)
+
+    def _sweep(self, now: float):
+        # Oldest updates first: once the front is surely full again, drop it and look at the next
+        while self._levels:
+            key, (_, updated_at) = next(iter(self._levels.items()))
+            if now - updated_at < self._longest_refill and len(self._levels) <= self.max_keys:
+                break
+            self._levels.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    async def stats(self) -> Dict[str, int]:
+        return {"tracked_keys": len(self._levels), **await super().stats()}
+
+
+class RedisAttemptLimiter(AttemptLimiter):
+    """Buckets shared by every worker: one Redis string per key that expires once it is full again"""
+
+    MAX_WRITE_ATTEMPTS = 5
+
+    def __init__(self, url: str = "redis://localhost:6379/0", buckets: Optional[Dict[str, Bucket]] = None,
+                 key_prefix: str = "attempts:", clock: Callable[[], float] = time.time):
+        import redis.asyncio as redis  # Only needed when this backend is selected
+
+        super().__init__(buckets)
+        self.redis = redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.key_prefix = key_prefix
+        # Wall clock: the stored timestamps are compared across workers
+        self.clock = clock
+
+    def _key(self, key: Key) -> str:
+        return f"{self.key_prefix}{key[0]}:{key[1]}"
+
+    def _tokens(self, key: Key, payload: Optional[bytes], now: float) -> float:
+        bucket = self.buckets[key[0]]
+        if payload is None:
+            return bucket.capacity
+        tokens, updated_at = (float(part) for part in payload.split(b"|"))
+        return min(bucket.capacity, tokens + (now - updated_at) / bucket.refill_interval)
+
+    async def allowed(self, keys: Sequence[Key]) -> bool:
+        now = self.clock()
+        for key in keys:
+            if self._tokens(key, await self.redis.get(self._key(key)), now) < 1:
+                return False
+        return True
+
+    async def spend(self, keys: Sequence[Key]):
+        for key in keys:
+            await self._spend_one(key)
+        self._failures += 1
+
+    async def _spend_one(self, key: Key):
+        name = self._key(key)
+        expire_ms = max(1, int(self.buckets[key[0]].refill_time * 1000))
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for _ in range(self.MAX_WRITE_ATTEMPTS):
+                try:
+                    await pipe.watch(name)
+                    now = self.clock()
+                    tokens = max(0.0, self._tokens(key, await pipe.get(name), now) - 1)
+                    pipe.multi()
+                    pipe.set(name, f"{tokens}|{now}", px=expire_ms)
+                    await pipe.execute()
+                    return
+                except self._watch_error:
+                    continue  # Another worker spent from this bucket meanwhile: recompute
+                finally:
+                    await pipe.reset()
+        print(f"⚠️ Could not record a failed attempt for {name} after {self.MAX_WRITE_ATTEMPTS} tries")
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_attempt_limiter() -> AttemptLimiter:
+    """Shared through Redis when the session store is (``SESSION_STORE_URL``), else per process"""
+    url = os.environ.get("SESSION_STORE_URL")
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisAttemptLimiter(url)
+    return InMemoryAttemptLimiter()
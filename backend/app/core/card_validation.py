@@ -0,0 +1,138 @@
+"""
+Debit card number validation.
+
+A card passes when it is 16 digits, has a valid Luhn check digit and its BIN
+(leading digits) is not known to belong to a credit or prepaid range. Cards
+whose BIN is not in the table are accepted: the table only lets us turn away
+cards we know are not debit cards. Without a table (``CARD_BIN_RANGES_PATH``
+unset) every BIN is unknown and only the format and Luhn checks apply; the
+bundled ``bin_ranges.csv`` is sample data for development and tests.
+
+``BinIndex`` holds the issuer ranges as sorted, non-overlapping intervals over
+8-digit prefixes, so a lookup is one ``bisect``. ``validate_batch`` applies
+the same rules to an array of stored card numbers with NumPy.
+"""
+import csv
+import os
+from bisect import bisect_right
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+import numpy as np
+
+CARD_LENGTH = 16
+PREFIX_DIGITS = 8
+DEBIT = "debit"
+
+SAMPLE_BIN_RANGES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "bin_ranges.csv")
+
+# Luhn: what a digit in a doubled position adds, indexed by its byte value ('0' is 48)
+_DOUBLED = bytes(2 * (c - 48) - 9 * (c >= 53) if 48 <= c <= 57 else 0 for c in range(256))
+
+
+def luhn_valid(number: str) -> bool:
+    """Luhn check on a string of ASCII digits"""
+    digits = number.encode()
+    plain = digits[-1::-2]
+    doubled = digits[-2::-2]
+    total = sum(plain) - 48 * len(plain) + sum(_DOUBLED[c] for c in doubled)
+    return total % 10 == 0
+
+
+class BinRange(NamedTuple):
+    low: int  # 8-digit prefix, inclusive
+    high: int
+    network: str
+    card_type: str
+    issuer: str
+
+
+def _prefix_bound(prefix: str, fill: str) -> int:
+    if not prefix.isdigit() or len(prefix) > PREFIX_DIGITS:
+        raise ValueError(f"invalid BIN prefix {prefix!r}")
+    return int(prefix.ljust(PREFIX_DIGITS, fill))
+
+
+class BinIndex:
+    def __init__(self, ranges: Iterable[BinRange]):
+        self.ranges: List[BinRange] = sorted(ranges)
+        for previous, current in zip(self.ranges, self.ranges[1:]):
+            if current.low <= previous.high:
+                raise ValueError(f"BIN ranges overlap: {previous.issuer} and {current.issuer}")
+        self.lows = [entry.low for entry in self.ranges]
+        # Parallel arrays for validate_batch
+        self.low_array = np.array(self.lows, dtype=np.int64)
+        self.high_array = np.array([entry.high for entry in self.ranges], dtype=np.int64)
+
+    @classmethod
+    def load(cls, path: str = SAMPLE_BIN_RANGES_PATH) -> "BinIndex":
+        """Read ``low,high,network,card_type,issuer`` rows; ``#`` lines are comments"""
+        with open(path, newline="") as source:
+            rows = csv.DictReader(line for line in source if not line.startswith("#"))
+            return cls(BinRange(_prefix_bound(row["low"], "0"), _prefix_bound(row["high"], "9"),
+                                row["network"], row["card_type"], row["issuer"]) for row in rows)
+
+    def lookup(self, card_number: str) -> Optional[BinRange]:
+        prefix = int(card_number[:PREFIX_DIGITS].ljust(PREFIX_DIGITS, "0"))
+        position = bisect_right(self.lows, prefix) - 1
+        if position >= 0 and prefix <= self.ranges[position].high:
+            return self.ranges[position]
+        return None
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+
+class CardCheck(NamedTuple):
+    valid: bool
+    reason: Optional[str] = None  # "format", "checksum" or "not_debit"
+    bin_range: Optional[BinRange] = None
+
+
+class CardValidator:
+    def __init__(self, bins: BinIndex):
+        self.bins = bins
+
+    def check(self, card_number: str) -> CardCheck:
+        if len(card_number) != CARD_LENGTH or not card_number.isascii() or not card_number.isdigit():
+            return CardCheck(False, "format")
+        if not luhn_valid(card_number):
+            return CardCheck(False, "checksum")
+        bin_range = self.bins.lookup(card_number)
+        if bin_range is not None and bin_range.card_type != DEBIT:
+            return CardCheck(False, "not_debit", bin_range)
+        return CardCheck(True, None, bin_range)
+
+    def validate_batch(self, card_numbers: Sequence[str]) -> "CardBatch":
+        """Check many stored card numbers at once (same rules as ``check``)"""
+        # One extra character so longer numbers show up as the wrong length rather than truncated
+        text = np.array(card_numbers, dtype=f"U{CARD_LENGTH + 1}")
+        codes = text.view(np.uint32).reshape(len(text), CARD_LENGTH + 1)[:, :CARD_LENGTH].astype(np.int64)
+        well_formed = (np.char.str_len(text) == CARD_LENGTH) & ((codes >= 48) & (codes <= 57)).all(axis=1)
+        digits = np.where(well_formed[:, None], codes - 48, 0)
+
+        doubled = digits[:, -2::-2] * 2
+        totals = digits[:, -1::-2].sum(axis=1) + (doubled - 9 * (doubled > 9)).sum(axis=1)
+        checksum_ok = well_formed & (totals % 10 == 0)
+
+        prefixes = digits[:, :PREFIX_DIGITS] @ (10 ** np.arange(PREFIX_DIGITS - 1, -1, -1, dtype=np.int64))
+        position = np.searchsorted(self.bins.low_array, prefixes, side="right") - 1
+        highs = np.append(self.bins.high_array, -1)  # Position -1 (below every range) matches nothing
+        found = prefixes <= highs[position]
+        debit_types = np.array([entry.card_type == DEBIT for entry in self.bins.ranges] + [True])
+        is_debit = debit_types[np.where(found, position, -1)]  # Unknown BINs count as debit
+        return CardBatch(checksum_ok & is_debit, well_formed, checksum_ok, np.where(found, position, -1))
+
+
+class CardBatch(NamedTuple):
+    valid: np.ndarray
+    well_formed: np.ndarray
+    checksum_ok: np.ndarray
+    bin_position: np.ndarray  # Index into ``BinIndex.ranges``, -1 when the BIN is unknown
+
+
+def create_card_validator() -> CardValidator:
+    """BIN table from ``CARD_BIN_RANGES_PATH``; without one, no BIN checks (Luhn only)"""
+    path = os.environ.get("CARD_BIN_RANGES_PATH")
+    if not path:
+        print("⚠️ CARD_BIN_RANGES_PATH is not set: card BINs are not checked, credit cards will be accepted")
+        return CardValidator(BinIndex([]))
+    return CardValidator(BinIndex.load(path))
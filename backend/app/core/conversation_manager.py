@@ -1,16 +1,65 @@
 import asyncio
-from typing import Optional, Dict, Any
+import contextlib
+from typing import Optional, Dict, Any, List
 from app.models.schemas import *
 from app.core.script_manager import ScriptManager
-from app.core.verification_engine import VerificationEngine
+from app.core.verification_engine import VerificationEngine, VerificationUnavailable
 from app.core.azure_ai_client import AzureAIClient
+from app.core.extraction import TieredExtractor, create_llm_extractor
+from app.core.turn_context import TurnContext
+from app.core.state_machine import StateMachine
+from app.core.scheduler import TimingWheel
+from app.core.session_store import SessionStore, SessionConflict, create_session_store
+from app.core.session_locks import SessionLocks
+from app.core import risk
+from app.core.sms_codes import CodeCheck
+from app.core.attempt_limiter import AttemptLimiter, AttemptsExhausted, Key, create_attempt_limiter
 
 class ConversationManager:
-    def __init__(self):
+    # Steps that only collect one slot; skipped when the customer already gave it
+    SLOT_STEPS = {
+        ConversationStep.ASK_NAME: 'full_name',
+        ConversationStep.ASK_DOB: 'dob',
+        ConversationStep.ASK_SSN: 'ssn_last4',
+        ConversationStep.ASK_EMAIL: 'email',
+        ConversationStep.VBT_CODE_INPUT: 'sms_code',
+    }
+
+    # Lookups that verify a slot against the customer record: engine method, the slots it takes
+    # and the step that asks for them. They are independent, so when one message carries
+    # several they run concurrently.
+    VERIFICATIONS = {
+        'dob': ('verify_dob', ('dob',), ConversationStep.ASK_DOB),
+        'ssn': ('verify_ssn', ('ssn_last4',), ConversationStep.ASK_SSN),
+        'bank_account': ('verify_bank_account', ('bank_account', 'bank_routing'), ConversationStep.BANK_ACCOUNT_INFO),
+    }
+    # Upper bound on one turn's verification fan-out
+    VERIFY_DEADLINE = 3.0
+
+    VBT_WAIT_SECONDS = 5.0
+    # Steps that wait on the text with the customer's code
+    SMS_WAIT_STEPS = frozenset((ConversationStep.VBT_CODE_CHECK, ConversationStep.VBT_WAIT_RETRY,
+                                ConversationStep.VBT_CODE_INPUT))
+    # How often a turn is replayed on fresh state when another worker saved the session first
+    MAX_SAVE_ATTEMPTS = 3
+
+    def __init__(self, session_store: Optional[SessionStore] = None,
+                 attempt_limiter: Optional[AttemptLimiter] = None,
+                 verification_engine: Optional[VerificationEngine] = None):
+        self.scheduler = TimingWheel()
         self.script_manager = ScriptManager()
-        self.verification_engine = VerificationEngine()
+        self.verification_engine = (
+            verification_engine if verification_engine is not None else VerificationEngine())
         self.ai_client = AzureAIClient()
-        self.active_conversations: Dict[str, ConversationState] = {}
+        # Rules first; the LLM (when configured) only for the slots they miss
+        self.extractor = TieredExtractor(self.ai_client, create_llm_extractor())
+        self.state_machine = StateMachine(self)
+        self.active_conversations: SessionStore = (
+            session_store if session_store is not None else create_session_store())
+        self.session_locks = SessionLocks()
+        # Failed verifications per customer and per client, across sessions
+        self.attempt_limiter = attempt_limiter if attempt_limiter is not None else create_attempt_limiter()
+        self._background_tasks = set()
     
     async def start_conversation(self, session_id: str) -> str:
         """Initialize a new conversation"""
@@ -19,13 +68,20 @@ class ConversationManager:
             current_step=ConversationStep.GREETING
         )
         
-        self.active_conversations[session_id] = state
+        risk.update(state)  # Starts the reply clock
+        await self.active_conversations.put(state)
         
         return self.script_manager.get_script_response(ConversationStep.GREETING)
     
-    async def process_message(self, session_id: str, user_message: str) -> ChatResponse:
+    async def process_message(self, session_id: str, user_message: str,
+                              client_ip: Optional[str] = None) -> ChatResponse:
         """Process user message and return appropriate response"""
+        # One turn at a time per conversation, in the order messages arrived
+        async with self.session_locks.hold(session_id):
+            return await self._process_message(session_id, user_message, client_ip)
     
+    async def _process_message(self, session_id: str, user_message: str,
+                               client_ip: Optional[str] = None) -> ChatResponse:
         # Debug shortcuts for testing
         if user_message.lower().strip() == "skip to vbt":
             return await self._debug_skip_to_vbt(session_id)
@@ -33,41 +89,150 @@ class ConversationManager:
             return await self._debug_skip_to_bank(session_id)
         
         # Continue with normal processing...
-        if session_id not in self.active_conversations:
-            return ChatResponse(
-                response="Session not found. Please start a new conversation.",
-                current_step=ConversationStep.GREETING
-            )
+        turn = TurnContext(self.ai_client, user_message, client_ip, self.extractor)
+        for attempt in range(1, self.MAX_SAVE_ATTEMPTS + 1):
+            turn.replay()
+            state = await self.active_conversations.get(session_id)
+            if state is None:
+                return ChatResponse(
+                    response="Session not found. Please start a new conversation.",
+                    current_step=ConversationStep.GREETING
+                )
+            
+            next_response = await self._run_turn(state, turn)
+            try:
+                await self.active_conversations.put(state)
+                break
+            except SessionConflict:
+                # Another worker saved this session mid-turn; replay on its state.
+                # The turn context keeps extraction results and checks, so no extra
+                # AI calls, lookups or spent attempts; texts and timers wait for the save.
+                print(f"🔁 Session {session_id} changed concurrently (attempt {attempt})")
+        else:
+            raise SessionConflict(session_id)
+        await turn.saved()
         
-        state = self.active_conversations[session_id]
+        timings = {name: round(seconds * 1000, 2) for name, seconds in turn.timings.items()}
+        print(f"⏱️ Turn took {turn.elapsed * 1000:.1f}ms: {timings}")
+        return next_response
+    
+    async def _run_turn(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Apply one customer message to ``state`` in place"""
+        try:
+            next_response = await self._respond(state, turn)
+        except AttemptsExhausted as e:
+            print(f"🚫 Session {state.session_id}: {e}")
+            next_response = await self._handle_max_attempts_reached(state)
+        except VerificationUnavailable as e:
+            print(f"⚠️ Session {state.session_id}: {e}")
+            next_response = self._records_unavailable(state)
+        
+        risk.update(state)
+        return next_response
+    
+    async def _respond(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        # The text this step is waiting on could not be sent after all (see ``_send_sms_code``)
+        if state.current_step in self.SMS_WAIT_STEPS and 'sms_unavailable' in state.escalation_flags:
+            return self._sms_unavailable(state)
         
         # Extract information using Azure AI
-        extracted_info = await self.ai_client.extract_information(
-            user_message, state.current_step
-        )
+        extracted_info = await turn.extract(state.current_step)
         
         # Update conversation state with extracted information
         self._update_state_with_extracted_info(state, extracted_info)
         
+        # Several verifiable slots in one message: look them all up at once. The handlers
+        # below then read the results, so the turn waits for the slowest lookup only.
+        checks = self._pending_verifications(state, turn, extracted_info)
+        if len(checks) > 1:
+            try:
+                await turn.verify_all(checks, self.VERIFY_DEADLINE)
+            except asyncio.TimeoutError:
+                print(f"⏳ Verification for {state.session_id} missed the {self.VERIFY_DEADLINE}s deadline")
+                return self._records_unavailable(state)
+        
         # Determine next step and response
-        next_response = await self._determine_next_response(state, user_message)
+        visited = {state.current_step}
+        next_response = await self._determine_next_response(state, turn)
+        
+        # Fast-forward over collection steps whose slot already arrived in this message.
+        # Never back into a step already handled this turn (one that did not advance).
+        while (state.current_step not in visited
+               and self.SLOT_STEPS.get(state.current_step) in extracted_info):
+            visited.add(state.current_step)
+            turn.seed(state.current_step, extracted_info)
+            next_response = await self._determine_next_response(state, turn)
         
         return next_response
     
+    async def pop_follow_ups(self, session_id: str) -> List[str]:
+        """Return and clear follow-up messages delivered by the scheduler"""
+        async with self.session_locks.hold(session_id):
+            return await self._pop_follow_ups(session_id)
+    
+    async def _pop_follow_ups(self, session_id: str) -> List[str]:
+        for _ in range(self.MAX_SAVE_ATTEMPTS):
+            state = await self.active_conversations.get(session_id)
+            if state is None or not state.pending_follow_ups:
+                return []
+            messages, state.pending_follow_ups = state.pending_follow_ups, []
+            try:
+                await self.active_conversations.put(state)
+                return messages
+            except SessionConflict:
+                continue
+        return []
+    
+    def _schedule_follow_up(self, state: ConversationState, turn: TurnContext, script_key: str, delay: float):
+        """Queue a prompt for delivery after ``delay`` unless the customer has moved on by then"""
+        session_id, step = state.session_id, state.current_step
+        
+        def deliver():
+            # Timer callbacks are synchronous; the store may not be
+            self._in_background(self._deliver_follow_up(session_id, step, script_key))
+        
+        # Set once the turn is saved, so a replayed turn leaves one timer
+        turn.after_save(lambda: self.scheduler.schedule(delay, deliver))
+    
+    def _in_background(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _deliver_follow_up(self, session_id: str, step: ConversationStep, script_key: str):
+        message = self.script_manager.get_script_response(script_key)
+        async with self.session_locks.hold(session_id):
+            for _ in range(self.MAX_SAVE_ATTEMPTS):
+                # peek: a timer firing is not customer activity and must not refresh the idle TTL
+                state = await self.active_conversations.peek(session_id)
+                if state is None or state.current_step != step or message in state.pending_follow_ups:
+                    return
+                state.pending_follow_ups.append(message)
+                try:
+                    await self.active_conversations.put(state, touch=False)
+                    return
+                except SessionConflict:
+                    continue
+    
     async def _debug_skip_to_vbt(self, session_id: str) -> ChatResponse:
         """Debug method to skip directly to VBT"""
-        if session_id not in self.active_conversations:
+        state = await self.active_conversations.get(session_id)
+        if state is None:
             return ChatResponse(response="Session not found", current_step=ConversationStep.GREETING)
         
-        state = self.active_conversations[session_id]
         state.current_step = ConversationStep.VBT_CODE_CHECK
         state.customer_name = state.customer_name or "John Smith"
         state.dob_verified = True
         state.ssn_verified = True
         state.email_verified = True
         state.sms_code_sent = True
+        await self.active_conversations.put(state)
         
-        mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name)
+        mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name, state.session_id)
+        if not await self._send_sms_code(state, None, mobile_number):
+            response = self._sms_unavailable(state)
+            await self.active_conversations.put(state)
+            return response
         
         mobile_confirmation = f"I see your mobile number is {mobile_number}. "
         vbt_initiate_response = self.script_manager.get_script_response("vbt_initiate")
@@ -80,6 +245,111 @@ class ConversationManager:
             current_step=state.current_step
         )
 
+    async def _debug_skip_to_bank(self, session_id: str) -> ChatResponse:
+        """Debug method to skip directly to bank account verification"""
+        state = await self.active_conversations.get(session_id)
+        if state is None:
+            return ChatResponse(response="Session not found", current_step=ConversationStep.GREETING)
+        
+        state.current_step = ConversationStep.BANK_ACCOUNT_INFO
+        state.customer_name = state.customer_name or "John Smith"
+        state.dob_verified = True
+        state.ssn_verified = True
+        state.email_verified = True
+        state.sms_code_sent = True
+        state.slots_filled.setdefault('military_status', False)
+        await self.active_conversations.put(state)
+        
+        account_ending = await self.verification_engine.get_customer_account_ending(state.customer_name, state.session_id)
+        response = self.script_manager.get_script_response("bank_account_intro", {"account_ending": account_ending})
+        
+        return ChatResponse(
+            response=response,
+            current_step=state.current_step,
+            slots_needed=["bank_account", "bank_routing"]
+        )
+
+    def _fast_forward_path(self, step: ConversationStep, extracted_info: Dict[str, Any]) -> List[ConversationStep]:
+        """Steps this turn may handle: ``step``, then each collection step after it whose slot arrived too"""
+        path = [step]
+        while True:
+            following = [target for target in self.state_machine.targets(path[-1])
+                         if self.SLOT_STEPS.get(target) in extracted_info and target not in path]
+            if not following:
+                return path
+            path.append(following[0])
+    
+    def _pending_verifications(self, state: ConversationState, turn: TurnContext,
+                               extracted_info: Dict[str, Any]) -> Dict[tuple, Any]:
+        """Verifications whose slots are all in this message, keyed as ``_verify`` keys them.
+        
+        Only for steps on the turn's fast-forward path ("John Smith, born 01/15/1990,
+        SSN ends 1234" at ASK_NAME covers DOB and SSN): a handler is about to ask for
+        those results, anything further on is a guess at the future.
+        """
+        checks = {}
+        if not state.customer_name:
+            return checks
+        path = self._fast_forward_path(state.current_step, extracted_info)
+        for kind, (_, slots, step) in self.VERIFICATIONS.items():
+            if step in path and all(extracted_info.get(slot) for slot in slots):
+                values = tuple(extracted_info[slot] for slot in slots)
+                key, check = self._verification(state, turn, kind, values)
+                checks[key] = check
+        return checks
+    
+    async def _attempt_limits(self, state: ConversationState, turn: TurnContext) -> List[Key]:
+        # Keyed by the record the name matched, so every spelling of a name shares one budget;
+        # guesses at a name with no record count against the client's address only
+        limits = [("ip", turn.client_ip)] if turn.client_ip else []
+        customer_id = await self.verification_engine.customer_id(state.customer_name, state.session_id)
+        if customer_id is not None:
+            limits.append(("customer", str(customer_id)))
+        return limits
+    
+    def _verification(self, state: ConversationState, turn: TurnContext, kind: str, values: tuple):
+        method = getattr(self.verification_engine, self.VERIFICATIONS[kind][0])
+        customer_name, session_id = state.customer_name, state.session_id
+        
+        async def check() -> bool:
+            # No credential check once this customer or client is out of guesses
+            async with self._lookup(kind):
+                await self.attempt_limiter.check(await self._attempt_limits(state, turn))
+                return await method(customer_name, *values, session_id)
+        
+        return (kind, customer_name) + values, check
+    
+    @contextlib.asynccontextmanager
+    async def _lookup(self, kind: str):
+        """Report a limiter or record store failure as ``VerificationUnavailable``, not a crashed turn"""
+        try:
+            yield
+        except AttemptsExhausted:
+            raise
+        except Exception as e:
+            raise VerificationUnavailable(f"{kind} verification failed: {e!r}") from e
+    
+    def _records_unavailable(self, state: ConversationState) -> ChatResponse:
+        return ChatResponse(
+            response="I'm having trouble checking that against our records right now. Could you give me a moment and repeat it?",
+            current_step=state.current_step
+        )
+    
+    async def _verify(self, state: ConversationState, turn: TurnContext, kind: str, *values) -> bool:
+        """Verify slot values for ``kind``, reusing the turn's fan-out result if it has one.
+        
+        A failure costs an attempt here, when a step acts on it, so checks made ahead of
+        the conversation that no step uses are free. Once per turn, replays included.
+        """
+        key, check = self._verification(state, turn, kind, values)
+        valid = await turn.verify(key, check)
+        if not valid:
+            async def spend():
+                async with self._lookup(kind):
+                    await self.attempt_limiter.spend(await self._attempt_limits(state, turn))
+            await turn.once(("spend",) + key, spend)
+        return valid
+    
     def _update_state_with_extracted_info(self, state: ConversationState, extracted_info: Dict[str, Any]):
         """Update conversation state with extracted information"""
         for key, value in extracted_info.items():
@@ -89,82 +359,23 @@ class ConversationManager:
         # Update customer name if extracted
         if 'full_name' in extracted_info and extracted_info['full_name']:
             state.customer_name = extracted_info['full_name']
+            # Every later step verifies against this customer: load the record while
+            # they answer. A different name than before replaces the cached record.
+            self.verification_engine.prefetch_customer(state.session_id, state.customer_name)
     
-    async def _determine_next_response(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _determine_next_response(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Determine the next response based on current state and user input"""
+        step = state.current_step
+        response = await self.state_machine.handler_for(step)(state, turn)
         
-        if state.current_step == ConversationStep.GREETING:
-            return await self._handle_greeting(state, user_message)
+        if not self.state_machine.allows(step, state.current_step):
+            print(f"⚠️ Unexpected transition {step.value} -> {state.current_step.value}")
         
-        elif state.current_step == ConversationStep.ASK_NAME:
-            return await self._handle_name_response(state, user_message)
-        
-        elif state.current_step == ConversationStep.ASK_DOB:
-            return await self._handle_dob_response(state, user_message)
-        
-        elif state.current_step == ConversationStep.ASK_SSN:
-            return await self._handle_ssn_response(state, user_message)
-        
-        elif state.current_step == ConversationStep.ASK_EMAIL:
-            return await self._handle_email_confirmation(state, user_message)
-        
-        elif state.current_step == ConversationStep.EMAIL_USAGE_CHECK:
-            return await self._handle_email_usage_response(state, user_message)
-        
-        elif state.current_step == ConversationStep.CONTACT_INFO_CHECK:
-            return await self._handle_contact_info_check(state, user_message)
-        
-        elif state.current_step == ConversationStep.VBT_INITIATE:
-            return await self._handle_vbt_initiate(state, user_message)
-        
-        elif state.current_step == ConversationStep.VBT_CODE_CHECK:
-            return await self._handle_vbt_code_check(state, user_message)
-        
-        elif state.current_step == ConversationStep.VBT_CODE_INPUT:
-            return await self._handle_vbt_code_input(state, user_message)
-        
-        elif state.current_step == ConversationStep.VBT_WAIT_RETRY:
-            return await self._handle_vbt_wait_retry(state, user_message)
-        
-        elif state.current_step == ConversationStep.VBT_REFUSE_CODE:
-            return await self._handle_vbt_refuse_code(state, user_message)
-        
-        elif state.current_step == ConversationStep.QUALIFYING_QUESTIONS:
-            return await self._handle_qualifying_questions(state, user_message)
-        
-        elif state.current_step == ConversationStep.BANK_ACCOUNT_INFO:
-            return await self._handle_bank_account_info(state, user_message)
-        
-        elif state.current_step == ConversationStep.BANK_ACCOUNT_CONFIRM:
-            return await self._handle_bank_account_confirm(state, user_message)
-        
-        elif state.current_step == ConversationStep.ACCOUNT_TYPE_CHECK:
-            return await self._handle_account_type_check(state, user_message)
-        
-        elif state.current_step == ConversationStep.PAYCHECK_ACCOUNT_CHECK:
-            return await self._handle_paycheck_account_check(state, user_message)
-        
-        elif state.current_step == ConversationStep.PAYCHECK_TYPE_CHECK:
-            return await self._handle_paycheck_type_check(state, user_message)
-        
-        elif state.current_step == ConversationStep.DEBIT_CARD_COLLECTION:
-            return await self._handle_debit_card_collection(state, user_message)
-        
-        elif state.current_step == ConversationStep.DEBIT_CARD_CONFIRM:
-            return await self._handle_debit_card_confirm(state, user_message)
-        
-        elif state.current_step == ConversationStep.DEBIT_CARD_REFUSAL:
-            return await self._handle_debit_card_refusal(state, user_message)
-        
-        return ChatResponse(
-            response="I'm not sure how to help with that. Let me connect you with a specialist.",
-            current_step=ConversationStep.ESCALATION,
-            escalate=True
-        )
+        return response
     
-    async def _handle_greeting(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_greeting(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle greeting phase - check if customer has time"""
-        has_time = await self.ai_client.analyze_yes_no_response(user_message)
+        has_time = await turn.is_yes()
         
         if has_time:
             state.has_time_to_continue = True
@@ -179,16 +390,16 @@ class ConversationManager:
             )
         else:
             state.has_time_to_continue = False
-            response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "no_time_callback"})
+            response = self.script_manager.get_script_response("no_time_callback")
             
             return ChatResponse(
                 response="That's okay! We can always come back to this later. Just let me know when you're ready.",
                 current_step=state.current_step
             )
     
-    async def _handle_name_response(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_name_response(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle customer name input"""
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'full_name' in extracted_info:
             state.customer_name = extracted_info['full_name']
@@ -210,17 +421,15 @@ class ConversationManager:
                 slots_needed=["full_name"]
             )
     
-    async def _handle_dob_response(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_dob_response(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle date of birth response"""
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'dob' in extracted_info:
             state.slots_filled['dob'] = extracted_info['dob']
             
             # Verify DOB against database
-            dob_valid = await self.verification_engine.verify_dob(
-                state.customer_name, extracted_info['dob']
-            )
+            dob_valid = await self._verify(state, turn, 'dob', extracted_info['dob'])
             
             if dob_valid:
                 state.dob_verified = True
@@ -250,24 +459,22 @@ class ConversationManager:
                 slots_needed=["dob"]
             )
     
-    async def _handle_ssn_response(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_ssn_response(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle SSN last 4 digits response"""
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'ssn_last4' in extracted_info:
             state.slots_filled['ssn_last4'] = extracted_info['ssn_last4']
             
             # Verify SSN against database
-            ssn_valid = await self.verification_engine.verify_ssn(
-                state.customer_name, extracted_info['ssn_last4']
-            )
+            ssn_valid = await self._verify(state, turn, 'ssn', extracted_info['ssn_last4'])
             
             if ssn_valid:
                 state.ssn_verified = True
                 state.current_step = ConversationStep.ASK_EMAIL
                 
                 # Get customer's email from database to confirm
-                customer_email = await self.verification_engine.get_customer_email(state.customer_name)
+                customer_email = await self.verification_engine.get_customer_email(state.customer_name, state.session_id)
                 
                 context = {"email": customer_email}
                 response = self.script_manager.get_script_response(state.current_step, context)
@@ -293,15 +500,16 @@ class ConversationManager:
                 slots_needed=["ssn_last4"]
             )
     
-    async def _handle_email_confirmation(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_email_confirmation(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle email address confirmation"""
         
         # First, check if user provided a new email address directly
-        extracted_info = await self.ai_client.extract_information(user_message, ConversationStep.ASK_EMAIL)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'email' in extracted_info:
             # User provided a new email address
             state.slots_filled['email'] = extracted_info['email']
+            risk.record(state, "email_changes")
             state.email_verified = True
             state.current_step = ConversationStep.EMAIL_USAGE_CHECK
             
@@ -313,7 +521,7 @@ class ConversationManager:
             )
         
         # If no email provided, check if they confirmed the existing email (yes/no response)
-        confirmation = await self.ai_client.analyze_yes_no_response(user_message)
+        confirmation = await turn.is_yes()
         
         if confirmation:
             state.email_verified = True
@@ -333,15 +541,16 @@ class ConversationManager:
                 slots_needed=["email"]
             )
     
-    async def _handle_email_usage_response(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_email_usage_response(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle email usage check response"""
         
         # First, check if user provided a new email address
-        extracted_info = await self.ai_client.extract_information(user_message, ConversationStep.ASK_EMAIL)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'email' in extracted_info:
             # User provided a new email address
             state.slots_filled['email'] = extracted_info['email']
+            risk.record(state, "email_changes")
             state.email_verified = True
             state.email_usage_confirmed = True
             
@@ -351,7 +560,7 @@ class ConversationManager:
                 state.current_step = ConversationStep.CONTACT_INFO_CHECK
                 
                 # Get home number from database
-                home_number = await self.verification_engine.get_customer_home_number(state.customer_name)
+                home_number = await self.verification_engine.get_customer_home_number(state.customer_name, state.session_id)
                 
                 if home_number:
                     context = {"home_number": home_number}
@@ -368,7 +577,7 @@ class ConversationManager:
                 )
         
         # If no email provided, check yes/no response
-        uses_email_regularly = await self.ai_client.analyze_yes_no_response(user_message)
+        uses_email_regularly = await turn.is_yes()
         
         if uses_email_regularly:
             state.email_usage_confirmed = True
@@ -379,7 +588,7 @@ class ConversationManager:
                 state.current_step = ConversationStep.CONTACT_INFO_CHECK
                 
                 # Check if customer has home number on file
-                home_number = await self.verification_engine.get_customer_home_number(state.customer_name)
+                home_number = await self.verification_engine.get_customer_home_number(state.customer_name, state.session_id)
                 
                 if home_number:
                     next_response = f"Your account shows you home number as {home_number}, is that a number we would be able to contact you on?"
@@ -403,21 +612,25 @@ class ConversationManager:
                     current_step=state.current_step  # Stay in same step to collect new email
                 )
     
-    async def _handle_contact_info_check(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_contact_info_check(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle home number confirmation and initiate VBT"""
-        confirmed = await self.ai_client.analyze_yes_no_response(user_message)
+        confirmed = await turn.is_yes()
         
         if confirmed:
             state.home_number_confirmed = True
         
         # Move directly to VBT_CODE_CHECK (skip VBT_INITIATE since we're combining messages)
         state.current_step = ConversationStep.VBT_CODE_CHECK
-        state.sms_code_sent = True  # Mark as sent since we're simulating sending it
+        state.sms_code_sent = True
         
         # Get mobile number from database
-        mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name)
+        mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name, state.session_id)
         
         if mobile_number:
+            # Queued for the SMS outbox; the reply does not wait for the gateway
+            if not await self._send_sms_code(state, turn, mobile_number):
+                return self._sms_unavailable(state)
+            
             # Build the complete VBT response with all parts
             mobile_confirmation = f"I see your mobile number is {mobile_number}. "
             vbt_initiate_response = self.script_manager.get_script_response("vbt_initiate")
@@ -442,10 +655,11 @@ class ConversationManager:
     
     ## new version 
 
-    async def _handle_vbt_initiate(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_vbt_initiate(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle VBT initiation - send SMS code and ask if received"""
-        # Here you would integrate with SMS service to send verification code
-        # For demo purposes, we'll simulate sending the code
+        mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name, state.session_id)
+        if not await self._send_sms_code(state, turn, mobile_number):
+            return self._sms_unavailable(state)
         
         state.sms_code_sent = True
         state.current_step = ConversationStep.VBT_CODE_CHECK
@@ -462,28 +676,15 @@ class ConversationManager:
             current_step=state.current_step
         )
 
-    async def _handle_vbt_code_check(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_vbt_code_check(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle checking if customer received SMS code"""
-        refuses_code = await self.ai_client.analyze_code_refusal(user_message)
+        refuses_code = await turn.refuses_code()
         
         if refuses_code:
-            state.sms_code_refused = True
-            state.current_step = ConversationStep.QUALIFYING_QUESTIONS
-            
-            # Get the actual script text
-            refusal_response = self.script_manager.get_script_response("code_refusal")
-            qualifying_intro = self.script_manager.get_script_response("qualifying_intro")
-            military_question = self.script_manager.get_script_response("military_question")
-            
-            full_response = f"{refusal_response}\n\n{qualifying_intro}\n\n{military_question}"
-            
-            return ChatResponse(
-                response=full_response,
-                current_step=state.current_step
-            )
+            return await self._handle_vbt_refuse_code(state, turn)
         
         # Check if they received the code
-        received_code = await self.ai_client.analyze_yes_no_response(user_message)
+        received_code = await turn.is_yes()
         
         if received_code:
             state.current_step = ConversationStep.VBT_CODE_INPUT
@@ -495,24 +696,27 @@ class ConversationManager:
                 slots_needed=["sms_code"]
             )
         else:
-            # Customer hasn't received code
+            # Customer hasn't received code - check back once the text has had time to arrive
             state.sms_retry_count += 1
             state.current_step = ConversationStep.VBT_WAIT_RETRY
+            self._schedule_follow_up(state, turn, "code_wait_follow_up", self.VBT_WAIT_SECONDS)
             
             response = self.script_manager.get_script_response("code_not_received")
             
             return ChatResponse(
                 response=response,
-                current_step=state.current_step
+                current_step=state.current_step,
+                auto_follow_up=True,
+                follow_up_delay=self.VBT_WAIT_SECONDS
             )
 
-    async def _handle_vbt_wait_retry(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_vbt_wait_retry(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle the wait and retry scenario when code not received"""
         # Give them a moment and then continue
         wait_response = self.script_manager.get_script_response("wait_5_seconds")
         
         # Check if they now say they have the code
-        received_code = await self.ai_client.analyze_yes_no_response(user_message)
+        received_code = await turn.is_yes()
         
         if received_code:
             state.current_step = ConversationStep.VBT_CODE_INPUT
@@ -525,7 +729,7 @@ class ConversationManager:
             )
         else:
             # Still no code, continue without it but offer to continue process
-            state.current_step = ConversationStep.QUALIFYING_QUESTIONS
+            state.current_step = ConversationStep.MILITARY_QUESTION
             
             continue_response = self.script_manager.get_script_response("still_no_code")
             qualifying_intro = self.script_manager.get_script_response("qualifying_intro")
@@ -540,29 +744,49 @@ class ConversationManager:
 
         
     
-    async def _handle_vbt_code_input(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_vbt_code_input(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle SMS code input and verification"""
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         if 'sms_code' in extracted_info:
-            # Verify the SMS code (in real implementation, check against sent code)
-            code_valid = await self.verification_engine.verify_sms_code(
-                state.customer_name, extracted_info['sms_code']
-            )
+            # Checking uses up the code (or a guess): a replayed turn reads the first result
+            session_id, code = state.session_id, extracted_info['sms_code']
+            check = await turn.once(("sms_code", code),
+                                    lambda: self.verification_engine.check_sms_code(session_id, code))
             
-            if code_valid:
+            if check == CodeCheck.OK:
                 state.sms_code_verified = True
                 state.mobile_number_confirmed = True
-                state.current_step = ConversationStep.QUALIFYING_QUESTIONS  
+                state.current_step = ConversationStep.MILITARY_QUESTION  
                 
-                response = self.script_manager.get_script_response(ConversationStep.CONTINUE_AFTER_WAIT, {"key": "continue_after_wait"})
-                next_response = self.script_manager.get_script_response(ConversationStep.QUALIFYING_QUESTIONS, {"key": "military_question"})
+                response = self.script_manager.get_script_response("continue_after_wait")
+                next_response = self.script_manager.get_script_response("military_question")
                 
                 return ChatResponse(
                     response=f"{response}\n\n{next_response}",
                     current_step=state.current_step,
                     verification_status="phone_verified"
                 )
+            elif check == CodeCheck.EXPIRED:
+                mobile_number = await self.verification_engine.get_customer_mobile_number(state.customer_name, state.session_id)
+                if not await self._send_sms_code(state, turn, mobile_number):
+                    return self._sms_unavailable(state)
+                return ChatResponse(
+                    response="That code has expired, so I've just sent you a new one. Could you read me the new 6-digit code?",
+                    current_step=state.current_step,
+                    slots_needed=["sms_code"]
+                )
+            elif check == CodeCheck.LOCKED:
+                # Out of guesses: carry on without phone verification, as when the code is refused
+                state.current_step = ConversationStep.MILITARY_QUESTION
+                
+                qualifying_intro = self.script_manager.get_script_response("qualifying_intro")
+                military_question = self.script_manager.get_script_response("military_question")
+                
+                return ChatResponse(
+                    response=f"I wasn't able to verify that code, so we'll continue without it for now.\n\n{qualifying_intro}\n\n{military_question}",
+                    current_step=state.current_step
+                )
             else:
                 return ChatResponse(
                     response="The code you provided doesn't match. Could you please check and try again?",
@@ -575,27 +799,110 @@ class ConversationManager:
                 slots_needed=["sms_code"]
             )
     
-    async def _handle_vbt_wait_retry(self, state: ConversationState, user_message: str) -> ChatResponse:
-        """Handle the 5-second wait scenario when code not received"""
-        import asyncio
+    async def _send_sms_code(self, state: ConversationState, turn: Optional[TurnContext],
+                             mobile_number: str) -> bool:
+        """Send the session a fresh code; False (and flagged) when texts cannot be sent.
+        
+        Within a turn the code is issued and texted once the turn is saved, so a
+        replayed turn sends one text; without one (debug shortcuts) it goes now.
+        The reply promising a text is only given while the outbox has room; a
+        text that still cannot be sent, or that the gateway drops, flags the
+        saved session so its next turn escalates.
+        """
+        session_id = state.session_id
+        
+        def dropped():
+            self._in_background(self._text_not_sent(session_id, lock=True))
+        
+        async def send() -> bool:
+            if await self.verification_engine.send_sms_code(session_id, mobile_number, dropped):
+                return True
+            print(f"⚠️ Could not queue a verification text for session {session_id}")
+            return False
+        
+        async def send_after_save():
+            # Still inside the turn's session lock: flag before the next turn can start
+            if not await send():
+                await self._text_not_sent(session_id, lock=False)
+        
+        if self.verification_engine.can_send_sms():
+            if turn is not None:
+                turn.after_save(send_after_save)
+                return True
+            if await send():
+                return True
+        state.sms_code_sent = False
+        if 'sms_unavailable' not in state.escalation_flags:
+            state.escalation_flags.append('sms_unavailable')
+        return False
+    
+    async def _text_not_sent(self, session_id: str, lock: bool):
+        """Flag a saved session still waiting on a code that was never sent; ``lock`` unless the caller holds it"""
+        async with (self.session_locks.hold(session_id) if lock else contextlib.nullcontext()):
+            for _ in range(self.MAX_SAVE_ATTEMPTS):
+                state = await self.active_conversations.peek(session_id)
+                if (state is None or state.current_step not in self.SMS_WAIT_STEPS
+                        or 'sms_unavailable' in state.escalation_flags):
+                    return
+                state.sms_code_sent = False
+                state.escalation_flags.append('sms_unavailable')
+                try:
+                    await self.active_conversations.put(state, touch=False)
+                    return
+                except SessionConflict:
+                    continue
+    
+    def _sms_unavailable(self, state: ConversationState) -> ChatResponse:
+        """No way to text a code: hand phone verification to a specialist rather than skip it"""
+        state.current_step = ConversationStep.ESCALATION
         
-        # Simulate waiting 5 seconds
-        await asyncio.sleep(5)
+        return ChatResponse(
+            response="I'm not able to send you a verification text right now, so one of our specialists will verify your phone number with you.",
+            current_step=state.current_step,
+            escalate=True
+        )
+    
+    async def _handle_vbt_refuse_code(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle a customer who refuses the SMS code - continue without phone verification"""
+        state.sms_code_refused = True
+        state.current_step = ConversationStep.MILITARY_QUESTION
+        
+        refusal_response = self.script_manager.get_script_response("code_refusal")
+        qualifying_intro = self.script_manager.get_script_response("qualifying_intro")
+        military_question = self.script_manager.get_script_response("military_question")
+        
+        full_response = f"{refusal_response}\n\n{qualifying_intro}\n\n{military_question}"
         
-        # Ask again if they received the code
-        still_no_code = not await self.ai_client.analyze_yes_no_response(user_message)
+        return ChatResponse(
+            response=full_response,
+            current_step=state.current_step
+        )
+    
+    async def _handle_qualifying_intro(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Introduce the qualifying questions and ask the military question"""
+        state.current_step = ConversationStep.MILITARY_QUESTION
+        
+        qualifying_intro = self.script_manager.get_script_response("qualifying_intro")
+        military_question = self.script_manager.get_script_response("military_question")
+        
+        return ChatResponse(
+            response=f"{qualifying_intro}\n\n{military_question}",
+            current_step=state.current_step
+        )
     
-    async def _hangle_qualifying_questions(self, state: ConversationState, user_message: str) -> ChatResponse:
-        if not state.slots_filled.get('military_status'):
+    async def _handle_qualifying_questions(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle the military member question and move on to bank account verification"""
+        if 'military_status' not in state.slots_filled:
             # Extract military status
-            is_military = await self.ai_client.analyze_yes_no_response(user_message)
+            is_military = await turn.is_yes()
+            state.is_military_member = is_military
             state.slots_filled['military_status'] = is_military
             
             # Move to bank account information
             state.current_step = ConversationStep.BANK_ACCOUNT_INFO
             
             # Get account ending from database
-            account_ending = await self.verification_engine.get_customer_account_ending(state.customer_name)
+            account_ending = await self.verification_engine.get_customer_account_ending(state.customer_name, state.session_id)
             
             qualifying_complete = self.script_manager.get_script_response("qualifying_complete")
             bank_account_intro = self.script_manager.get_script_response("bank_account_intro", {"account_ending": account_ending})
@@ -609,17 +916,117 @@ class ConversationManager:
             )
         
         # If we get here, something went wrong
+        state.current_step = ConversationStep.ESCALATION
         return ChatResponse(
             response="Let me connect you with a specialist to help you further.",
-            current_step=ConversationStep.ESCALATION,
+            current_step=state.current_step,
             escalate=True
         )
     
     # bank account
 
-    async def _handle_paycheck_account_check(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_bank_account_info(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle full bank account and routing number collection"""
+        extracted_info = await turn.extract(state.current_step)
+        
+        if 'bank_account' in extracted_info and 'bank_routing' in extracted_info:
+            state.slots_filled['bank_account'] = extracted_info['bank_account']
+            state.slots_filled['bank_routing'] = extracted_info['bank_routing']
+            
+            account_valid = await self._verify(
+                state, turn, 'bank_account', extracted_info['bank_account'], extracted_info['bank_routing']
+            )
+            
+            if account_valid:
+                state.bank_account_verified = True
+                state.current_step = ConversationStep.BANK_ACCOUNT_CONFIRM
+                
+                response = self.script_manager.get_script_response("bank_account_confirm")
+                
+                return ChatResponse(
+                    response=response,
+                    current_step=state.current_step,
+                    slots_needed=["bank_account"]
+                )
+            else:
+                state.verification_attempts += 1
+                if state.verification_attempts >= state.max_attempts:
+                    return await self._handle_max_attempts_reached(state)
+                
+                return ChatResponse(
+                    response="The account and routing numbers don't match the account on file. Could you please check them and try again?",
+                    current_step=state.current_step,
+                    slots_needed=["bank_account", "bank_routing"]
+                )
+        else:
+            missing_fields = [field for field in ("bank_account", "bank_routing") if field not in extracted_info]
+            
+            return ChatResponse(
+                response="I need both the full account number (8 to 12 digits) and the 9-digit routing number. Could you please provide them?",
+                current_step=state.current_step,
+                slots_needed=missing_fields
+            )
+    
+    async def _handle_bank_account_confirm(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle the customer repeating the account number"""
+        extracted_info = await turn.extract(state.current_step)
+        
+        if extracted_info.get('bank_account') == state.slots_filled.get('bank_account'):
+            state.bank_account_confirmed = True
+            state.current_step = ConversationStep.ACCOUNT_TYPE_CHECK
+            
+            response = self.script_manager.get_script_response("account_type_question")
+            
+            return ChatResponse(
+                response=response,
+                current_step=state.current_step,
+                slots_needed=["account_type"]
+            )
+        elif 'bank_account' in extracted_info:
+            # Doesn't match what they gave us - collect both numbers again
+            state.bank_account_verified = False
+            state.current_step = ConversationStep.BANK_ACCOUNT_INFO
+            
+            return ChatResponse(
+                response="That account number doesn't match the one you provided earlier. Could you please provide the full account and routing number again?",
+                current_step=state.current_step,
+                slots_needed=["bank_account", "bank_routing"]
+            )
+        else:
+            return ChatResponse(
+                response="Could you please repeat the full account number?",
+                current_step=state.current_step,
+                slots_needed=["bank_account"]
+            )
+    
+    async def _handle_account_type_check(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle checking or savings account question"""
+        if 'checking' in turn.lower:
+            account_type = "checking"
+        elif 'saving' in turn.lower:
+            account_type = "savings"
+        else:
+            return ChatResponse(
+                response="Is the account a checking or a savings account?",
+                current_step=state.current_step,
+                slots_needed=["account_type"]
+            )
+        
+        state.slots_filled['account_type'] = account_type
+        state.account_type_confirmed = True
+        state.current_step = ConversationStep.PAYCHECK_ACCOUNT_CHECK
+        
+        response = self.script_manager.get_script_response("paycheck_account_question")
+        
+        return ChatResponse(
+            response=response,
+            current_step=state.current_step,
+            slots_needed=["receives_paycheck_in_account"]
+        )
+
+    async def _handle_paycheck_account_check(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle checking if this is the same account where they receive paycheck"""
-        same_account = await self.ai_client.analyze_yes_no_response(user_message)
+        same_account = await turn.is_yes()
         
         state.paycheck_account_same = same_account
         state.slots_filled['receives_paycheck_in_account'] = same_account
@@ -627,7 +1034,7 @@ class ConversationManager:
         if same_account:
             # Same account, move to paycheck type question
             state.current_step = ConversationStep.PAYCHECK_TYPE_CHECK
-            response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "paycheck_type_question"})
+            response = self.script_manager.get_script_response("paycheck_type_question")
             
             return ChatResponse(
                 response=response,
@@ -636,20 +1043,20 @@ class ConversationManager:
             )
         else:
             # Different account, need to update
-            response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "paycheck_no_update"})
-            # Stay in same step to collect the paycheck account info
+            response = self.script_manager.get_script_response("paycheck_no_update")
+            state.current_step = ConversationStep.BANK_ACCOUNT_INFO  # Go back to collect paycheck account
             
             return ChatResponse(
                 response=response,
-                current_step=ConversationStep.BANK_ACCOUNT_INFO  # Go back to collect paycheck account
+                current_step=state.current_step
             )
     
-    async def _handle_paycheck_type_check(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_paycheck_type_check(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle paycheck type (paper check or direct deposit)"""
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         paycheck_type = None
-        user_message_lower = user_message.lower()
+        user_message_lower = turn.lower
         
         if 'direct deposit' in user_message_lower or 'direct' in user_message_lower:
             paycheck_type = "direct deposit"
@@ -669,8 +1076,8 @@ class ConversationManager:
                 state.loan_approved = True
                 state.current_step = ConversationStep.DEBIT_CARD_COLLECTION
                 
-                response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "debit_card_intro"})
-                next_response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "debit_card_request"})
+                response = self.script_manager.get_script_response("debit_card_intro")
+                next_response = self.script_manager.get_script_response("debit_card_request")
                 
                 return ChatResponse(
                     response=f"{response}\n\n{next_response}",
@@ -682,7 +1089,7 @@ class ConversationManager:
                 state.loan_declined = True
                 state.current_step = ConversationStep.LOAN_DECLINED
                 
-                response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "loan_declined"})
+                response = self.script_manager.get_script_response("loan_declined")
                 
                 return ChatResponse(
                     response=response,
@@ -696,16 +1103,16 @@ class ConversationManager:
                 slots_needed=["paycheck_type"]
             )
     
-    async def _handle_debit_card_collection(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_debit_card_collection(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle debit card information collection"""
         # Check if customer is refusing to provide debit card
-        refuses_card = await self.ai_client.analyze_debit_card_refusal(user_message)
+        refuses_card = await turn.refuses_debit_card()
         
         if refuses_card:
             state.debit_card_refused = True
             state.current_step = ConversationStep.DEBIT_CARD_REFUSAL
             
-            response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "debit_card_refusal"})
+            response = self.script_manager.get_script_response("debit_card_refusal")
             
             return ChatResponse(
                 response=response,
@@ -713,30 +1120,35 @@ class ConversationManager:
                 escalate=True
             )
         
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         required_fields = ["card_number", "card_name", "card_expiry", "card_cvv"]
         has_all_fields = all(field in extracted_info for field in required_fields)
         
         if has_all_fields:
             # Validate card number
-            card_valid = await self.verification_engine.validate_debit_card(extracted_info['card_number'])
+            card_check = self.verification_engine.check_debit_card(extracted_info['card_number'])
             
-            if card_valid:
+            if card_check.valid:
                 for field in required_fields:
                     state.slots_filled[field] = extracted_info[field]
                 
                 state.debit_card_provided = True
                 state.current_step = ConversationStep.DEBIT_CARD_CONFIRM
                 
-                response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "debit_card_confirm"})
+                response = self.script_manager.get_script_response("debit_card_confirm")
                 
                 return ChatResponse(
                     response=response,
                     current_step=state.current_step
                 )
             else:
-                response = self.script_manager.get_script_response(ConversationStep.GREETING, {"key": "debit_card_invalid"})
+                risk.record(state, "invalid_cards")
+                if card_check.reason == "not_debit":
+                    response = self.script_manager.get_script_response(
+                        "debit_card_not_debit", {"card_type": card_check.bin_range.card_type})
+                else:
+                    response = self.script_manager.get_script_response("debit_card_invalid")
                 
                 return ChatResponse(
                     response=response,
@@ -751,10 +1163,10 @@ class ConversationManager:
                 slots_needed=missing_fields
             )
     
-    async def _handle_debit_card_confirm(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_debit_card_confirm(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle debit card information confirmation"""
         # Customer should repeat the debit card information
-        extracted_info = await self.ai_client.extract_information(user_message, state.current_step)
+        extracted_info = await turn.extract(state.current_step)
         
         required_fields = ["card_number", "card_name", "card_expiry", "card_cvv"]
         has_all_fields = all(field in extracted_info for field in required_fields)
@@ -773,17 +1185,23 @@ class ConversationManager:
                 # Set debit card payment consent
                 state.slots_filled['debit_card_payment_consent'] = "yes"
                 
+                # The risk score has been kept current turn by turn; this only reads it
+                result = risk.verification_result(state)
+                state.script_context['verification_result'] = result.model_dump()
+                
                 response = "Perfect! I have successfully collected and verified all your information. Your loan application is now complete and will be processed shortly. You should receive confirmation within 24 hours. Thank you for choosing Dash Of Cash!"
                 
                 return ChatResponse(
                     response=response,
                     current_step=state.current_step,
-                    verification_status="complete"
+                    verification_status="complete",
+                    escalate=result.verification_status == "escalate"
                 )
             else:
+                state.current_step = ConversationStep.DEBIT_CARD_COLLECTION
                 return ChatResponse(
                     response="The information doesn't match what you provided earlier. Please provide the debit card information again.",
-                    current_step=ConversationStep.DEBIT_CARD_COLLECTION
+                    current_step=state.current_step
                 )
         else:
             return ChatResponse(
@@ -791,7 +1209,7 @@ class ConversationManager:
                 current_step=state.current_step
             )
     
-    async def _handle_debit_card_refusal(self, state: ConversationState, user_message: str) -> ChatResponse:
+    async def _handle_debit_card_refusal(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
         """Handle when customer refuses to provide debit card"""
         # This leads to loan withdrawal
         state.current_step = ConversationStep.COMPLETE
@@ -809,14 +1227,36 @@ class ConversationManager:
         """Handle when maximum verification attempts are reached"""
         state.current_step = ConversationStep.ESCALATION
         
-        response = self.script_manager.get_script_response(ConversationStep.GREETING)  # This should map to "max_attempts_reached"
+        response = self.script_manager.get_script_response("max_attempts_reached")
+        
+        return ChatResponse(
+            response=response,
+            current_step=state.current_step,
+            escalate=True
+        )
+    
+    async def _handle_unsupported_step(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Steps without a script yet are handed over to a specialist"""
+        state.current_step = ConversationStep.ESCALATION
         
         return ChatResponse(
-            response="I'm having trouble verifying your information after multiple attempts. Let me connect you with one of our specialists who can help you further.",
+            response="I'm not sure how to help with that. Let me connect you with a specialist.",
             current_step=state.current_step,
             escalate=True
         )
     
+    async def _handle_conversation_closed(self, state: ConversationState, turn: TurnContext) -> ChatResponse:
+        """Handle messages that arrive after the conversation has finished"""
+        escalated = state.current_step == ConversationStep.ESCALATION
+        response = ("One of our specialists will be with you shortly." if escalated
+                    else "This conversation is complete. Please start a new conversation if you need further help.")
+        
+        return ChatResponse(
+            response=response,
+            current_step=state.current_step,
+            escalate=escalated
+        )
+    
     def _get_field_prompt(self, field_name: str) -> str:
         """Get prompt for specific field"""
         prompts = {
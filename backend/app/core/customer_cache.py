@@ -0,0 +1,69 @@
+"""
+Per-session memo of the customer record.
+
+Every verification step compares against the same customer, so the record
+is fetched once per conversation - in the background as soon as the name is
+known - and later lookups for that session await the same task, which is
+already done by the time the customer answers the next question.
+
+Entries belong to a session and remember which (normalized) name they were
+fetched for; asking for a different name replaces the entry. The memo is
+process-local and bounded: a session that lands on another worker or was
+evicted simply fetches again.
+"""
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from app.models.databse import Customer, normalize_name
+
+Fetch = Callable[[str], Awaitable[Optional[Customer]]]
+
+
+class SessionCustomerCache:
+    def __init__(self, fetch: Fetch, max_sessions: int = 10_000):
+        self.fetch = fetch
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[str, Tuple[str, asyncio.Task]]" = OrderedDict()
+        self._hits = 0
+        self._fetches = 0
+
+    def prefetch(self, session_id: str, customer_name: str) -> asyncio.Task:
+        """Start loading the record for this session unless it is already loading"""
+        name_key = normalize_name(customer_name)
+        entry = self._entries.get(session_id)
+        if entry is not None and entry[0] == name_key:
+            self._entries.move_to_end(session_id)
+            return entry[1]
+
+        if entry is not None:
+            entry[1].cancel()  # Name changed: the old record is of no use any more
+        task = asyncio.ensure_future(self.fetch(customer_name))
+        task.add_done_callback(lambda done: self._drop_if_failed(session_id, done))
+        self._entries[session_id] = (name_key, task)
+        self._entries.move_to_end(session_id)
+        self._fetches += 1
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+        return task
+
+    async def get(self, session_id: str, customer_name: str) -> Optional[Customer]:
+        entry = self._entries.get(session_id)
+        if entry is not None and entry[0] == normalize_name(customer_name):
+            self._hits += 1
+        # prefetch() returns the existing task when the name matches
+        return await asyncio.shield(self.prefetch(session_id, customer_name))
+
+    def forget(self, session_id: str):
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    def _drop_if_failed(self, session_id: str, task: asyncio.Task):
+        # Keep errors out of the memo so the next step retries the lookup
+        if task.cancelled() or task.exception() is not None:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[1] is task:
+                del self._entries[session_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self._entries), "fetches": self._fetches, "hits": self._hits}
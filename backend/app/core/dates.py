@@ -0,0 +1,252 @@
+"""
+Single-pass date of birth parser.
+
+The message is split into tokens once (digit runs with an optional ordinal
+suffix, letter runs, single punctuation marks) and a small hand-written
+parser tries, at each token, the forms a customer gives a birthday in:
+
+- numeric: ``01/15/1990``, ``1990-01-15``, ``1.15.90``
+- month name first: ``July 22, 2000``, ``sept. 3rd 1979``
+- day first: ``22 July 2000``, ``the 3rd of sept 1979``
+- spoken: ``the fifteenth of January nineteen ninety``,
+  ``january twenty-first two thousand and three``
+
+Ambiguity policy:
+
+- the leftmost date in the message wins
+- ``a/b/yyyy`` is month/day (US order); it is read day/month only when ``a``
+  cannot be a month (``15/01/1990``)
+- a four-digit first field is year/month/day
+- a two-digit year is the latest year ending in those digits that is not in
+  the future (``90`` is 1990, ``05`` is 2005)
+- a date after today is not a date of birth; parsing moves on past it
+"""
+import datetime as dt
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+MONTHS = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4, 'may': 5, 'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9, 'sept': 9, 'sep': 9,
+    'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
+}
+NUMERIC_SEPARATORS = frozenset('/-.')
+
+_ONES = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9}
+_TEENS = {'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+          'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19}
+_TENS = {'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
+         'eighty': 80, 'ninety': 90}
+_ORDINAL_ONES = {'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5, 'sixth': 6,
+                 'seventh': 7, 'eighth': 8, 'ninth': 9}
+_ORDINAL_TEENS = {'tenth': 10, 'eleventh': 11, 'twelfth': 12, 'thirteenth': 13, 'fourteenth': 14,
+                  'fifteenth': 15, 'sixteenth': 16, 'seventeenth': 17, 'eighteenth': 18, 'nineteenth': 19}
+_ORDINAL_TENS = {'twentieth': 20, 'thirtieth': 30}
+_ZEROS = frozenset(('oh', 'o', 'zero'))  # "nineteen oh five"
+
+# Tokens that can start a date: a digit, a month name, or a spelled-out day
+_STARTS = frozenset(MONTHS) | {'the'} | set(_ONES) | set(_TEENS) | set(_TENS) | set(_ORDINAL_ONES) \
+    | set(_ORDINAL_TEENS) | set(_ORDINAL_TENS)
+_TOKEN = re.compile(r"\d+(?:st|nd|rd|th)?|[a-z]+|[^\sa-z\d]")
+# Every form has digits or a month name; most messages have neither and skip tokenizing
+_CANDIDATE = re.compile(r"\d|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)")
+
+
+class DateMatch(NamedTuple):
+    date: dt.date
+    start: int  # Span of the date in the text
+    end: int
+
+
+def find_date_of_birth(text: str, today: Optional[dt.date] = None) -> Optional[DateMatch]:
+    """The leftmost date of birth in lower-cased ``text``, or None"""
+    if not could_hold_date(text):
+        return None
+    tokens = _TOKEN.findall(text)
+    for i, token in enumerate(tokens):
+        if token in _STARTS:
+            parsed = _month_first(tokens, i) if token in MONTHS else _day_first(tokens, i)
+        elif token[0].isdigit():
+            today = today or dt.date.today()
+            parsed = _numeric(tokens, i, today) or _day_first(tokens, i)
+        else:
+            continue
+        if parsed is None:
+            continue
+        (year, month, day), end = parsed
+        try:
+            date = dt.date(year, month, day)
+        except ValueError:
+            continue  # 02/30/1990, or a day that is really a year
+        if date <= (today or dt.date.today()):
+            return DateMatch(date, *_span(text, tokens, i, end))
+    return None
+
+
+def could_hold_date(text: str) -> bool:
+    """Whether lower-cased ``text`` has a digit or a month name, without which none of the forms above can occur"""
+    return _CANDIDATE.search(text) is not None
+
+
+def mentions(text: str, date: dt.date) -> bool:
+    """Whether lower-cased ``text`` writes out the day, month and year of ``date`` in any of the forms above"""
+    tokens = _TOKEN.findall(text)
+    numbers, years = set(), set()
+    for i, token in enumerate(tokens):
+        if token in MONTHS:
+            numbers.add(('month', MONTHS[token]))
+        elif token[0].isdigit():
+            digits = token.rstrip('stndrh')
+            numbers.add(int(digits))
+            if len(digits) == 4:
+                years.add(int(digits))
+        else:
+            spoken = _under_hundred(tokens, i, ordinals=True)
+            if spoken:
+                numbers.add(spoken[0])
+            year = _year(tokens, i)
+            if year:
+                years.add(year[0])
+    return ((date.month in numbers or ('month', date.month) in numbers) and date.day in numbers
+            and (date.year in years or date.year % 100 in numbers))
+
+
+def _span(text: str, tokens: List[str], first: int, end: int) -> Tuple[int, int]:
+    """Where tokens ``first`` to ``end - 1`` sit in ``text`` (only whitespace separates tokens)"""
+    position = start = 0
+    for index in range(end):
+        position = text.index(tokens[index], position)
+        if index == first:
+            start = position
+        position += len(tokens[index])
+    return start, position
+
+
+# Each parser below takes the token list and a position and returns
+# ((year, month, day), index after the last token used), or None
+
+def _numeric(tokens: List[str], i: int, today: dt.date):
+    if i + 5 > len(tokens):
+        return None
+    first, separator, second, repeated, third = tokens[i:i + 5]
+    if separator not in NUMERIC_SEPARATORS or repeated != separator:
+        return None
+    if not (first.isdigit() and second.isdigit() and third.isdigit()) or len(second) > 2:
+        return None
+    if len(first) == 4 and len(third) <= 2:
+        return (int(first), int(second), int(third)), i + 5
+    if len(first) > 2 or len(third) not in (2, 4):
+        return None
+    year = int(third) if len(third) == 4 else _full_year(int(third), today)
+    month, day = int(first), int(second)
+    if month > 12 >= day:
+        month, day = day, month
+    return (year, month, day), i + 5
+
+
+def _full_year(two_digits: int, today: dt.date) -> int:
+    year = today.year // 100 * 100 + two_digits
+    return year if year <= today.year else year - 100
+
+
+def _month_first(tokens: List[str], i: int):
+    month = MONTHS[tokens[i]]
+    j = _skip(tokens, i + 1, '.')
+    j = _skip(tokens, j, ',')
+    j = _skip(tokens, j, 'the')
+    # "july twenty two thousand": the day is 20 when 22 leaves no year
+    for day, after_day in _days(tokens, j):
+        year = _year(tokens, _skip(tokens, after_day, ','))
+        if year is not None:
+            return (year[0], month, day), year[1]
+    return None
+
+
+def _day_first(tokens: List[str], i: int):
+    days = _days(tokens, _skip(tokens, i, 'the'))
+    if not days:
+        return None
+    day = days[0]  # A month name follows, so the longest reading is the only one
+    j = _skip(tokens, day[1], 'of')
+    month = MONTHS.get(tokens[j]) if j < len(tokens) else None
+    if month is None:
+        return None
+    j = _skip(tokens, j + 1, '.')
+    j = _skip(tokens, j, ',')
+    year = _year(tokens, j)
+    if year is None:
+        return None
+    return (year[0], month, day[0]), year[1]
+
+
+def _skip(tokens: List[str], j: int, optional: str) -> int:
+    return j + 1 if j < len(tokens) and tokens[j] == optional else j
+
+
+def _days(tokens: List[str], j: int) -> List[Tuple[int, int]]:
+    """Readings of a day as digits ("3", "03", "3rd") or words ("third", "twenty-first"), longest first"""
+    if j >= len(tokens):
+        return []
+    token = tokens[j]
+    if token[0].isdigit():
+        digits = token.rstrip('stndrh')
+        return [(int(digits), j + 1)] if len(digits) <= 2 else []
+    day = _under_hundred(tokens, j, ordinals=True)
+    if day is None:
+        return []
+    if day[1] > j + 1 and tokens[j] in _TENS:
+        return [day, (_TENS[tokens[j]], j + 1)]
+    return [day]
+
+
+def _year(tokens: List[str], j: int) -> Optional[Tuple[int, int]]:
+    """Four digits, or spoken: "nineteen ninety", "nineteen oh five", "two thousand and three", "twenty twenty"""
+    if j >= len(tokens):
+        return None
+    token = tokens[j]
+    if token.isdigit():
+        return (int(token), j + 1) if len(token) == 4 else None
+
+    if token == 'two' and j + 1 < len(tokens) and tokens[j + 1] == 'thousand':
+        rest = _under_hundred(tokens, _skip(tokens, j + 2, 'and'), ordinals=False)
+        return (2000 + rest[0], rest[1]) if rest else (2000, j + 2)
+
+    century = _TEENS.get(token) or (20 if token == 'twenty' else None)
+    if century is None:
+        return None
+    j = _skip(tokens, j + 1, '-')
+    if j >= len(tokens):
+        return None
+    following = tokens[j]
+    if following in _ZEROS and j + 1 < len(tokens) and tokens[j + 1] in _ONES:
+        return century * 100 + _ONES[tokens[j + 1]], j + 2
+    if following == 'hundred':
+        rest = _under_hundred(tokens, _skip(tokens, j + 1, 'and'), ordinals=False)
+        return (century * 100 + rest[0], rest[1]) if rest else (century * 100, j + 1)
+    rest = _under_hundred(tokens, j, ordinals=False)
+    if rest is None or rest[0] < 10:
+        return None  # "twenty one" is a number, not a year
+    return century * 100 + rest[0], rest[1]
+
+
+def _under_hundred(tokens: List[str], j: int, ordinals: bool) -> Optional[Tuple[int, int]]:
+    """1-99 in words; ``ordinals`` also accepts "first", "fifteenth", "twenty-first", ..."""
+    if j >= len(tokens):
+        return None
+    token = tokens[j]
+    value = _ONES.get(token) or _TEENS.get(token)
+    if value is None and ordinals:
+        value = _ORDINAL_ONES.get(token) or _ORDINAL_TEENS.get(token) or _ORDINAL_TENS.get(token)
+    if value is not None:
+        return value, j + 1
+
+    tens = _TENS.get(token)
+    if tens is None:
+        return None
+    k = j + 2 if j + 2 < len(tokens) and tokens[j + 1] == '-' else j + 1
+    if k < len(tokens):
+        unit = _ONES.get(tokens[k]) or (_ORDINAL_ONES.get(tokens[k]) if ordinals else None)
+        if unit is not None:
+            return tens + unit, k + 1
+    return tens, j + 1
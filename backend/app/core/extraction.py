@@ -0,0 +1,302 @@
+"""
+Tiered slot extraction: deterministic rules first, an LLM only for what they miss.
+
+``AzureAIClient.extract_scored`` answers most turns in microseconds and says
+how sure it is of each slot. ``TieredExtractor`` looks at the slots the
+current step asks for (``STEP_SLOTS``); only when one of them is missing or
+below ``min_confidence`` is the LLM asked, and then only for those slots,
+not the whole ``Slots`` schema. A miss is not sent at all when the message
+is a yes, no or refusal (the customer answered the question instead of
+giving the slot) or has nothing the slot could be read from (``SLOT_CUES``).
+Whatever the LLM returns is checked against the slot's format, and against
+what the customer actually typed, before it replaces a rule result.
+
+Card, CVV, account, routing, SSN and SMS code digits never reach the model:
+those slots (``PRIVATE_SLOTS``) are the rules' alone, and ``redact`` masks
+digits out of the message before it is sent.
+
+Each tier's hit rate and latency is kept in ``stats()`` (``/chat/metrics``).
+The LLM tier goes through ``LLMClient`` (pooled, rate-limited, bounded by the
+turn's deadline). Without an endpoint configured (``create_llm_client``) it
+is off and misses are simply misses.
+"""
+import asyncio
+import datetime as dt
+import json
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.models.schemas import ConversationStep
+from app.core import dates
+from app.core.intents import NO, REFUSAL, YES
+from app.core.llm_client import LLMClient, create_llm_client
+
+# Slots a step cannot move on without; a miss on any of them is what the LLM is for
+STEP_SLOTS: Dict[ConversationStep, Tuple[str, ...]] = {
+    ConversationStep.ASK_NAME: ('full_name',),
+    ConversationStep.ASK_DOB: ('dob',),
+    ConversationStep.ASK_SSN: ('ssn_last4',),
+    ConversationStep.ASK_EMAIL: ('email',),
+    ConversationStep.VBT_CODE_INPUT: ('sms_code',),
+    ConversationStep.CODE_RECEIVED: ('sms_code',),
+    ConversationStep.BANK_ACCOUNT_INFO: ('bank_account', 'bank_routing'),
+    ConversationStep.DEBIT_CARD_COLLECTION: ('card_number', 'card_name', 'card_expiry', 'card_cvv'),
+}
+
+# What the LLM is told about each slot, and the format its answer must have
+SLOT_DESCRIPTIONS = {
+    'full_name': "customer's first and last name",
+    'dob': "date of birth as YYYY-MM-DD",
+    'ssn_last4': "last four digits of the Social Security Number",
+    'email': "email address",
+    'sms_code': "6-digit verification code",
+    'bank_account': "bank account number, 8-12 digits",
+    'bank_routing': "bank routing number, 9 digits",
+    'card_number': "16-digit debit card number",
+    'card_name': "name as printed on the card",
+    'card_expiry': "card expiry as MM/YY",
+    'card_cvv': "3 or 4 digit card security code",
+}
+SLOT_FORMATS = {slot: re.compile(pattern) for slot, pattern in {
+    'full_name': r"[A-Za-z ,.'-]{2,100}",
+    'dob': r"\d{4}-\d{2}-\d{2}",
+    'ssn_last4': r"\d{4}",
+    'email': r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    'sms_code': r"\d{6}",
+    'bank_account': r"\d{8,12}",
+    'bank_routing': r"\d{9}",
+    'card_number': r"\d{16}",
+    'card_name': r"[A-Za-z ,.'-]{2,100}",
+    'card_expiry': r"(?:0[1-9]|1[0-2])/\d{2}",
+    'card_cvv': r"\d{3,4}",
+}.items()}
+# Digits the customer must actually have typed; an LLM must not make these up
+DIGIT_SLOTS = frozenset(('ssn_last4', 'sms_code', 'bank_account', 'bank_routing', 'card_number', 'card_cvv'))
+# Never asked of the LLM, so the message it sees never needs their digits
+PRIVATE_SLOTS = DIGIT_SLOTS | {'card_expiry'}
+# What a message must have for the LLM to possibly find the slot in it (lower-cased text)
+_NAME_CUE = re.compile(r"[a-z]{2,}[^a-z]+[a-z]{2,}").search  # Two words
+SLOT_CUES: Dict[str, Callable[[str], Any]] = {
+    'full_name': _NAME_CUE,
+    'card_name': _NAME_CUE,
+    'dob': dates.could_hold_date,
+    'email': re.compile(r"@|\bat\b.+\bdot\b").search,  # Or spelled out: "jane at example dot com"
+}
+# Intents that answer the question asked instead of giving a slot
+ANSWER_INTENTS = frozenset((YES, NO, REFUSAL))
+# Rule tier confidence below which a needed slot is sent to the LLM tier
+MIN_CONFIDENCE = 0.7
+LLM_CONFIDENCE = 0.9
+_DIGIT_RUN = re.compile(r"\d+")
+# No part of a written date is longer than this; longer runs are account or card numbers
+_DATE_PART_DIGITS = 4
+
+
+class LLMExtractor(ABC):
+    @abstractmethod
+    async def extract(self, message: str, slots: Sequence[str], deadline: Optional[float] = None,
+                      tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Values for whichever of ``slots`` the message holds; unknown slots are left out"""
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class ChatExtractor(LLMExtractor):
+    """One chat completion per miss, asking for the missing slots as a JSON object"""
+
+    def __init__(self, client: LLMClient):
+        self.client = client
+
+    async def extract(self, message: str, slots: Sequence[str], deadline: Optional[float] = None,
+                      tenant: Optional[str] = None) -> Dict[str, Any]:
+        fields = "\n".join(f"- {slot}: {SLOT_DESCRIPTIONS.get(slot, slot)}" for slot in slots)
+        content = await self.client.chat(
+            [
+                {"role": "system", "content": "Extract these fields from the customer's message and answer with a "
+                                              "JSON object. Leave out any field the message does not contain.\n"
+                                              + fields},
+                {"role": "user", "content": message},
+            ],
+            deadline=deadline, tenant=tenant, temperature=0, response_format={"type": "json_object"},
+        )
+        found = json.loads(content or "{}")
+        return found if isinstance(found, dict) else {}
+
+    async def close(self):
+        await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.client.stats()
+
+
+def create_llm_extractor() -> Optional[LLMExtractor]:
+    """The LLM tier when an endpoint is configured (see ``create_llm_client``), else None"""
+    client = create_llm_client()
+    return ChatExtractor(client) if client is not None else None
+
+
+def redact(message: str, slots: Sequence[str], claimed: Sequence[str] = ()) -> str:
+    """``message`` as the LLM may see it when asked for ``slots``.
+
+    Every digit is masked unless a date of birth is asked for; then only runs
+    too long to be part of a date, and the ``claimed`` values the rules already
+    found for private slots, are.
+    """
+    if 'dob' not in slots:
+        return _DIGIT_RUN.sub(_mask, message)
+    for value in claimed:
+        message = message.replace(value, '#' * len(value))
+    return _DIGIT_RUN.sub(lambda m: _mask(m) if len(m.group()) > _DATE_PART_DIGITS else m.group(), message)
+
+
+def _mask(match: re.Match) -> str:
+    return '#' * len(match.group())
+
+
+def accept(slot: str, value: Any, message: str) -> Optional[str]:
+    """The LLM's value for ``slot`` in canonical form, or None if it does not fit the slot
+    or is not something the customer wrote"""
+    if not isinstance(value, (str, int)) or slot not in SLOT_FORMATS:
+        return None
+    value = str(value).strip()
+    if not SLOT_FORMATS[slot].fullmatch(value):
+        return None
+    if slot in DIGIT_SLOTS and value not in _DIGIT_RUN.findall(message):
+        return None
+    if slot == 'card_expiry':
+        month, year = value.split('/')
+        runs = _DIGIT_RUN.findall(message)
+        if month.lstrip('0') not in {run.lstrip('0') for run in runs if len(run) <= 2} \
+                or not (year in runs or '20' + year in runs):
+            return None
+    if slot == 'dob':
+        try:
+            date = dt.date.fromisoformat(value)
+        except ValueError:
+            return None
+        if date > dt.date.today() or not dates.mentions(message.lower(), date):
+            return None
+    if slot == 'full_name':
+        return ' '.join(value.split()).title()
+    if slot == 'card_name':
+        return ' '.join(value.split()).upper()
+    if slot == 'email':
+        return value.lower()
+    return value
+
+
+class TierStats:
+    def __init__(self):
+        self.calls = 0
+        self.lookups = 0  # Calls that had slots to find; hits are counted against these
+        self.hits = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, hit: Optional[bool] = None):
+        self.calls += 1
+        if hit is not None:
+            self.lookups += 1
+            self.hits += hit
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "avg_ms": round(self.seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3),
+        }
+
+
+class TieredExtractor:
+    # Seconds past the deadline before an LLM extractor that ignores it is cancelled
+    BACKSTOP_GRACE = 0.25
+
+    def __init__(self, rules, llm: Optional[LLMExtractor] = None, min_confidence: float = MIN_CONFIDENCE,
+                 llm_timeout: float = 5.0, clock: Callable[[], float] = time.perf_counter):
+        self.rules = rules  # Anything with ``extract_scored`` and ``analyze_intent``, i.e. ``AzureAIClient``
+        self.llm = llm
+        self.min_confidence = min_confidence
+        self.llm_timeout = llm_timeout
+        self.clock = clock
+        self.tiers = {"rules": TierStats(), "llm": TierStats()}
+
+    async def extract_information(self, user_message: str, current_step: ConversationStep,
+                                  deadline: Optional[float] = None, tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Same contract as ``AzureAIClient.extract_information``.
+
+        ``deadline`` (``time.monotonic()``, usually the turn's) and ``tenant``
+        bound the LLM call; it never runs past ``llm_timeout`` either way.
+        """
+        started = self.clock()
+        scored = await self.rules.extract_scored(user_message, current_step)
+        needed = STEP_SLOTS.get(current_step, ())
+        unsure = [slot for slot in needed if slot not in scored or scored[slot][1] < self.min_confidence]
+        self.tiers["rules"].record(self.clock() - started, hit=not unsure if needed else None)
+
+        asked = await self._worth_asking(user_message, unsure) if self.llm is not None else []
+        if asked:
+            deadline = min(deadline or math.inf, time.monotonic() + self.llm_timeout)
+            claimed = [str(value) for slot, (value, _) in scored.items() if slot in PRIVATE_SLOTS]
+            prompt = redact(user_message, asked, claimed)
+            for slot, value in (await self._ask_llm(prompt, user_message, asked, deadline, tenant)).items():
+                scored[slot] = (value, LLM_CONFIDENCE)
+        return {slot: value for slot, (value, _) in scored.items()}
+
+    async def _worth_asking(self, message: str, unsure: Sequence[str]) -> List[str]:
+        """The ``unsure`` slots the LLM may be asked for and could find in ``message``"""
+        lower = message.lower()
+        asked = [slot for slot in unsure
+                 if slot not in PRIVATE_SLOTS and (slot not in SLOT_CUES or SLOT_CUES[slot](lower))]
+        if asked and (await self.rules.analyze_intent(message)).label in ANSWER_INTENTS:
+            return []
+        return asked
+
+    async def _ask_llm(self, prompt: str, message: str, slots: Sequence[str], deadline: float,
+                       tenant: Optional[str]) -> Dict[str, str]:
+        """The LLM's accepted values for ``slots``; it sees ``prompt``, answers are checked against ``message``"""
+        started = self.clock()
+        try:
+            # The extractor honours the deadline itself; wait_for is the backstop, a little
+            # later so the client's own timeout fires first and a hung endpoint still counts
+            found = await asyncio.wait_for(self.llm.extract(prompt, slots, deadline, tenant),
+                                           max(0.0, deadline - time.monotonic()) + self.BACKSTOP_GRACE)
+        except Exception as e:
+            # The rule results (if any) stand; the step asks again as it would have anyway
+            self.tiers["llm"].errors += 1
+            print(f"❌ LLM extraction failed: {e!r}")
+            found = {}
+        accepted = {}
+        for slot in slots:
+            value = accept(slot, found.get(slot), message)
+            if value is not None:
+                accepted[slot] = value
+        self.tiers["llm"].record(self.clock() - started, hit=len(accepted) == len(slots))
+        return accepted
+
+    async def close(self):
+        if self.llm is not None:
+            await self.llm.close()
+
+    def stats(self) -> Dict[str, Any]:
+        rules = self.tiers["rules"]
+        return {
+            "llm_enabled": self.llm is not None,
+            **{name: tier.stats() for name, tier in self.tiers.items()},
+            # Share of slot lookups that needed an LLM round trip
+            "llm_ratio": round(self.tiers["llm"].calls / rules.lookups, 4) if rules.lookups else 0.0,
+            "llm_client": self.llm.stats() if self.llm is not None else {},
+        }
@@ -0,0 +1,178 @@
+"""
+Token-level intent classification for short customer replies.
+
+Replies are lower-cased and split into word tokens once. Every intent phrase
+("yes", "that's not right", "don't send", ...) is a token sequence compiled
+into one Aho-Corasick automaton, so a single left-to-right pass finds every
+phrase of every intent. Matching whole tokens is what keeps "ok" from firing
+inside "book" or "no" inside "know".
+
+Overlapping matches resolve leftmost-longest ("no thanks" beats "no"). A yes
+phrase preceded by a negator within ``NEGATION_WINDOW`` tokens ("not ok",
+"never said yes"), or directly followed by one ("absolutely not", "of course
+not"), counts as no. The label with the largest share of matched
+tokens wins; that share is the confidence. An even split between yes and no
+is ``unknown``.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+YES = "yes"
+NO = "no"
+REFUSAL = "refusal"
+UNKNOWN = "unknown"
+
+PHRASES: Dict[str, Tuple[str, ...]] = {
+    YES: ("yes", "yeah", "yep", "yup", "ya", "correct", "right", "that's right", "affirmative", "sure",
+          "okay", "ok", "true", "absolutely", "of course", "definitely", "i do", "i did", "i have", "got it",
+          "sounds good", "sounds right", "that works"),
+    NO: ("no", "nope", "nah", "incorrect", "wrong", "that's not right", "negative", "not correct", "false",
+         "not yet", "i don't", "i do not", "i didn't", "i did not", "i haven't", "i have not", "haven't",
+         "hasn't", "doesn't", "don't have", "i can't", "i cannot", "can't", "not really", "never"),
+    REFUSAL: ("refuse", "don't want", "do not want", "i don't want", "i do not want", "no thanks", "no thank you",
+              "not interested", "don't send", "no texts", "rather not", "not comfortable", "won't provide",
+              "don't give", "will not provide", "not giving"),
+    # Hedges: matched so that the "sure" inside "not sure" is not read as a yes
+    UNKNOWN: ("not sure", "i don't know", "maybe", "i guess", "not really sure", "no idea", "i have no idea"),
+}
+
+NEGATORS = frozenset(("not", "never", "don't", "doesn't", "didn't", "haven't", "hasn't", "hadn't", "isn't",
+                      "aren't", "wasn't", "weren't", "ain't", "can't", "cannot", "couldn't", "won't", "wouldn't"))
+NEGATION_WINDOW = 2
+# Negate the yes phrase right before them: "absolutely not", "definitely never"
+TRAILING_NEGATORS = frozenset(("not", "never"))
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "`": "'"})
+# Apostrophe-less spellings people type
+_SPELLINGS = {"dont": "don't", "doesnt": "doesn't", "didnt": "didn't", "wont": "won't", "wouldnt": "wouldn't",
+              "havent": "haven't", "hasnt": "hasn't", "hadnt": "hadn't", "thats": "that's", "isnt": "isn't",
+              "arent": "aren't", "wasnt": "wasn't", "werent": "weren't", "cant": "can't", "couldnt": "couldn't",
+              "aint": "ain't", "okey": "okay"}
+
+
+def tokenize(text: str) -> List[str]:
+    text = text.lower()
+    if not text.isascii():
+        text = text.translate(_APOSTROPHES)
+    spellings = _SPELLINGS
+    return [spellings.get(token, token) for token in _TOKEN.findall(text)]
+
+
+class Intent(NamedTuple):
+    label: str
+    confidence: float
+
+
+class _Match(NamedTuple):
+    start: int
+    end: int  # Exclusive token index
+    label: str
+
+
+class IntentClassifier:
+    def __init__(self, phrases: Optional[Dict[str, Iterable[str]]] = None):
+        phrases = PHRASES if phrases is None else phrases
+        # Trie over tokens: goto[node][token] -> node; output[node] -> (phrase length, label) ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        for label, entries in phrases.items():
+            for phrase in entries:
+                self._add(tokenize(phrase), label)
+        self._fail = self._link()
+
+    def _add(self, tokens: Sequence[str], label: str):
+        node = 0
+        for token in tokens:
+            following = self._goto[node].get(token)
+            if following is None:
+                following = len(self._goto)
+                self._goto[node][token] = following
+                self._goto.append({})
+                self._output.append([])
+            node = following
+        self._output[node].append((len(tokens), label))
+
+    def _link(self) -> List[int]:
+        """Breadth-first failure links; each node also inherits its fallback's outputs"""
+        fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())  # Depth one: fail to the root
+        for node in queue:
+            for token, child in self._goto[node].items():
+                fallback = fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] = self._output[child] + self._output[fail[child]]
+                queue.append(child)
+        return fail
+
+    def matches(self, tokens: Sequence[str]) -> List[_Match]:
+        """Every phrase occurrence, in one pass over the tokens"""
+        found = []
+        node = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for index, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for length, label in output[node]:
+                found.append(_Match(index + 1 - length, index + 1, label))
+        return found
+
+    def classify(self, text: str) -> Intent:
+        tokens = tokenize(text)
+        chosen = _leftmost_longest(self.matches(tokens))
+        if not chosen:
+            return Intent(UNKNOWN, 0.0)
+
+        # Insertion order breaks ties: a refusal is the more specific no, and a hedge outweighs a yes
+        scores = {REFUSAL: 0, NO: 0, UNKNOWN: 0, YES: 0}
+        total = 0
+        for start, end, label in chosen:
+            if label == YES and _negated(tokens, start, end):
+                label = NO
+            scores[label] += end - start
+            total += end - start
+        best = max(scores, key=scores.__getitem__)
+        confidence = round(scores[best] / total, 2)
+        if best in (YES, NO) and scores[YES] == scores[NO]:
+            return Intent(UNKNOWN, confidence)
+        return Intent(best, confidence)
+
+    def classify_batch(self, texts: Iterable[str]) -> List[Intent]:
+        """``classify`` for each text; repeated texts ("yes", "no") are classified once"""
+        seen: Dict[str, Intent] = {}
+        classify = self.classify
+        results = []
+        for text in texts:
+            intent = seen.get(text)
+            if intent is None:
+                intent = seen[text] = classify(text)
+            results.append(intent)
+        return results
+
+
+def _leftmost_longest(found: List[_Match]) -> List[_Match]:
+    chosen = []
+    covered_until = 0
+    if len(found) < 2:
+        return found
+    for match in sorted(found, key=lambda m: (m.start, m.start - m.end)):
+        if match.start >= covered_until:
+            chosen.append(match)
+            covered_until = match.end
+    return chosen
+
+
+def _negated(tokens: Sequence[str], start: int, end: int) -> bool:
+    if end < len(tokens) and tokens[end] in TRAILING_NEGATORS:
+        return True
+    return start > 0 and not NEGATORS.isdisjoint(tokens[max(0, start - NEGATION_WINDOW):start])
+
+
+CLASSIFIER = IntentClassifier()
+
+
+def classify(text: str) -> Intent:
+    return CLASSIFIER.classify(text)
@@ -0,0 +1,307 @@
+"""
+Async client for OpenAI-compatible chat completion endpoints.
+
+A model round trip takes seconds, so it must never block the event loop or
+hold up unrelated turns:
+
+- one ``httpx.AsyncClient`` per process, so connections are pooled and kept
+  alive instead of a TLS handshake per call
+- a global semaphore caps calls in flight; a per-tenant one (the client IP by
+  default) keeps one caller from taking every slot
+- every call has a deadline, normally what is left of the turn's budget;
+  waiting for a slot, each attempt and each backoff all come out of it
+- 429s, 5xx and connection errors are retried with full-jitter exponential
+  backoff (honouring ``retry-after``) while the deadline allows
+- after ``failure_threshold`` failed calls in a row the circuit breaker opens
+  and calls fail fast; after ``reset_timeout`` one probe call is let through.
+  Only the endpoint's own failures count (connection errors, timeouts on the
+  wire, retryable statuses): a caller cancelling or running out of budget
+  before any attempt finished says nothing about the endpoint
+
+``python -m app.utils.llm_stub`` serves the same API locally for load tests.
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+RETRYABLE_STATUS = frozenset((408, 429, 500, 502, 503, 504))
+DEFAULT_TENANT = "default"
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMUnavailable(LLMError):
+    """The circuit breaker is open: the endpoint failed too often recently"""
+
+
+class LLMDeadlineExceeded(LLMError):
+    pass
+
+
+class LLMResponseError(LLMError):
+    """The endpoint rejected the request itself (4xx other than 408/429); retrying will not help"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"LLM endpoint answered {status}: {body[:200]}")
+        self.status = status
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self._probing or self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """May a call go out now? In half-open state only one (the probe) may"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()  # A failed probe waits out another reset_timeout
+        self._probing = False
+
+    def release(self):
+        """A call that was let through ended without a verdict on the endpoint; another may probe"""
+        self._probing = False
+
+
+class LLMClient:
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model: str = "gpt-4.1",
+                 azure_api_version: Optional[str] = None, max_concurrency: int = 16, per_tenant: int = 4,
+                 timeout: float = 10.0, max_attempts: int = 3, backoff: float = 0.2, max_backoff: float = 2.0,
+                 breaker: Optional[CircuitBreaker] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        base_url = base_url.rstrip("/")
+        headers = {}
+        if azure_api_version:
+            # Azure OpenAI: the deployment is in the path and the key goes in its own header
+            self.url = f"{base_url}/openai/deployments/{model}/chat/completions?api-version={azure_api_version}"
+            if api_key:
+                headers["api-key"] = api_key
+        else:
+            self.url = f"{base_url}/chat/completions"
+            if api_key:
+                headers["Authorization"] = f"Bearer {api_key}"
+        self.model = model
+        self.http = httpx.AsyncClient(
+            headers=headers, transport=transport,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency))
+        self.max_concurrency = max_concurrency
+        self.per_tenant = per_tenant
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # tenant -> [semaphore, callers holding or waiting for it]; dropped when nobody is
+        self._tenants: Dict[str, list] = {}
+        self._in_flight = 0
+        self._seconds = 0.0
+        self._max_seconds = 0.0
+        self._counters = dict.fromkeys(
+            ("requests", "succeeded", "failed", "retries", "rejected", "deadline_exceeded"), 0)
+
+    async def chat(self, messages: List[Dict[str, str]], deadline: Optional[float] = None,
+                   tenant: Optional[str] = None, **params: Any) -> str:
+        """The reply's content. ``deadline`` is a ``time.monotonic()`` value (default: ``timeout`` from now)"""
+        deadline = deadline if deadline is not None else time.monotonic() + self.timeout
+        self._counters["requests"] += 1
+        started = time.monotonic()
+        try:
+            if self.breaker.state == CircuitBreaker.OPEN:
+                raise LLMUnavailable("LLM circuit breaker is open")  # Fail fast, without queueing for a slot
+            async with _Slot(self, tenant or DEFAULT_TENANT, deadline):
+                if not self.breaker.allow():
+                    raise LLMUnavailable("LLM circuit breaker is open")
+                content = await self._call({"model": self.model, "messages": messages, **params}, deadline)
+        except LLMUnavailable:
+            self._counters["rejected"] += 1
+            raise
+        except LLMDeadlineExceeded:
+            self._counters["deadline_exceeded"] += 1
+            raise
+        except LLMError:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            self._seconds += elapsed
+            self._max_seconds = max(self._max_seconds, elapsed)
+        self._counters["succeeded"] += 1
+        return content
+
+    async def _call(self, body: Dict[str, Any], deadline: float) -> str:
+        """``_attempts``, recording on the breaker whether the endpoint is working"""
+        answered: List[bool] = []  # Per finished attempt: did the endpoint answer (even a 4xx)?
+        cancelled = False
+        try:
+            return await self._attempts(body, deadline, answered)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # The last finished attempt decides; a cancelled caller, or one out of time
+            # before any attempt finished, hands a probe back without a verdict
+            if cancelled or not answered:
+                self.breaker.release()
+            elif answered[-1]:
+                self.breaker.success()
+            else:
+                self.breaker.failure()
+
+    async def _attempts(self, body: Dict[str, Any], deadline: float, answered: List[bool]) -> str:
+        last_error: Optional[Exception] = None
+        for attempt in range(1, self.max_attempts + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMDeadlineExceeded(f"LLM call ran out of time ({last_error!r})")
+            retry_after = None
+            try:
+                response = await self.http.post(self.url, json=body, timeout=remaining)
+            except httpx.TransportError as e:  # Timeouts included
+                answered.append(False)
+                last_error = e
+            else:
+                answered.append(response.status_code not in RETRYABLE_STATUS)
+                if response.status_code == 200:
+                    try:
+                        return response.json()["choices"][0]["message"]["content"] or ""
+                    except (ValueError, LookupError, TypeError):
+                        raise LLMError(f"malformed LLM response: {response.text[:200]}") from None
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise LLMResponseError(response.status_code, response.text)
+                last_error = LLMError(f"LLM endpoint answered {response.status_code}")
+                retry_after = _retry_after(response.headers)
+
+            if attempt == self.max_attempts:
+                break
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise LLMDeadlineExceeded(f"no time left to retry ({last_error!r})")
+            self._counters["retries"] += 1
+            await asyncio.sleep(delay)
+        if time.monotonic() >= deadline:
+            raise LLMDeadlineExceeded(f"LLM call ran out of time ({last_error!r})")
+        raise LLMError(f"LLM call failed after {self.max_attempts} attempts: {last_error!r}")
+
+    async def close(self):
+        await self.http.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._counters["requests"]
+        return {
+            "in_flight": self._in_flight,
+            "tenants": len(self._tenants),
+            "breaker": self.breaker.state,
+            **self._counters,
+            "avg_ms": round(self._seconds / calls * 1000, 3) if calls else 0.0,
+            "max_ms": round(self._max_seconds * 1000, 3),
+        }
+
+
+class _Slot:
+    """Holds a tenant slot, then a global one, for the duration of a call"""
+
+    def __init__(self, client: LLMClient, tenant: str, deadline: float):
+        self.client = client
+        self.tenant = tenant
+        self.deadline = deadline
+        self.held = []
+
+    async def __aenter__(self):
+        client = self.client
+        entry = client._tenants.get(self.tenant)
+        if entry is None:
+            entry = client._tenants[self.tenant] = [asyncio.Semaphore(client.per_tenant), 0]
+        entry[1] += 1
+        try:
+            # Tenant first: a tenant over its share waits without taking a global slot
+            for semaphore in (entry[0], client._slots):
+                remaining = self.deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(semaphore.acquire(), remaining)
+                self.held.append(semaphore)
+        except asyncio.TimeoutError:
+            self._release()
+            raise LLMDeadlineExceeded("no LLM slot free before the deadline") from None
+        except BaseException:
+            self._release()
+            raise
+        client._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.client._in_flight -= 1
+        self._release()
+
+    def _release(self):
+        for semaphore in reversed(self.held):
+            semaphore.release()
+        self.held.clear()
+        entry = self.client._tenants[self.tenant]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.client._tenants[self.tenant]
+
+
+def _retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Seconds the server asked us to wait (OpenAI sends ``retry-after-ms`` as well)"""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value) * scale
+            except ValueError:
+                return None  # An HTTP date; the jittered backoff will do
+    return None
+
+
+def create_llm_client() -> Optional[LLMClient]:
+    """From ``LLM_BASE_URL`` (any OpenAI-compatible server, e.g. the stub) or Azure OpenAI settings; else None"""
+    base_url = os.environ.get("LLM_BASE_URL")
+    if base_url:
+        return LLMClient(base_url, os.environ.get("LLM_API_KEY"), os.environ.get("LLM_MODEL", "gpt-4.1"))
+    endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    api_key = os.environ.get("AZURE_OPENAI_API_KEY")
+    if endpoint and api_key:
+        return LLMClient(endpoint, api_key, os.environ.get("AZURE_OPENAI_DEPLOYMENT", "gpt-4.1"),
+                         azure_api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"))
+    return None
@@ -0,0 +1,105 @@
+"""
+Compiled pattern registry for the extraction layer.
+
+Every regular expression used by ``AzureAIClient`` is compiled once, at
+import time, and grouped by the slot it extracts. Dates of birth are not
+matched here but by the token parser in ``app.core.dates``.
+
+Messages come straight from the client, so every pattern must run in time
+linear in the message:
+
+- whitespace between tokens is matched possessively (``\s*+``), so a run of
+  spaces is never re-split between two adjacent ``\s*`` before failing
+- free-text captures are bounded (``NAME_CHARS``), so a failed attempt costs
+  at most that many steps rather than the rest of the message
+- email matches may only start where a run of local-part characters starts,
+  so a long run without an ``@`` is scanned once, not once per position
+"""
+import re
+from typing import Tuple, Pattern
+
+HAS_DIGIT = re.compile(r'\d')
+# Longest name a capture may return (``Slots.full_name`` allows 100)
+NAME_CHARS = 100
+
+# Name extraction - tried in order, the last one is the "whole message" fallback
+NAME_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p.replace('NAME', rf'(.{{1,{NAME_CHARS}}}?)'), re.IGNORECASE)
+                                          for p in (
+    r"my name is NAME(?:\.|$|,|\sand\s)",
+    r"i'm NAME(?:\.|$|,|\sand\s)",
+    r"i am NAME(?:\.|$|,|\sand\s)",
+    r"call me NAME(?:\.|$|,|\sand\s)",
+    r"this is NAME(?:\.|$|,|\sand\s)",
+    r"^NAME(?:\.|$)",
+))
+# Only unambiguous cues may capture a name outside of the ASK_NAME step
+NAME_CUE_PATTERNS: Tuple[Pattern, ...] = (NAME_PATTERNS[0], NAME_PATTERNS[3])
+# Where a bare "John Smith, born 01/15/1990" style answer stops being a name
+NAME_CLAUSE_BREAK = re.compile(r"[,;]|\s(?:and|born|dob|ssn|social|email|birthday|my)\b", re.IGNORECASE)
+NAME_FILLER = re.compile(r'\b(speaking|here|from|the|customer|client)\b', re.IGNORECASE)
+NAME_WORD = re.compile(r"[a-zA-Z\-'\.]+")
+
+# Email - LOCAL is the local part, only matched from the start of a run of its characters
+_LOCAL = r'(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]++'
+EMAIL_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p.replace('LOCAL', _LOCAL), re.IGNORECASE) for p in (
+    r'\b(LOCAL@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b',  # Standard email
+    r'(?:email|address|update|new|change)\s++(?:is\s++|to\s++)?(LOCAL@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'(LOCAL@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',  # Simple fallback
+))
+EMAIL_STANDARD = EMAIL_PATTERNS[0]
+EMAIL_FLEXIBLE = re.compile(rf'({_LOCAL}@[a-zA-Z0-9.-]+)')
+EMAIL_HAS_TLD = re.compile(r'\.[a-zA-Z]{2,}$')
+EMAIL_FULL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# SSN last 4
+SSN_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p) for p in (
+    r"(?:last|final|end)\s*+(?:four|4)\s*+(?:digits?|numbers?)\s*+(?:are|is)?\s*+(\d{4})",
+    r"(?:ssn|social)\s*+(?:ends?|ending)\s*+(?:in|with)?\s*+(\d{4})",
+    r"\b(\d{4})\b",  # Simple 4-digit fallback
+))
+SSN_CUE_PATTERNS = SSN_PATTERNS[:2]
+
+# SMS verification code
+SMS_CODE_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p) for p in (
+    r"(?:code|verification)\s*+(?:is|was)?\s*+(\d{6})",
+    r"(?:received|got)\s*+(\d{6})",
+    r"\b(\d{6})\b",  # Simple 6-digit fallback
+))
+SMS_CODE_CUE_PATTERNS = SMS_CODE_PATTERNS[:2]
+
+# Bank account and routing numbers
+ACCOUNT_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p) for p in (
+    r"account\s++(?:number\s++)?(?:is\s++)?(\d{8,12})",
+    r"checking\s++(?:account\s++)?(?:is\s++)?(\d{8,12})",
+    r"savings\s++(?:account\s++)?(?:is\s++)?(\d{8,12})",
+    r"\b(\d{8,12})\b",  # Fallback: any 8-12 digit number
+))
+ROUTING_PATTERNS: Tuple[Pattern, ...] = tuple(re.compile(p) for p in (
+    r"routing\s++(?:number\s++)?(?:is\s++)?(\d{9})",
+    r"transit\s++(?:number\s++)?(?:is\s++)?(\d{9})",
+    r"\b(\d{9})\b",  # Fallback: any 9 digit number
+))
+ACCOUNT_CUE_PATTERNS = ACCOUNT_PATTERNS[:3]
+ROUTING_CUE_PATTERNS = ROUTING_PATTERNS[:2]
+
+# Debit card
+CARD_NUMBER = re.compile(r'\b(\d{16})\b')
+CARD_CVV = re.compile(r'\b(\d{3,4})\b')
+CARD_EXPIRY = re.compile(r'(\d{1,2})/(\d{2})')
+# Words around card details that the name-on-card fallback would otherwise take for a name
+CARD_WORDS = frozenset(('card', 'cvv', 'cvc', 'security', 'code', 'exp', 'expiry', 'expires', 'expiration',
+                        'number', 'name', 'on', 'is', 'my', 'the', 'and'))
+
+
+def first_match(patterns: Tuple[Pattern, ...], text: str):
+    """Return the first match from an ordered pattern list, or None"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def mask(text: str, start: int, end: int) -> str:
+    """Blank out a claimed span so later, looser patterns cannot reuse its characters"""
+    return text[:start] + ' ' * (end - start) + text[end:]
@@ -0,0 +1,110 @@
+"""
+Bounded read-through cache with TTL, LRU eviction and single-flight loads.
+
+``get(key)`` returns the cached value while it is fresh; otherwise it calls
+the loader. Concurrent misses for one key share a single load, so a burst of
+callers asking for the same customer costs one database round trip. Failed
+loads are not cached; every caller waiting on that load sees the error.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class ReadThroughCache(Generic[V]):
+    def __init__(self, loader: Callable[[Hashable], Awaitable[V]], ttl: float = 300.0,
+                 max_entries: int = 50_000, negative_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """``negative_ttl`` (default: ``ttl``) applies to ``None`` results, e.g. unknown customers"""
+        self.loader = loader
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        # key -> (value, expires_at), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._counters = dict.fromkeys(("hits", "misses", "coalesced", "loads", "load_errors",
+                                        "evictions", "expirations", "invalidations"), 0)
+
+    async def get(self, key: Hashable) -> V:
+        value = self._fresh(key)
+        if value is not _MISSING:
+            self._counters["hits"] += 1
+            return value
+
+        self._counters["misses"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._load(key))
+        else:
+            self._counters["coalesced"] += 1
+        # A caller giving up must not cancel the load others are waiting for
+        return await asyncio.shield(task)
+
+    def _fresh(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            self._counters["expirations"] += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    async def _load(self, key: Hashable) -> V:
+        self._counters["loads"] += 1
+        try:
+            value = await self.loader(key)
+        except BaseException:
+            self._counters["load_errors"] += 1
+            self._finish_load(key)
+            raise
+        if self._finish_load(key):
+            self._store(key, value)
+        # Otherwise the key was invalidated mid-load: the waiters get the value, the cache does not
+        return value
+
+    def _finish_load(self, key: Hashable) -> bool:
+        """Clear this load's in-flight marker; False if it was invalidated meanwhile"""
+        if self._inflight.get(key) is asyncio.current_task():
+            del self._inflight[key]
+            return True
+        return False
+
+    def _store(self, key: Hashable, value: V):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (value, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Forget ``key`` now, including a load already in progress"""
+        removed = self._entries.pop(key, None) is not None
+        removed = self._inflight.pop(key, None) is not None or removed
+        if removed:
+            self._counters["invalidations"] += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "loading": len(self._inflight),
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
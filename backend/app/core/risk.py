@@ -0,0 +1,142 @@
+"""
+Session risk scoring.
+
+The score is a weighted sum of a handful of signals a conversation gives off
+(failed verification attempts, refusing the SMS code, changing the e-mail
+address, being paid by paper check, entering an invalid card, answering
+faster than a person reads) clipped to ``[0, 1]``.
+
+Signals live in ``ConversationState.risk_signals`` next to the running
+``score``. ``update`` runs once per turn and only adds ``weight * change`` for
+the signals that moved, and events the handlers see directly are counted with
+``record``, so the score is already current when the application reaches its
+decision. ``score_batch`` applies the same weights to many stored sessions at
+once.
+"""
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from app.models.schemas import ConversationState, VerificationResult
+
+
+class Signal(NamedTuple):
+    name: str
+    weight: float
+    # Read the signal off the session; None for event counters bumped by ``record``
+    measure: Optional[Callable[[ConversationState], float]] = None
+
+
+SIGNALS: Tuple[Signal, ...] = (
+    Signal("failed_attempts", 0.15, lambda s: s.verification_attempts),
+    Signal("sms_refused", 0.30, lambda s: s.sms_code_refused),
+    Signal("sms_retries", 0.05, lambda s: s.sms_retry_count),
+    Signal("paper_check", 0.10, lambda s: s.slots_filled.get("paycheck_type") == "paper check"),
+    Signal("email_changes", 0.10),
+    Signal("invalid_cards", 0.15),
+    Signal("rushed_turns", 0.05),
+)
+
+_WEIGHTS = {signal.name: signal.weight for signal in SIGNALS}
+_MEASURED = tuple(signal for signal in SIGNALS if signal.measure is not None)
+
+# A reply this soon after the previous one was not typed by someone reading the question
+RUSHED_SECONDS = 1.5
+
+REVIEW_AT = 0.3
+ESCALATE_AT = 0.6
+
+NEXT_ACTIONS = {
+    "approved": "fund_loan",
+    "pending": "manual_review",
+    "rejected": "decline",
+    "escalate": "transfer_to_specialist",
+}
+
+
+def record(state: ConversationState, signal: str, count: float = 1.0):
+    """Count an event the handlers observe directly, e.g. an invalid card"""
+    risk = state.risk_signals
+    risk[signal] = risk.get(signal, 0.0) + count
+    risk["score"] = risk.get("score", 0.0) + _WEIGHTS[signal] * count
+
+
+def update(state: ConversationState, now: Optional[float] = None):
+    """Fold this turn into the running score: re-measure signals and time the reply"""
+    now = time.time() if now is None else now
+    risk = state.risk_signals
+    score = risk.get("score", 0.0)
+    for signal in _MEASURED:
+        value = float(signal.measure(state))
+        previous = risk.get(signal.name, 0.0)
+        if value != previous:
+            score += signal.weight * (value - previous)
+            risk[signal.name] = value
+    risk["score"] = score
+
+    # Wall clock: consecutive turns may be served by different workers
+    last_turn_at = risk.get("last_turn_at")
+    if last_turn_at is not None and now - last_turn_at < RUSHED_SECONDS:
+        record(state, "rushed_turns")
+    risk["last_turn_at"] = now
+
+
+def risk_score(state: ConversationState) -> float:
+    return min(1.0, max(0.0, state.risk_signals.get("score", 0.0)))
+
+
+def status_for(score: float, failure_reasons: Sequence[str]) -> str:
+    if score >= ESCALATE_AT:
+        return "escalate"
+    if failure_reasons:
+        return "rejected"
+    if score >= REVIEW_AT:
+        return "pending"
+    return "approved"
+
+
+def verification_result(state: ConversationState) -> VerificationResult:
+    """The verification outcome for a session, from flags and the running score"""
+    identity_verified = state.dob_verified and state.ssn_verified and state.email_verified
+    account_matched = state.bank_account_verified
+    email_confirmed = state.email_usage_confirmed
+    employment_verified = bool(state.slots_filled.get("employment_status"))
+
+    failure_reasons = []
+    if not identity_verified:
+        failure_reasons.append("Identity not verified")
+    if not account_matched:
+        failure_reasons.append("Bank account not matched")
+    if state.sms_code_refused:
+        failure_reasons.append("SMS verification refused")
+
+    score = risk_score(state)
+    status = status_for(score, failure_reasons)
+    return VerificationResult(
+        identity_verified=identity_verified,
+        account_matched=account_matched,
+        email_confirmed=email_confirmed,
+        employment_verified=employment_verified,
+        risk_score=round(score, 4),
+        verification_status=status,
+        failure_reasons=failure_reasons,
+        next_action=NEXT_ACTIONS[status],
+    )
+
+
+def score_batch(records: Sequence[Dict[str, float]], signals: Tuple[Signal, ...] = SIGNALS) -> np.ndarray:
+    """Scores for many stored ``risk_signals`` dicts, recomputed from the signals
+
+    Re-weighting ``signals`` re-scores history without replaying conversations.
+    """
+    features = np.zeros((len(records), len(signals)))
+    for column, signal in enumerate(signals):
+        name = signal.name
+        features[:, column] = np.fromiter((record.get(name, 0.0) for record in records),
+                                          dtype=float, count=len(records))
+    weights = np.array([signal.weight for signal in signals])
+    return np.clip(features @ weights, 0.0, 1.0)
+
+
+def statuses(scores: np.ndarray) -> np.ndarray:
+    """Risk-only status per score (flag-based rejections need the full session)"""
+    return np.select([scores >= ESCALATE_AT, scores >= REVIEW_AT], ["escalate", "pending"], "approved")
@@ -0,0 +1,89 @@
+"""
+Hashed timing wheel for server-side delayed actions.
+
+Scheduling and cancelling are O(1). A single ticker task advances the wheel
+for the whole process, so a pending timer costs one dict entry - it never
+holds a request, a connection or a coroutine of its own while it waits.
+"""
+import asyncio
+import itertools
+import math
+from typing import Any, Callable, Dict, Optional
+
+
+class _Timer:
+    __slots__ = ("slot", "rounds", "callback", "args")
+
+    def __init__(self, slot: int, rounds: int, callback: Callable[..., Any], args: tuple):
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+
+
+class TimingWheel:
+    def __init__(self, tick: float = 0.25, slots: int = 512):
+        self.tick = tick
+        self.wheel = [dict() for _ in range(slots)]
+        self._cursor = 0
+        self._timers: Dict[int, _Timer] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> int:
+        """Run ``callback(*args)`` after roughly ``delay`` seconds; returns a timer id"""
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % len(self.wheel)
+        timer_id = next(self._ids)
+        timer = _Timer(slot, (ticks - 1) // len(self.wheel), callback, args)
+        self.wheel[slot][timer_id] = timer
+        self._timers[timer_id] = timer
+        self._ensure_running()
+        return timer_id
+
+    def cancel(self, timer_id: int) -> bool:
+        timer = self._timers.pop(timer_id, None)
+        if timer is None:
+            return False
+        del self.wheel[timer.slot][timer_id]
+        return True
+
+    def advance(self):
+        """Move the wheel one tick and fire every timer that is due"""
+        self._cursor = (self._cursor + 1) % len(self.wheel)
+        bucket = self.wheel[self._cursor]
+        due = []
+        for timer_id, timer in bucket.items():
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                due.append(timer_id)
+        for timer_id in due:
+            timer = bucket.pop(timer_id)
+            del self._timers[timer_id]
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                print(f"❌ Scheduled callback failed: {e}")
+
+    def _ensure_running(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop yet - the ticker starts with the first timer scheduled inside one
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while self._timers:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on ticks missed while the loop was busy instead of drifting
+            while loop.time() >= next_tick:
+                self.advance()
+                next_tick += self.tick
+        self._task = None
@@ -32,6 +32,7 @@ class ScriptManager:
             "code_received": "Great. Can you please provide me with the 6-digit code in the message?",
             "code_not_received": "Not a problem. Let's give it a moment to see if it comes in.",
             "wait_5_seconds": "Let's wait 5 seconds to see if the code arrives.",
+            "code_wait_follow_up": "It's been a few seconds. Have you received the text message with the code yet?",
             "still_no_code": "Since you haven't received the code by now, let's continue with the process. If at any time during our conversation you receive the text, please let me know.",
             "continue_after_wait": "I appreciate that information, let's continue with your application.",
             "code_refusal": "Not a problem, we can continue without the code, however this verification will ensure you receive important payment reminder during your loan. If you do receive the code, please let me know.",
@@ -55,6 +56,7 @@ class ScriptManager:
             "debit_card_confirm": "Thank you for the information. To ensure we have accurate information can you please repeat the information one more time.",
             "debit_card_refusal": "Unfortunately, a debit card is required. Without the associated debit card, I am afraid we cannot continue the loan process.",
             "debit_card_invalid": "This Card number is not valid. Please update the card number or switch AutoPay to ACH",
+            "debit_card_not_debit": "That looks like a {card_type} card. We can only accept a debit card linked to your bank account - could you provide your debit card details instead?",
             
             # Loan Status
             "loan_approved": "Continue to Collect Debit Card Info",
@@ -0,0 +1,54 @@
+"""
+Per-session serialization for ConversationManager.
+
+``SessionLocks`` hands out one FIFO lock per session, so turns for the same
+conversation run one at a time in arrival order while other conversations
+are not held up. Locks are reference counted: an entry exists only while a
+turn holds or waits for it, so the table stays as small as the number of
+conversations that are busy right now, not the number ever seen. One dict
+is enough, since every turn in a worker runs on the same event loop.
+
+This orders turns within one worker; across workers the session store's
+version check is what catches overlapping writes.
+"""
+import asyncio
+import contextlib
+from typing import AsyncIterator, Dict
+
+
+class _SessionLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # Wakes waiters first-come first-served
+        self.users = 0
+
+
+class SessionLocks:
+    def __init__(self):
+        self._locks: Dict[str, _SessionLock] = {}
+        self._contended = 0
+
+    @contextlib.asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        locks = self._locks
+        entry = locks.get(session_id)
+        if entry is None:
+            entry = locks[session_id] = _SessionLock()
+        elif entry.users:
+            self._contended += 1
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if not entry.users:
+                del locks[session_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "busy_sessions": len(self._locks),
+            "waiting_turns": sum(entry.users - 1 for entry in self._locks.values()),
+            "contended_acquires": self._contended,
+        }
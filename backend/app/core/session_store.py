@@ -0,0 +1,319 @@
+"""
+Session storage for ConversationManager.
+
+``SessionStore`` is the interface the manager talks to. Every state carries a
+``version`` and ``put`` is a compare-and-set on it, so when several workers
+serve the same conversation a stale write raises ``SessionConflict`` instead
+of silently overwriting a newer turn.
+
+``InMemorySessionStore`` keeps sessions as ``CompactState`` and bounds memory
+with an idle TTL plus a hard cap on entries and bytes, evicting
+least-recently-used sessions first. Given a ``SessionJournal`` it also
+survives restarts.
+``RedisSessionStore`` keeps sessions in any Redis-protocol server so
+``/chat/message`` can land on any uvicorn worker.
+"""
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from app.models.schemas import ConversationState
+from app.models.compact_state import CompactState
+from app.core.session_journal import SessionJournal
+
+
+class SessionConflict(Exception):
+    """The session was changed by someone else since it was loaded"""
+
+
+def encode_state(state: ConversationState, version: Optional[int] = None) -> bytes:
+    """Compact wire format: ``<version>|<json without default fields>``"""
+    body = state.model_dump_json(exclude_defaults=True, exclude={"version"})
+    return b"%d|%s" % (state.version if version is None else version, body.encode())
+
+
+def decode_state(payload: bytes) -> ConversationState:
+    version, _, body = payload.partition(b"|")
+    state = ConversationState.model_validate_json(body)
+    state.version = int(version)
+    return state
+
+
+def decode_version(payload: bytes) -> int:
+    """Read the version without parsing the JSON body"""
+    return int(payload[:payload.index(b"|")])
+
+
+class SessionStore(ABC):
+    """Where conversation state lives between turns"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[ConversationState]:
+        """Load a session and count it as activity"""
+
+    @abstractmethod
+    async def peek(self, session_id: str) -> Optional[ConversationState]:
+        """Load a session without refreshing its idle timer"""
+
+    @abstractmethod
+    async def put(self, state: ConversationState, touch: bool = True):
+        """Save a session if nobody else saved it since it was loaded.
+
+        Raises ``SessionConflict`` otherwise. On success ``state.version`` is
+        bumped. ``touch=False`` keeps the idle timer where it was.
+        """
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, int]:
+        ...
+
+    async def contains(self, session_id: str) -> bool:
+        return await self.peek(session_id) is not None
+
+    async def close(self):
+        """Release connections; the store must not be used afterwards"""
+
+
+class _Entry:
+    __slots__ = ("state", "last_access", "size")
+
+    def __init__(self, state: CompactState, last_access: float, size: int):
+        self.state = state
+        self.last_access = last_access
+        self.size = size
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store with idle TTL and LRU eviction.
+
+    Entries are kept in last-access order, so the idle ones are always at the
+    front: both eviction and the background sweep stop at the first live
+    entry and do work proportional to what they remove.
+
+    Like the Redis store, reads hand out a copy: changes only land on
+    ``put``, which is what makes the version check meaningful here too.
+    """
+
+    def __init__(self, idle_ttl: float = 30 * 60, max_sessions: int = 10_000,
+                 max_bytes: int = 64 * 1024 * 1024, sweep_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic, journal: Optional[SessionJournal] = None):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self.journal = journal
+        if journal is not None:
+            self._restore(journal)
+
+    def _restore(self, journal: SessionJournal):
+        sessions, stats = journal.recover()
+        now = self.clock()
+        # Recovered sessions get a fresh idle timer: downtime is not customer inactivity
+        for session_id, compact in sessions.items():
+            size = len(encode_state(compact.to_model()))
+            self._entries[session_id] = _Entry(compact, now, size)
+            self._bytes += size
+        if sessions:
+            print(f"♻️ Recovered {stats['sessions']} sessions ({stats['snapshot_records']} snapshot + "
+                  f"{stats['journal_records']} journal records) in {stats['milliseconds']}ms")
+
+    async def get(self, session_id: str) -> Optional[ConversationState]:
+        entry = self._live_entry(session_id)
+        if entry is None:
+            return None
+        entry.last_access = self.clock()
+        self._entries.move_to_end(session_id)
+        return entry.state.to_model()
+
+    async def peek(self, session_id: str) -> Optional[ConversationState]:
+        entry = self._live_entry(session_id)
+        return entry.state.to_model() if entry else None
+
+    async def put(self, state: ConversationState, touch: bool = True):
+        previous = self._live_entry(state.session_id)
+        if (previous.state.version if previous is not None else 0) != state.version:
+            raise SessionConflict(state.session_id)
+        state.version += 1
+
+        compact = CompactState.from_model(state)
+        size = len(encode_state(state))
+        if self.journal is not None:
+            self.journal.record_put(compact, previous.state if previous is not None else None)
+        if previous is None:
+            self._entries[state.session_id] = _Entry(compact, self.clock(), size)
+            self._bytes += size
+        else:
+            self._bytes += size - previous.size
+            previous.state, previous.size = compact, size
+            if touch:
+                previous.last_access = self.clock()
+                self._entries.move_to_end(state.session_id)
+
+        # Evict least recently used sessions, but never the one just saved
+        while len(self._entries) > 1 and (len(self._entries) > self.max_sessions or self._bytes > self.max_bytes):
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._evictions += 1
+            self._journal_delete(evicted_id)
+
+        if self.journal is not None and self.journal.needs_snapshot:
+            self.journal.snapshot(entry.state for entry in self._entries.values())
+        self._ensure_sweeper()
+
+    async def delete(self, session_id: str) -> bool:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        self._journal_delete(session_id)
+        return True
+
+    def sweep(self) -> int:
+        """Drop every session idle for longer than the TTL; returns how many"""
+        cutoff = self.clock() - self.idle_ttl
+        removed = 0
+        while self._entries:
+            session_id, entry = next(iter(self._entries.items()))
+            if entry.last_access > cutoff:
+                break
+            del self._entries[session_id]
+            self._bytes -= entry.size
+            self._journal_delete(session_id)
+            removed += 1
+        self._expirations += removed
+        return removed
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "live_sessions": len(self._entries),
+            "bytes_used": self._bytes,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live_entry(self, session_id: str) -> Optional[_Entry]:
+        entry = self._entries.get(session_id)
+        if entry is not None and self.clock() - entry.last_access > self.idle_ttl:
+            del self._entries[session_id]
+            self._bytes -= entry.size
+            self._expirations += 1
+            self._journal_delete(session_id)
+            return None
+        return entry
+
+    def _journal_delete(self, session_id: str):
+        if self.journal is not None:
+            self.journal.record_delete(session_id)
+
+    async def close(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def _ensure_sweeper(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not inside the server (scripts, tests) - lazy expiry on access still applies
+        if self._sweeper is None or self._sweeper.done() or self._sweeper.get_loop() is not loop:
+            self._sweeper = loop.create_task(self._sweep_forever())
+
+    async def _sweep_forever(self):
+        while self._entries:
+            await asyncio.sleep(self.sweep_interval)
+            expired = self.sweep()
+            if expired:
+                print(f"🧹 Expired {expired} idle sessions ({len(self._entries)} live)")
+        self._sweeper = None
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions shared by every worker through a Redis-protocol server.
+
+    Each session is one string key holding ``encode_state`` output, with the
+    idle TTL as the key's expiry. Writes use WATCH/MULTI/EXEC so a worker
+    holding a stale copy gets ``SessionConflict`` rather than clobbering the
+    newer state.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", idle_ttl: float = 30 * 60,
+                 key_prefix: str = "session:"):
+        import redis.asyncio as redis  # Only needed when this backend is selected
+
+        self.redis = redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.idle_ttl = int(idle_ttl)
+        self.key_prefix = key_prefix
+        self._conflicts = 0
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    async def get(self, session_id: str) -> Optional[ConversationState]:
+        payload = await self.redis.getex(self._key(session_id), ex=self.idle_ttl)
+        return decode_state(payload) if payload is not None else None
+
+    async def peek(self, session_id: str) -> Optional[ConversationState]:
+        payload = await self.redis.get(self._key(session_id))
+        return decode_state(payload) if payload is not None else None
+
+    async def put(self, state: ConversationState, touch: bool = True):
+        key = self._key(state.session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                current = await pipe.get(key)
+                if (decode_version(current) if current is not None else 0) != state.version:
+                    raise self._watch_error()
+
+                payload = encode_state(state, state.version + 1)
+                pipe.multi()
+                if touch or current is None:
+                    pipe.set(key, payload, ex=self.idle_ttl)
+                else:
+                    pipe.set(key, payload, keepttl=True)
+                await pipe.execute()
+            except self._watch_error:
+                self._conflicts += 1
+                raise SessionConflict(state.session_id)
+        state.version += 1
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self.redis.delete(self._key(session_id)))
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "live_sessions": await self.redis.dbsize(),
+            "conflicts": self._conflicts,
+        }
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_session_store() -> SessionStore:
+    """Pick the backend from ``SESSION_STORE_URL`` (unset means in-process memory).
+
+    The in-memory store is journaled to ``SESSION_JOURNAL_DIR`` when that is
+    set; Redis brings its own persistence.
+    """
+    url = os.environ.get("SESSION_STORE_URL")
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        print(f"🗄️ Using Redis session store at {url}")
+        return RedisSessionStore(url)
+    journal_dir = os.environ.get("SESSION_JOURNAL_DIR")
+    return InMemorySessionStore(journal=SessionJournal(journal_dir) if journal_dir else None)
@@ -0,0 +1,226 @@
+"""
+One-time SMS verification codes.
+
+Codes are kept only as keyed hashes (HMAC-SHA256), so a dump of the store
+does not reveal a code that is still live. A code allows ``max_attempts``
+wrong guesses, after which it is burned and the customer needs a new one. A
+correct code is consumed on use. Codes are keyed by session id.
+
+``InMemorySmsCodeStore`` is for a single process: each code has an expiry
+timer on a timing wheel - issuing, replacing and expiring a code are all O(1)
+and a pending expiry holds nothing but a dict entry. The expiry time is also
+checked on every lookup, since the wheel only turns while an event loop runs.
+
+``RedisSmsCodeStore`` keeps digests in the Redis the session store uses, with
+the TTL as the key's expiry, so a code sent by one worker can be checked on
+another. Every worker must hash with the same secret (``SMS_CODE_SECRET``).
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+from app.core.scheduler import TimingWheel
+
+
+class CodeCheck(str, Enum):
+    OK = "ok"
+    MISMATCH = "mismatch"
+    EXPIRED = "expired"  # No live code: never issued, timed out or already used
+    LOCKED = "locked"  # Too many wrong guesses; the code is gone
+
+
+class _Code:
+    __slots__ = ("digest", "expires_at", "attempts_left", "timer_id")
+
+    def __init__(self, digest: bytes, expires_at: float, attempts_left: int):
+        self.digest = digest
+        self.expires_at = expires_at
+        self.attempts_left = attempts_left
+        self.timer_id = 0
+
+
+class SmsCodeStore(ABC):
+    """Where issued codes live until they are used, burned or expire"""
+
+    def __init__(self, ttl: float = 300.0, max_attempts: int = 3, digits: int = 6,
+                 secret: Optional[bytes] = None):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.digits = digits
+        self._secret = secret if secret is not None else secrets.token_bytes(32)
+        self._counters = dict.fromkeys(("issued", "verified", "mismatches", "locked", "expired"), 0)
+
+    @abstractmethod
+    async def issue(self, key: str) -> str:
+        """New code for ``key``, replacing any code it had; returns the plain code to send"""
+
+    @abstractmethod
+    async def check(self, key: str, code: str) -> CodeCheck:
+        ...
+
+    @abstractmethod
+    async def discard(self, key: str) -> bool:
+        ...
+
+    async def close(self):
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for this worker"""
+        return dict(self._counters)
+
+    def _new_code(self) -> str:
+        return str(secrets.randbelow(10 ** self.digits)).zfill(self.digits)
+
+    def _digest(self, key: str, code: str) -> bytes:
+        return hmac.new(self._secret, f"{key}\0{code}".encode(), hashlib.sha256).digest()
+
+    def _guess(self, key: str, code: str, digest: bytes, attempts_left: int) -> Tuple[CodeCheck, int]:
+        """The outcome of guessing ``code`` against a live code, and the attempts it has left after"""
+        if hmac.compare_digest(digest, self._digest(key, code.strip())):
+            return CodeCheck.OK, attempts_left
+        if attempts_left <= 1:
+            return CodeCheck.LOCKED, 0
+        return CodeCheck.MISMATCH, attempts_left - 1
+
+    def _count(self, result: CodeCheck) -> CodeCheck:
+        if result == CodeCheck.OK:
+            self._counters["verified"] += 1
+        elif result == CodeCheck.EXPIRED:
+            self._counters["expired"] += 1
+        else:
+            self._counters["mismatches"] += 1
+            if result == CodeCheck.LOCKED:
+                self._counters["locked"] += 1
+        return result
+
+
+class InMemorySmsCodeStore(SmsCodeStore):
+    """Codes for a single process, expired by a timing wheel"""
+
+    def __init__(self, ttl: float = 300.0, max_attempts: int = 3, digits: int = 6,
+                 wheel: Optional[TimingWheel] = None, clock: Callable[[], float] = time.monotonic,
+                 secret: Optional[bytes] = None):
+        super().__init__(ttl, max_attempts, digits, secret)
+        self.wheel = wheel if wheel is not None else TimingWheel(tick=1.0, slots=512)
+        self.clock = clock
+        self._codes: Dict[str, _Code] = {}
+
+    async def issue(self, key: str) -> str:
+        code = self._new_code()
+        self._discard(key)
+        entry = _Code(self._digest(key, code), self.clock() + self.ttl, self.max_attempts)
+        entry.timer_id = self.wheel.schedule(self.ttl, self._expire, key, entry)
+        self._codes[key] = entry
+        self._counters["issued"] += 1
+        return code
+
+    async def check(self, key: str, code: str) -> CodeCheck:
+        entry = self._codes.get(key)
+        if entry is None:
+            return CodeCheck.EXPIRED
+        if self.clock() >= entry.expires_at:
+            self._expire(key, entry)
+            return CodeCheck.EXPIRED
+        result, entry.attempts_left = self._guess(key, code, entry.digest, entry.attempts_left)
+        if result != CodeCheck.MISMATCH:
+            self._discard(key)  # Used, or burned
+        return self._count(result)
+
+    async def discard(self, key: str) -> bool:
+        return self._discard(key)
+
+    def _discard(self, key: str) -> bool:
+        entry = self._codes.pop(key, None)
+        if entry is None:
+            return False
+        self.wheel.cancel(entry.timer_id)
+        return True
+
+    def _expire(self, key: str, entry: _Code):
+        # The key may have been given a newer code since this timer was set
+        if self._codes.get(key) is entry:
+            del self._codes[key]
+            self.wheel.cancel(entry.timer_id)
+            self._counters["expired"] += 1
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def stats(self) -> Dict[str, int]:
+        return {"live_codes": len(self._codes), **self._counters}
+
+
+class RedisSmsCodeStore(SmsCodeStore):
+    """Codes shared by every worker: one Redis string per session, ``<hex digest>|<attempts left>``"""
+
+    MAX_WRITE_ATTEMPTS = 5
+
+    def __init__(self, url: str = "redis://localhost:6379/0", secret: Optional[bytes] = None,
+                 ttl: float = 300.0, max_attempts: int = 3, digits: int = 6, key_prefix: str = "smscode:"):
+        import redis.asyncio as redis  # Only needed when this backend is selected
+
+        if not secret:
+            # A per-process secret would make every other worker's codes look wrong
+            raise ValueError("RedisSmsCodeStore needs a secret shared by every worker (SMS_CODE_SECRET)")
+        super().__init__(ttl, max_attempts, digits, secret)
+        self.redis = redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    async def issue(self, key: str) -> str:
+        code = self._new_code()
+        await self.redis.set(self._key(key), f"{self._digest(key, code).hex()}|{self.max_attempts}",
+                             px=max(1, int(self.ttl * 1000)))
+        self._counters["issued"] += 1
+        return code
+
+    async def check(self, key: str, code: str) -> CodeCheck:
+        name = self._key(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for _ in range(self.MAX_WRITE_ATTEMPTS):
+                try:
+                    await pipe.watch(name)
+                    payload = await pipe.get(name)
+                    if payload is None:
+                        return self._count(CodeCheck.EXPIRED)
+                    digest, attempts_left = payload.split(b"|")
+                    result, attempts_left = self._guess(key, code, bytes.fromhex(digest.decode()),
+                                                        int(attempts_left))
+                    pipe.multi()
+                    if result == CodeCheck.MISMATCH:
+                        pipe.set(name, b"%s|%d" % (digest, attempts_left), keepttl=True)
+                    else:
+                        pipe.delete(name)  # Used, or burned
+                    # Fails if another worker checked or reissued the code meanwhile
+                    await pipe.execute()
+                    return self._count(result)
+                except self._watch_error:
+                    continue
+                finally:
+                    await pipe.reset()
+        # Guessed at on several workers at once for every try: count it as a wrong guess
+        print(f"⚠️ Could not record an SMS code check for {name} after {self.MAX_WRITE_ATTEMPTS} tries")
+        return CodeCheck.MISMATCH
+
+    async def discard(self, key: str) -> bool:
+        return bool(await self.redis.delete(self._key(key)))
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_sms_code_store() -> SmsCodeStore:
+    """Shared through Redis when the session store is (``SESSION_STORE_URL``), else per process"""
+    url = os.environ.get("SESSION_STORE_URL")
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        secret = os.environ.get("SMS_CODE_SECRET", "").encode()
+        return RedisSmsCodeStore(url, secret)
+    return InMemorySmsCodeStore()
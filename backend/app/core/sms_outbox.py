@@ -0,0 +1,163 @@
+"""
+Batched outbox for outgoing text messages.
+
+``SmsOutbox.send`` only appends to an in-memory queue and returns, so a chat
+turn never waits on the SMS provider. A single background task drains the
+queue in batches of up to ``max_batch`` messages, waiting ``flush_interval``
+for a batch to fill, and hands each batch to the gateway adapter. A batch the
+gateway rejects is retried with backoff and dropped (and counted) after
+``max_attempts``; whoever queued a dropped message can be told through
+``on_dropped``.
+
+Gateway adapters implement ``SmsGateway.send_batch``. ``FakeSmsGateway``
+keeps what it was sent in memory, for tests and local runs. Nothing picks the
+fake by default: without a configured gateway (``create_sms_gateway``) no
+codes are sent at all.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional
+
+
+class SmsMessage(NamedTuple):
+    to: str
+    body: str
+
+
+class _Queued(NamedTuple):
+    message: SmsMessage
+    on_dropped: Optional[Callable[[], Any]]
+
+
+class SmsGateway(ABC):
+    @abstractmethod
+    async def send_batch(self, messages: List[SmsMessage]):
+        ...
+
+    async def close(self):
+        pass
+
+
+class FakeSmsGateway(SmsGateway):
+    """Records messages instead of sending them; can be told to fail or be slow"""
+
+    def __init__(self, latency: float = 0.0, echo: bool = False):
+        self.latency = latency
+        self.echo = echo
+        self.sent: List[SmsMessage] = []
+        self.batches = 0
+        self.fail_next = 0  # Reject this many upcoming batches
+
+    async def send_batch(self, messages: List[SmsMessage]):
+        await asyncio.sleep(self.latency)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError("SMS gateway unavailable")
+        self.batches += 1
+        self.sent.extend(messages)
+        if self.echo:
+            for message in messages:
+                print(f"📱 SMS to {message.to}: {message.body}")
+
+    def messages_to(self, number: str) -> List[str]:
+        return [message.body for message in self.sent if message.to == number]
+
+
+def create_sms_gateway() -> Optional[SmsGateway]:
+    """The gateway named by ``SMS_GATEWAY``, or None.
+
+    ``SMS_GATEWAY=fake`` prints every text (codes and numbers included) to
+    stdout and is for local runs only.
+    """
+    name = os.environ.get("SMS_GATEWAY")
+    if name == "fake":
+        print("⚠️ SMS_GATEWAY=fake: texts are printed, not sent")
+        return FakeSmsGateway(echo=True)
+    if name:
+        raise ValueError(f"Unknown SMS_GATEWAY {name!r}")
+    return None
+
+
+class SmsOutbox:
+    def __init__(self, gateway: SmsGateway, max_batch: int = 100, flush_interval: float = 0.05,
+                 max_queued: int = 10_000, max_attempts: int = 3, retry_delay: float = 0.5):
+        self.gateway = gateway
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue: Deque[_Queued] = deque()
+        self._flusher: Optional[asyncio.Task] = None
+        self._counters = dict.fromkeys(("queued", "sent", "batches", "send_errors", "dropped"), 0)
+
+    def has_room(self) -> bool:
+        """Whether ``send`` would queue a message right now"""
+        return len(self._queue) < self.max_queued
+
+    def send(self, to: str, body: str, on_dropped: Optional[Callable[[], Any]] = None) -> bool:
+        """Queue a message; False if the outbox is full and it was dropped.
+
+        ``on_dropped`` is called if the gateway rejects the message's batch ``max_attempts`` times.
+        """
+        if not self.has_room():
+            self._counters["dropped"] += 1
+            return False
+        self._queue.append(_Queued(SmsMessage(to, body), on_dropped))
+        self._counters["queued"] += 1
+        self._ensure_flusher()
+        return True
+
+    async def flush(self):
+        """Wait until everything queued so far was handed to the gateway (or dropped)"""
+        while self._queue or self._flusher is not None:
+            self._ensure_flusher()
+            if self._flusher is None:
+                return  # Nowhere to run the flusher: no event loop
+            await asyncio.shield(self._flusher)
+
+    async def close(self):
+        await self.flush()
+        await self.gateway.close()
+
+    def _ensure_flusher(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Outside the server messages wait for the next flush()
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self._queue:
+                if len(self._queue) < self.max_batch:
+                    await asyncio.sleep(self.flush_interval)  # Let the batch fill up
+                batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                await self._deliver(batch)
+        finally:
+            self._flusher = None
+
+    async def _deliver(self, batch: List[_Queued]):
+        messages = [queued.message for queued in batch]
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.gateway.send_batch(messages)
+            except Exception as e:
+                self._counters["send_errors"] += 1
+                print(f"❌ SMS batch of {len(batch)} failed (attempt {attempt}): {e}")
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay * attempt)
+            else:
+                self._counters["sent"] += len(batch)
+                self._counters["batches"] += 1
+                return
+        self._counters["dropped"] += len(batch)
+        for queued in batch:
+            if queued.on_dropped is not None:
+                queued.on_dropped()
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued_now": len(self._queue), **self._counters}
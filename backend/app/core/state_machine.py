@@ -0,0 +1,130 @@
+"""
+Declarative conversation flow.
+
+``FLOW`` names the handler that owns each ``ConversationStep`` and the steps
+it is allowed to move the conversation to. ``StateMachine`` compiles the
+table once, against the object that implements the handlers, into a plain
+dict lookup and refuses to start if the table is incomplete or points at a
+step that does not exist.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Tuple
+from app.models.schemas import ConversationStep
+
+S = ConversationStep
+
+
+class Transition(NamedTuple):
+    handler: str
+    targets: Tuple[ConversationStep, ...] = ()
+
+
+# Staying on the same step (re-asking) is always allowed and not listed here
+FLOW: Dict[ConversationStep, Transition] = {
+    # Time check and identity verification
+    S.GREETING: Transition("_handle_greeting", (S.ASK_NAME,)),
+    S.ASK_NAME: Transition("_handle_name_response", (S.ASK_DOB,)),
+    S.ASK_DOB: Transition("_handle_dob_response", (S.ASK_SSN, S.ESCALATION)),
+    S.ASK_SSN: Transition("_handle_ssn_response", (S.ASK_EMAIL, S.ESCALATION)),
+    S.ASK_EMAIL: Transition("_handle_email_confirmation", (S.EMAIL_USAGE_CHECK,)),
+    S.EMAIL_USAGE_CHECK: Transition("_handle_email_usage_response", (S.CONTACT_INFO_CHECK,)),
+
+    # Contact information and VBT (verification by text); escalation when no text can be sent
+    S.CONTACT_INFO_CHECK: Transition("_handle_contact_info_check", (S.VBT_CODE_CHECK, S.ESCALATION)),
+    S.VBT_INITIATE: Transition("_handle_vbt_initiate", (S.VBT_CODE_CHECK, S.ESCALATION)),
+    S.VBT_CODE_CHECK: Transition("_handle_vbt_code_check", (S.VBT_CODE_INPUT, S.VBT_WAIT_RETRY, S.MILITARY_QUESTION)),
+    S.VBT_CODE_INPUT: Transition("_handle_vbt_code_input", (S.MILITARY_QUESTION, S.ESCALATION)),
+    S.CODE_RECEIVED: Transition("_handle_vbt_code_input", (S.MILITARY_QUESTION, S.ESCALATION)),
+    S.VBT_WAIT_RETRY: Transition("_handle_vbt_wait_retry", (S.VBT_CODE_INPUT, S.MILITARY_QUESTION)),
+    S.CODE_NOT_RECEIVED: Transition("_handle_vbt_wait_retry", (S.VBT_CODE_INPUT, S.MILITARY_QUESTION)),
+    S.VBT_REFUSE_CODE: Transition("_handle_vbt_refuse_code", (S.MILITARY_QUESTION,)),
+
+    # Qualifying questions
+    S.CONTINUE_AFTER_WAIT: Transition("_handle_qualifying_intro", (S.MILITARY_QUESTION,)),
+    S.QUALIFYING_INTRO: Transition("_handle_qualifying_intro", (S.MILITARY_QUESTION,)),
+    S.MILITARY_QUESTION: Transition("_handle_qualifying_questions", (S.BANK_ACCOUNT_INFO, S.ESCALATION)),
+
+    # Bank account
+    S.BANK_ACCOUNT_INFO: Transition("_handle_bank_account_info", (S.BANK_ACCOUNT_CONFIRM, S.ESCALATION)),
+    S.BANK_ACCOUNT_CONFIRM: Transition("_handle_bank_account_confirm", (S.ACCOUNT_TYPE_CHECK, S.BANK_ACCOUNT_INFO)),
+    S.ACCOUNT_TYPE_CHECK: Transition("_handle_account_type_check", (S.PAYCHECK_ACCOUNT_CHECK,)),
+    S.PAYCHECK_ACCOUNT_CHECK: Transition("_handle_paycheck_account_check", (S.PAYCHECK_TYPE_CHECK, S.BANK_ACCOUNT_INFO)),
+    S.PAYCHECK_TYPE_CHECK: Transition("_handle_paycheck_type_check", (S.DEBIT_CARD_COLLECTION, S.LOAN_DECLINED)),
+
+    # Debit card
+    S.DEBIT_CARD_COLLECTION: Transition("_handle_debit_card_collection", (S.DEBIT_CARD_CONFIRM, S.DEBIT_CARD_REFUSAL)),
+    S.DEBIT_CARD_CONFIRM: Transition("_handle_debit_card_confirm", (S.COMPLETE, S.DEBIT_CARD_COLLECTION)),
+    S.DEBIT_CARD_REFUSAL: Transition("_handle_debit_card_refusal", (S.COMPLETE,)),
+
+    # Not scripted yet - hand over to a specialist
+    S.EMPLOYMENT_INFO: Transition("_handle_unsupported_step", (S.ESCALATION,)),
+    S.FINAL_CONFIRMATION: Transition("_handle_unsupported_step", (S.ESCALATION,)),
+
+    # Terminal steps
+    S.LOAN_APPROVED: Transition("_handle_conversation_closed"),
+    S.LOAN_DECLINED: Transition("_handle_conversation_closed"),
+    S.ESCALATION: Transition("_handle_conversation_closed"),
+    S.COMPLETE: Transition("_handle_conversation_closed"),
+}
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class StateMachine:
+    """O(1) step -> handler dispatch compiled from a transition table"""
+
+    def __init__(self, owner: Any, flow: Dict[ConversationStep, Transition] = FLOW):
+        self.flow = flow
+        self._dispatch: Dict[ConversationStep, Handler] = self._compile(owner, flow)
+        self._allowed = {step: frozenset(transition.targets) | {step} for step, transition in flow.items()}
+
+    @staticmethod
+    def _compile(owner: Any, flow: Dict[ConversationStep, Transition]) -> Dict[ConversationStep, Handler]:
+        """Bind every handler, failing fast on gaps in the table"""
+        problems = []
+        for step in ConversationStep:
+            if step not in flow:
+                problems.append(f"step '{step.value}' has no transition entry")
+
+        dispatch = {}
+        for step, transition in flow.items():
+            handler = getattr(owner, transition.handler, None)
+            if not callable(handler):
+                problems.append(f"step '{step.value}' names missing handler {transition.handler}")
+            else:
+                dispatch[step] = handler
+            for target in transition.targets:
+                if target not in flow:
+                    problems.append(f"step '{step.value}' targets unknown step '{target}'")
+
+        if problems:
+            raise ValueError("Invalid conversation flow:\n  " + "\n  ".join(problems))
+        return dispatch
+
+    def handler_for(self, step: ConversationStep) -> Handler:
+        return self._dispatch[step]
+
+    def allows(self, source: ConversationStep, target: ConversationStep) -> bool:
+        return target in self._allowed[source]
+
+    def targets(self, step: ConversationStep) -> Tuple[ConversationStep, ...]:
+        return self.flow[step].targets
+
+    def graph(self) -> Dict[str, Dict[str, Any]]:
+        """The flow as plain data, for docs, visualisers and tests"""
+        return {
+            step.value: {
+                "handler": transition.handler,
+                "next": [target.value for target in transition.targets],
+            }
+            for step, transition in self.flow.items()
+        }
+
+    def unreachable(self, start: ConversationStep = S.GREETING) -> List[str]:
+        """Steps that cannot be reached from ``start`` by following the table"""
+        seen, stack = {start}, [start]
+        while stack:
+            for target in self.flow[stack.pop()].targets:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return [step.value for step in self.flow if step not in seen]
@@ -0,0 +1,127 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from app.models.schemas import ConversationStep
+from app.core.intents import Intent, REFUSAL, YES
+
+
+class TurnContext:
+    """Everything derived from one user message, computed at most once per turn.
+
+    Handlers ask the context instead of the AI client, so a message that passes
+    through several handlers (or is read twice by the same one) only pays for
+    each extraction and intent classification once.
+
+    A turn is replayed when its save loses a race with another worker, so
+    anything it does outside the session state must not happen twice: lookups
+    and checks with effects of their own go through ``once``, and effects that
+    only matter if the turn is kept (texts, timers) through ``after_save``.
+    """
+
+    # Seconds a turn may spend on extraction and lookups before it answers with what it has
+    TURN_BUDGET = 8.0
+
+    def __init__(self, ai_client, user_message: str, client_ip: Optional[str] = None, extractor=None):
+        self.ai_client = ai_client
+        # Anything with ``extract_information``: the tiered extractor, or the AI client itself
+        self.extractor = extractor if extractor is not None else ai_client
+        self.message = user_message
+        self.client_ip = client_ip
+        self.lower = user_message.lower().strip()
+        self.started_at = time.perf_counter()
+        # Absolute, on the clock LLMClient uses, so slow calls can be cut off at the turn's end
+        self.deadline = time.monotonic() + self.TURN_BUDGET
+        self.timings: Dict[str, float] = {}
+        self._extractions: Dict[ConversationStep, Dict[str, Any]] = {}
+        self._intent: Optional[Intent] = None
+        self._checks: Dict[Hashable, asyncio.Future] = {}
+        self._after_save: List[Callable[[], Any]] = []
+
+    async def extract(self, step: ConversationStep) -> Dict[str, Any]:
+        """Slots found in the message, as seen from ``step``"""
+        if step not in self._extractions:
+            started = time.perf_counter()
+            self._extractions[step] = await self.extractor.extract_information(
+                self.message, step, deadline=self.deadline, tenant=self.client_ip)
+            self.timings[f"extract:{step.value}"] = time.perf_counter() - started
+        return self._extractions[step]
+
+    def seed(self, step: ConversationStep, extracted: Dict[str, Any]):
+        """Reuse an earlier extraction for ``step`` when it already holds the slot that step needs"""
+        self._extractions.setdefault(step, extracted)
+
+    async def intent(self) -> Intent:
+        """The message's yes / no / refusal / unknown classification"""
+        if self._intent is None:
+            started = time.perf_counter()
+            self._intent = await self.ai_client.analyze_intent(self.message)
+            self.timings["intent"] = time.perf_counter() - started
+        return self._intent
+
+    async def is_yes(self) -> bool:
+        return (await self.intent()).label == YES
+
+    async def refuses_code(self) -> bool:
+        return (await self.intent()).label == REFUSAL
+
+    async def refuses_debit_card(self) -> bool:
+        return (await self.intent()).label == REFUSAL
+
+    async def once(self, key: Hashable, action: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``action()``, run at most once per turn for ``key`` however often the turn is replayed.
+
+        An action that raised is forgotten, so a replayed turn tries it again.
+        """
+        if key not in self._checks:
+            self._checks[key] = asyncio.ensure_future(action())
+        try:
+            return await self._checks[key]
+        except BaseException:
+            self._checks.pop(key, None)
+            raise
+
+    async def verify(self, key: Hashable, check: Callable[[], Awaitable[bool]]) -> bool:
+        """Result of ``check()``, run at most once per turn for ``key`` (or already started by ``verify_all``)"""
+        return await self.once(key, check)
+
+    def after_save(self, action: Callable[[], Any]):
+        """Run ``action`` (sync, or returning an awaitable) once this attempt's state is saved"""
+        self._after_save.append(action)
+
+    def replay(self):
+        """Start another attempt at the turn: effects the last attempt queued are dropped"""
+        self._after_save.clear()
+
+    async def saved(self):
+        """The turn's state is stored: run the effects it queued"""
+        actions, self._after_save = self._after_save, []
+        for action in actions:
+            result = action()
+            if inspect.isawaitable(result):
+                await result
+
+    async def verify_all(self, checks: Dict[Hashable, Callable[[], Awaitable[bool]]], deadline: float):
+        """Run independent checks concurrently; raises ``asyncio.TimeoutError`` past ``deadline``,
+        or the first exception a check raised"""
+        started = time.perf_counter()
+        for key, check in checks.items():
+            if key not in self._checks:
+                self._checks[key] = asyncio.ensure_future(check())
+        pending = [self._checks[key] for key in checks]
+        try:
+            await asyncio.wait_for(asyncio.gather(*pending), deadline)
+        except BaseException:
+            # Stop the rest and forget them all, so a replayed turn starts over
+            for future in pending:
+                future.cancel()
+            for key in checks:
+                self._checks.pop(key, None)
+            raise
+        finally:
+            self.timings["verify"] = time.perf_counter() - started
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the turn started"""
+        return time.perf_counter() - self.started_at
@@ -1,104 +1,158 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, List, Optional
 from app.models.schemas import VerificationResult, LoanDecision
+from app.models.databse import Customer, normalize_name
+from app.database.connection import CustomerStore, PooledCustomerStore, create_customer_store, create_customer_db
+from app.core.customer_cache import SessionCustomerCache
+from app.core.read_through_cache import ReadThroughCache
+from app.core.eligibility import evaluate, evaluate_batch
+from app.core.sms_codes import CodeCheck, create_sms_code_store
+from app.core.sms_outbox import SmsGateway, SmsOutbox, create_sms_gateway
+from app.core.card_validation import CardCheck, CardValidator, create_card_validator
 import asyncio
 
+class VerificationUnavailable(Exception):
+    """A lookup failed outright (pool timeout, store unreachable); the same question may work later"""
+
 class VerificationEngine:
-    def __init__(self):
-        # Mock database for testing
-        self.mock_customers = {
-            "john smith": {
-                'full_name': 'John Smith',
-                'dob': '1990-01-15',
-                'ssn_last4': '1234',
-                'email': 'john.smith@example.com',
-                'phone_number': '1234567890',
-                'home_number': '8102405111',
-                'bank_account': '1234567890',
-                'bank_routing': '123456789'
-            }
-        }
-        print("🗄️ Using Mock Database for testing")
-    
-    async def verify_dob(self, customer_name: str, dob: str) -> bool:
+    SMS_TEMPLATE = "Your Dash Of Cash verification code is {code}. It expires in {minutes} minutes."
+
+    def __init__(self, customer_store: Optional[CustomerStore] = None,
+                 customer_db: Optional[PooledCustomerStore] = None,
+                 sms_gateway: Optional[SmsGateway] = None,
+                 card_validator: Optional[CardValidator] = None):
+        if customer_db is None:
+            self.customer_store = customer_store if customer_store is not None else create_customer_store()
+            customer_db = create_customer_db(self.customer_store)
+        # Lookups while serving requests go through the connection pool
+        self.customer_db = customer_db
+        # Shared by all sessions: repeat verifications of a customer within the TTL skip the database
+        self.customer_records = ReadThroughCache(self.customer_db.get_by_name, ttl=300.0, negative_ttl=30.0)
+        # Per conversation: the record for the name this session gave
+        self.customers = SessionCustomerCache(self._lookup_customer)
+        self.sms_codes = create_sms_code_store()
+        # Fail closed: with no gateway no code is issued, and the conversation escalates instead
+        if sms_gateway is None:
+            sms_gateway = create_sms_gateway()
+        self.sms_outbox = SmsOutbox(sms_gateway) if sms_gateway is not None else None
+        if self.sms_outbox is None:
+            print("⚠️ No SMS gateway configured (SMS_GATEWAY): phone verification codes will not be sent")
+        self.cards = card_validator if card_validator is not None else create_card_validator()
+    
+    async def _lookup_customer(self, customer_name: str) -> Optional[Customer]:
+        return await self.customer_records.get(normalize_name(customer_name))
+    
+    async def close(self):
+        if self.sms_outbox is not None:
+            await self.sms_outbox.close()
+        await self.sms_codes.close()
+        await self.customer_db.close()
+    
+    def prefetch_customer(self, session_id: str, customer_name: str):
+        """Start loading the customer record for a session in the background"""
+        self.customers.prefetch(session_id, customer_name)
+    
+    async def _customer(self, customer_name: Optional[str], session_id: Optional[str] = None) -> Optional[Customer]:
+        """The customer record, memoized per session when ``session_id`` is given"""
+        if not customer_name:
+            return None
+        if session_id is None:
+            return await self._lookup_customer(customer_name)
+        return await self.customers.get(session_id, customer_name)
+    
+    async def customer_id(self, customer_name: Optional[str], session_id: Optional[str] = None) -> Optional[int]:
+        """Id of the record the name matched, or None when it matched no customer"""
+        customer_record = await self._customer(customer_name, session_id)
+        return customer_record.customer_id if customer_record else None
+    
+    async def verify_dob(self, customer_name: str, dob: str, session_id: Optional[str] = None) -> bool:
         """Verify date of birth against customer database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
+        customer_record = await self._customer(customer_name, session_id)
         if customer_record:
-            return customer_record.get('dob') == dob
+            return customer_record.dob == dob
         return True  # For testing, accept any DOB for unknown customers
     
-    async def verify_ssn(self, customer_name: str, ssn_last4: str) -> bool:
+    async def verify_ssn(self, customer_name: str, ssn_last4: str, session_id: Optional[str] = None) -> bool:
         """Verify last 4 digits of SSN against customer database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
+        customer_record = await self._customer(customer_name, session_id)
         if customer_record:
-            return customer_record.get('ssn_last4') == ssn_last4
+            return customer_record.ssn_last4 == ssn_last4
         return True  # For testing, accept any SSN for unknown customers
     
-    async def get_customer_email(self, customer_name: str) -> Optional[str]:
+    async def get_customer_email(self, customer_name: str, session_id: Optional[str] = None) -> Optional[str]:
         """Get customer's email from database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
-        return customer_record.get('email', 'test@example.com') if customer_record else 'test@example.com'
+        customer_record = await self._customer(customer_name, session_id)
+        return (customer_record.email if customer_record else None) or 'test@example.com'
     
-    async def get_customer_home_number(self, customer_name: str) -> Optional[str]:
+    async def get_customer_home_number(self, customer_name: str, session_id: Optional[str] = None) -> Optional[str]:
         """Get customer's home phone number from database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
-        return customer_record.get('home_number', '8102405111') if customer_record else '8102405111'
+        customer_record = await self._customer(customer_name, session_id)
+        return (customer_record.home_number if customer_record else None) or '8102405111'
     
-    async def get_customer_mobile_number(self, customer_name: str) -> Optional[str]:
+    async def get_customer_mobile_number(self, customer_name: str, session_id: Optional[str] = None) -> Optional[str]:
         """Get customer's mobile phone number from database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
-        return customer_record.get('phone_number', '1234567890') if customer_record else '1234567890'
+        customer_record = await self._customer(customer_name, session_id)
+        return (customer_record.phone_number if customer_record else None) or '1234567890'
     
-    async def get_customer_account_ending(self, customer_name: str) -> Optional[str]:
+    async def get_customer_account_ending(self, customer_name: str, session_id: Optional[str] = None) -> Optional[str]:
         """Get last 4 digits of customer's bank account from database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
-        account = customer_record.get('bank_account', '1234567890') if customer_record else '1234567890'
-        return account[-4:] if account and len(account) >= 4 else '7890'
+        customer_record = await self._customer(customer_name, session_id)
+        return (customer_record.account_ending if customer_record else None) or '7890'
+    
+    @property
+    def sms_enabled(self) -> bool:
+        """Whether codes can be sent at all (a gateway is configured)"""
+        return self.sms_outbox is not None
     
-    async def verify_sms_code(self, customer_name: str, sms_code: str) -> bool:
+    def can_send_sms(self) -> bool:
+        """Whether a text can be queued right now: a gateway is configured and the outbox has room"""
+        return self.sms_outbox is not None and self.sms_outbox.has_room()
+    
+    async def send_sms_code(self, session_id: str, mobile_number: str,
+                            on_dropped: Optional[Callable[[], Any]] = None) -> bool:
+        """Issue a new code for the session and queue the text; does not wait for delivery.
+
+        False, with no code left issued, when there is no gateway or the outbox
+        is full. ``on_dropped`` is called if the gateway later refuses the text.
+        """
+        if not self.can_send_sms():
+            return False
+        code = await self.sms_codes.issue(session_id)
+        minutes = round(self.sms_codes.ttl / 60)
+        body = self.SMS_TEMPLATE.format(code=code, minutes=minutes)
+        if self.sms_outbox.send(mobile_number, body, on_dropped):
+            return True
+        await self.sms_codes.discard(session_id)
+        return False
+    
+    async def check_sms_code(self, session_id: str, sms_code: str) -> CodeCheck:
+        """Check a code against the one sent for the session (see ``CodeCheck``)"""
+        return await self.sms_codes.check(session_id, sms_code)
+    
+    async def verify_sms_code(self, session_id: str, sms_code: str) -> bool:
         """Verify SMS verification code"""
-        # For testing, accept any 6-digit code
-        return len(sms_code) == 6 and sms_code.isdigit()
+        return await self.check_sms_code(session_id, sms_code) == CodeCheck.OK
     
-    async def verify_bank_account(self, customer_name: str, account_number: str, routing_number: str) -> bool:
+    async def verify_bank_account(self, customer_name: str, account_number: str, routing_number: str, session_id: Optional[str] = None) -> bool:
         """Verify bank account and routing number against customer database"""
-        customer_record = self.mock_customers.get(customer_name.lower())
+        customer_record = await self._customer(customer_name, session_id)
         if customer_record:
-            return (customer_record.get('bank_account') == account_number and 
-                   customer_record.get('bank_routing') == routing_number)
+            return (customer_record.bank_account == account_number and 
+                   customer_record.bank_routing == routing_number)
         return True  # For testing, accept any account for unknown customers
     
+    def check_debit_card(self, card_number: str) -> CardCheck:
+        """Format, Luhn and issuer (BIN) checks, with the reason a card was turned away"""
+        return self.cards.check(card_number)
+    
     async def validate_debit_card(self, card_number: str) -> bool:
         """Validate debit card number format"""
-        # Basic validation - check if it's 16 digits
-        if not card_number.isdigit() or len(card_number) != 16:
-            return False
-        
-        # Simple Luhn algorithm check
-        def luhn_check(card_num):
-            def digits_of(n):
-                return [int(d) for d in str(n)]
-            digits = digits_of(card_num)
-            odd_digits = digits[-1::-2]
-            even_digits = digits[-2::-2]
-            checksum = sum(odd_digits)
-            for d in even_digits:
-                checksum += sum(digits_of(d*2))
-            return checksum % 10 == 0
-        
-        return luhn_check(card_number)
+        return self.cards.check(card_number).valid
     
     async def evaluate_loan_eligibility(self, customer_data: Dict[str, Any]) -> 'LoanDecision':
         """Evaluate loan eligibility based on collected information"""
-        # Simple mock eligibility - approve most applications for testing
-        approved = True
-        decline_reasons = []
-        
-        # Check if required info is present
-        if not customer_data.get('bank_account') or not customer_data.get('bank_routing'):
-            approved = False
-            decline_reasons.append("Missing bank account information")
-        
-        return LoanDecision(
-            approved=approved,
-            decline_reasons=decline_reasons
-        )
\ No newline at end of file
+        return evaluate(customer_data)
+    
+    async def evaluate_loan_eligibility_batch(self, applications: List[Dict[str, Any]]) -> List[LoanDecision]:
+        """Re-score many ``slots_filled`` records against the current policy (back office)"""
+        batch = await asyncio.to_thread(evaluate_batch, applications)
+        return batch.decisions()
@@ -0,0 +1,549 @@
+"""
+Customer database.
+
+``CustomerStore`` is the synchronous interface used to load and administer
+customers. ``SQLiteCustomerStore`` is the embedded implementation: one table
+with secondary indexes on the normalized name, both phone numbers and the
+bank account ending, so every lookup is an index seek regardless of how
+many customers are loaded.
+
+Request handling goes through ``PooledCustomerStore`` instead: the same
+queries on an async ``ConnectionPool`` that keeps connections open between
+calls, bounds how many are in flight, times out waiting callers and checks
+connections before reuse.
+
+Load a CSV (columns named like the ``Customer`` fields) with:
+
+    python -m app.database.connection customers.csv --db customers.db
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import itertools
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Union
+from app.models.databse import Customer, normalize_name, normalize_phone
+
+CustomerInput = Union[Customer, Dict[str, Any]]
+
+# Demo record the mock flows and tests are written against
+DEMO_CUSTOMERS = [
+    Customer(
+        full_name="John Smith",
+        dob="1990-01-15",
+        ssn_last4="1234",
+        email="john.smith@example.com",
+        phone_number="1234567890",
+        home_number="8102405111",
+        bank_account="1234567890",
+        bank_routing="123456789",
+    ),
+]
+
+
+class CustomerStore(ABC):
+    """Where customer records are looked up"""
+
+    @abstractmethod
+    def get_by_name(self, full_name: str) -> Optional[Customer]:
+        """First customer with this name (after normalization), if any"""
+
+    @abstractmethod
+    def find_by_phone(self, phone: str) -> List[Customer]:
+        """Customers whose mobile or home number matches"""
+
+    @abstractmethod
+    def find_by_account_ending(self, ending: str) -> List[Customer]:
+        ...
+
+    @abstractmethod
+    def bulk_load(self, customers: Iterable[CustomerInput], batch_size: int = 10_000,
+                  defer_indexes: bool = False) -> int:
+        """Insert many customers; returns how many were loaded"""
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def pooled(self, **pool_options) -> "PooledCustomerStore":
+        """Async lookups on the same data for request handling (``ConnectionPool`` options)"""
+
+    def close(self):
+        pass
+
+
+_COLUMNS = ("full_name", "dob", "ssn_last4", "email", "phone_number", "home_number", "bank_account", "bank_routing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id    INTEGER PRIMARY KEY,
+    full_name      TEXT NOT NULL,
+    name_key       TEXT NOT NULL,
+    dob            TEXT NOT NULL,
+    ssn_last4      TEXT NOT NULL,
+    email          TEXT,
+    phone_number   TEXT,
+    phone_key      TEXT,
+    home_number    TEXT,
+    home_key       TEXT,
+    bank_account   TEXT,
+    bank_routing   TEXT,
+    account_ending TEXT
+)
+"""
+
+_INDEXES = {
+    "idx_customers_name": "CREATE INDEX IF NOT EXISTS idx_customers_name ON customers (name_key)",
+    "idx_customers_phone": "CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers (phone_key)",
+    "idx_customers_home": "CREATE INDEX IF NOT EXISTS idx_customers_home ON customers (home_key)",
+    "idx_customers_account_ending": (
+        "CREATE INDEX IF NOT EXISTS idx_customers_account_ending ON customers (account_ending)"
+    ),
+}
+
+_SELECT = "SELECT customer_id, " + ", ".join(_COLUMNS) + " FROM customers"
+# Constant SQL text, so every connection's statement cache hits after the first use
+_BY_NAME = _SELECT + " WHERE name_key = ? ORDER BY customer_id LIMIT 1"
+_BY_PHONE = _SELECT + " WHERE phone_key = ? UNION " + _SELECT + " WHERE home_key = ?"
+_BY_ACCOUNT_ENDING = _SELECT + " WHERE account_ending = ?"
+
+
+def _customer(row: tuple) -> Customer:
+    fields = dict(zip(_COLUMNS, row[1:]))
+    fields["customer_id"] = row[0]
+    # Rows were validated on the way in
+    return Customer.model_construct(**fields)
+
+
+_memory_databases = itertools.count(1)
+
+
+class SQLiteCustomerStore(CustomerStore):
+    def __init__(self, path: str = ":memory:", statement_cache_size: int = 128):
+        self.path = path
+        self.statement_cache_size = statement_cache_size
+        if path == ":memory:":
+            # Named shared-cache database, so pooled connections see the same data
+            self._uri = f"file:customers-{os.getpid()}-{next(_memory_databases)}?mode=memory&cache=shared"
+        else:
+            self._uri = None
+        self._conn = self.connect()
+        if self._uri is None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._create_indexes()
+        self._conn.commit()
+
+    def connect(self) -> sqlite3.Connection:
+        """A new connection to this database (what ``ConnectionPool`` opens)"""
+        # Pooled connections move between worker threads, one caller at a time
+        if self._uri is not None:
+            return sqlite3.connect(self._uri, uri=True, check_same_thread=False,
+                                   cached_statements=self.statement_cache_size)
+        return sqlite3.connect(self.path, check_same_thread=False, cached_statements=self.statement_cache_size)
+
+    def pooled(self, **pool_options) -> "PooledCustomerStore":
+        return PooledCustomerStore(ConnectionPool(self.connect, **pool_options))
+
+    def _create_indexes(self):
+        for statement in _INDEXES.values():
+            self._conn.execute(statement)
+
+    def _one(self, sql: str, params: tuple) -> Optional[Customer]:
+        row = self._conn.execute(sql, params).fetchone()
+        return _customer(row) if row else None
+
+    def _many(self, sql: str, params: tuple) -> List[Customer]:
+        return [_customer(row) for row in self._conn.execute(sql, params)]
+
+    def get_by_name(self, full_name: str) -> Optional[Customer]:
+        return self._one(_BY_NAME, (normalize_name(full_name),))
+
+    def find_by_phone(self, phone: str) -> List[Customer]:
+        key = normalize_phone(phone)
+        return self._many(_BY_PHONE, (key, key))
+
+    def find_by_account_ending(self, ending: str) -> List[Customer]:
+        return self._many(_BY_ACCOUNT_ENDING, (ending[-4:],))
+
+    def bulk_load(self, customers: Iterable[CustomerInput], batch_size: int = 10_000,
+                  defer_indexes: bool = False) -> int:
+        """Insert in batches inside one transaction.
+
+        With ``defer_indexes`` the secondary indexes are dropped for the load
+        and rebuilt once at the end, which is much faster for large initial
+        loads than maintaining them row by row.
+        """
+        loaded = 0
+        with self._conn:
+            if defer_indexes:
+                for name in _INDEXES:
+                    self._conn.execute(f"DROP INDEX IF EXISTS {name}")
+            batch = []
+            for customer in customers:
+                batch.append(self._row(customer))
+                if len(batch) >= batch_size:
+                    loaded += self._insert(batch)
+                    batch = []
+            loaded += self._insert(batch)
+            if defer_indexes:
+                self._create_indexes()
+        return loaded
+
+    @staticmethod
+    def _row(customer: CustomerInput) -> tuple:
+        if not isinstance(customer, Customer):
+            customer = Customer(**customer)
+        return (
+            customer.full_name, normalize_name(customer.full_name), customer.dob, customer.ssn_last4,
+            customer.email,
+            customer.phone_number, normalize_phone(customer.phone_number) if customer.phone_number else None,
+            customer.home_number, normalize_phone(customer.home_number) if customer.home_number else None,
+            customer.bank_account, customer.bank_routing, customer.account_ending,
+        )
+
+    def _insert(self, rows: List[tuple]) -> int:
+        if rows:
+            self._conn.executemany(
+                "INSERT INTO customers (full_name, name_key, dob, ssn_last4, email, phone_number, phone_key,"
+                " home_number, home_key, bank_account, bank_routing, account_ending)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        """EXPLAIN QUERY PLAN details, to check a lookup uses an index"""
+        return [row[-1] for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def close(self):
+        self._conn.close()
+
+
+class PoolTimeout(Exception):
+    """No database connection became free within the acquire timeout"""
+
+
+class _Pooled:
+    __slots__ = ("conn", "last_used")
+
+    def __init__(self, conn: Any, last_used: float):
+        self.conn = conn
+        self.last_used = last_used
+
+
+def _fetch_one(conn: Any, sql: str, params: tuple):
+    return conn.execute(sql, params).fetchone()
+
+
+def _fetch_all(conn: Any, sql: str, params: tuple):
+    return conn.execute(sql, params).fetchall()
+
+
+def _ping(conn: Any, sql: str) -> bool:
+    try:
+        conn.execute(sql).fetchone()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """Async pool over blocking DB-API connections.
+
+    ``connect`` opens one connection; queries run on worker threads, and each
+    connection is used by one caller at a time. Between ``min_size`` and
+    ``max_size`` connections are kept. When all are busy, callers queue
+    first-come first-served and a connection is handed straight to the next
+    waiter on release. Callers get ``PoolTimeout`` after ``acquire_timeout``
+    seconds.
+
+    Idle connections are reused most-recent-first. One idle longer than
+    ``health_check_after`` seconds is pinged before it is handed out, and a
+    background task pings idle connections and tops the pool back up to
+    ``min_size``. A connection whose query raised is discarded rather than
+    returned.
+    """
+
+    def __init__(self, connect: Callable[[], Any], min_size: int = 1, max_size: int = 10,
+                 acquire_timeout: float = 2.0, health_check_after: float = 30.0,
+                 health_check_interval: float = 30.0, health_check_sql: str = "SELECT 1"):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"invalid pool size {min_size}..{max_size}")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_after = health_check_after
+        self.health_check_interval = health_check_interval
+        self.health_check_sql = health_check_sql
+        self._idle: Deque[_Pooled] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._size = 0  # Open connections plus ones being opened
+        self._in_use = 0
+        self._closed = False
+        self._maintainer: Optional[asyncio.Task] = None
+        self._metrics = dict.fromkeys(
+            ("acquires", "waited_acquires", "acquire_timeouts", "opened", "discarded",
+             "health_check_failures", "peak_in_use", "peak_waiting"), 0)
+        self._wait_seconds = 0.0
+
+    # --- acquire / release ---------------------------------------------
+
+    async def acquire(self) -> _Pooled:
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.acquire_timeout
+        self._ensure_maintainer()
+        self._metrics["acquires"] += 1
+        waited = False
+        while True:
+            if self._idle:
+                pooled = self._idle.pop()
+                if loop.time() - pooled.last_used > self.health_check_after and not await self._healthy(pooled):
+                    continue
+                break
+            if self._size < self.max_size:
+                pooled = await self._open()
+                break
+
+            if not waited:
+                waited = True
+                self._metrics["waited_acquires"] += 1
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            self._metrics["peak_waiting"] = max(self._metrics["peak_waiting"], len(self._waiters))
+            try:
+                pooled = await asyncio.wait_for(waiter, max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                if waiter.done() and not waiter.cancelled() and waiter.result() is not None:
+                    pooled = waiter.result()  # Handed over just as the timeout fired
+                    break
+                self._metrics["acquire_timeouts"] += 1
+                raise PoolTimeout(f"no database connection free after {self.acquire_timeout}s "
+                                  f"({self._in_use} in use, {len(self._waiters)} waiting)")
+            except asyncio.CancelledError:
+                # Pass on whatever was handed to us in the meantime
+                if waiter.done() and not waiter.cancelled():
+                    if waiter.result() is not None:
+                        self.release_idle(waiter.result())
+                    else:
+                        self._wake_waiter()
+                raise
+            finally:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            if pooled is not None:
+                break
+            # Woken with None: a connection was discarded, so there is room to open one
+
+        self._in_use += 1
+        self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], self._in_use)
+        self._wait_seconds += loop.time() - started
+        return pooled
+
+    def release(self, pooled: _Pooled, discard: bool = False):
+        self._in_use -= 1
+        if discard or self._closed:
+            self._discard(pooled)
+            return
+        pooled.last_used = asyncio.get_running_loop().time()
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(pooled)
+        else:
+            self._idle.append(pooled)
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """Hold one connection for several statements (the caller runs them off-loop)"""
+        pooled = await self.acquire()
+        try:
+            yield pooled.conn
+        except BaseException:
+            # Broken, half-read or cancelled mid-query: do not hand it to anyone else
+            self.release(pooled, discard=True)
+            raise
+        self.release(pooled)
+
+    async def fetch_one(self, sql: str, params: tuple = ()):
+        return await self._run(_fetch_one, sql, params)
+
+    async def fetch_all(self, sql: str, params: tuple = ()):
+        return await self._run(_fetch_all, sql, params)
+
+    async def _run(self, query: Callable[..., Any], *args):
+        pooled = await self.acquire()
+        work = asyncio.ensure_future(asyncio.to_thread(query, pooled.conn, *args))
+        # Released when the thread is done with it, even if the caller gave up waiting
+        work.add_done_callback(lambda done: self.release(pooled, discard=done.cancelled() or done.exception() is not None))
+        return await asyncio.shield(work)
+
+    # --- connections ---------------------------------------------------
+
+    async def _open(self) -> _Pooled:
+        self._size += 1
+        try:
+            conn = await asyncio.to_thread(self._connect)
+        except BaseException:
+            self._size -= 1
+            self._wake_waiter()
+            raise
+        self._metrics["opened"] += 1
+        return _Pooled(conn, asyncio.get_running_loop().time())
+
+    async def _healthy(self, pooled: _Pooled) -> bool:
+        if await asyncio.to_thread(_ping, pooled.conn, self.health_check_sql):
+            pooled.last_used = asyncio.get_running_loop().time()
+            return True
+        self._metrics["health_check_failures"] += 1
+        self._discard(pooled)
+        return False
+
+    def _discard(self, pooled: _Pooled):
+        self._size -= 1
+        self._metrics["discarded"] += 1
+        with contextlib.suppress(Exception):
+            pooled.conn.close()
+        self._wake_waiter()
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                return waiter
+        return None
+
+    def _wake_waiter(self):
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(None)
+
+    # --- maintenance ---------------------------------------------------
+
+    def _ensure_maintainer(self):
+        loop = asyncio.get_running_loop()
+        if self._maintainer is None or self._maintainer.done() or self._maintainer.get_loop() is not loop:
+            self._maintainer = loop.create_task(self._maintain_forever())
+
+    async def _maintain_forever(self):
+        while not self._closed:
+            await self.check_health()
+            await asyncio.sleep(self.health_check_interval)
+
+    async def check_health(self):
+        """Ping idle connections that have sat unused, then top up to ``min_size``"""
+        now = asyncio.get_running_loop().time()
+        stale = [pooled for pooled in self._idle if now - pooled.last_used > self.health_check_after]
+        for pooled in stale:
+            self._idle.remove(pooled)
+            if await self._healthy(pooled):
+                self.release_idle(pooled)
+        while self._size < self.min_size and not self._closed:
+            try:
+                pooled = await self._open()
+            except Exception as e:
+                print(f"❌ Could not open database connection: {e}")
+                break
+            self.release_idle(pooled)
+
+    def release_idle(self, pooled: _Pooled):
+        """Put a connection nobody holds (new or just checked) back into circulation"""
+        self._in_use += 1
+        self.release(pooled)
+
+    async def close(self):
+        self._closed = True
+        if self._maintainer is not None:
+            self._maintainer.cancel()
+        while self._idle:
+            self._discard(self._idle.pop())
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("connection pool is closed"))
+
+    def stats(self) -> Dict[str, Any]:
+        acquires = self._metrics["acquires"]
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": len(self._waiters),
+            "max_size": self.max_size,
+            **self._metrics,
+            "avg_wait_ms": round(self._wait_seconds / acquires * 1000, 3) if acquires else 0.0,
+        }
+
+
+class PooledCustomerStore:
+    """Async customer lookups for request handling, over a ``ConnectionPool``"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    async def get_by_name(self, full_name: str) -> Optional[Customer]:
+        row = await self.pool.fetch_one(_BY_NAME, (normalize_name(full_name),))
+        return _customer(row) if row else None
+
+    async def find_by_phone(self, phone: str) -> List[Customer]:
+        key = normalize_phone(phone)
+        return [_customer(row) for row in await self.pool.fetch_all(_BY_PHONE, (key, key))]
+
+    async def find_by_account_ending(self, ending: str) -> List[Customer]:
+        return [_customer(row) for row in await self.pool.fetch_all(_BY_ACCOUNT_ENDING, (ending[-4:],))]
+
+    async def close(self):
+        await self.pool.close()
+
+
+def load_csv(store: CustomerStore, path: str, **options) -> int:
+    with open(path, newline="") as source:
+        rows = ({key: value or None for key, value in row.items() if key in _COLUMNS} for row in csv.DictReader(source))
+        return store.bulk_load(rows, **options)
+
+
+def create_customer_store() -> CustomerStore:
+    """SQLite file from ``CUSTOMER_DB_PATH``, or an in-memory database with the demo customers"""
+    path = os.environ.get("CUSTOMER_DB_PATH")
+    if path:
+        print(f"🗄️ Using customer database at {path}")
+        return SQLiteCustomerStore(path)
+    store = SQLiteCustomerStore()
+    store.bulk_load(DEMO_CUSTOMERS)
+    print("🗄️ Using Mock Database for testing")
+    return store
+
+
+def create_customer_db(store: CustomerStore) -> PooledCustomerStore:
+    """Pooled access to ``store``, sized by ``CUSTOMER_DB_POOL_MIN`` / ``CUSTOMER_DB_POOL_MAX``"""
+    return store.pooled(
+        min_size=int(os.environ.get("CUSTOMER_DB_POOL_MIN", 1)),
+        max_size=int(os.environ.get("CUSTOMER_DB_POOL_MAX", 10)),
+        acquire_timeout=float(os.environ.get("CUSTOMER_DB_ACQUIRE_TIMEOUT", 2.0)),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load customers from a CSV file")
+    parser.add_argument("csv_path")
+    parser.add_argument("--db", default="customers.db")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    options = parser.parse_args()
+    customer_store = SQLiteCustomerStore(options.db)
+    started = time.perf_counter()
+    loaded = load_csv(customer_store, options.csv_path, batch_size=options.batch_size, defer_indexes=True)
+    print(f"🗄️ Loaded {loaded} customers in {time.perf_counter() - started:.2f}s "
+          f"({customer_store.count()} in {options.db})")
+    customer_store.close()
@@ -0,0 +1,84 @@
+"""
+Stand-in for a networked customer database, for tests and local load runs.
+
+Serves the customer schema from an in-memory SQLite database but behaves
+like a server on the far side of a network: every statement pays a round
+trip, the first execution of a statement on a connection pays a parse cost
+(what a server-side statement cache saves), the number of open connections
+is capped, and the server can be taken down or have its connections killed.
+"""
+import threading
+import time
+from typing import Iterable, Set
+from app.database.connection import CustomerInput, DEMO_CUSTOMERS, SQLiteCustomerStore
+
+
+class StandInConnection:
+    def __init__(self, database: "StandInDatabase"):
+        self.database = database
+        self.raw = database.store.connect()
+        self.prepared: Set[str] = set()
+        self.killed = False
+        self.closed = False
+
+    def execute(self, sql: str, params: tuple = ()):
+        database = self.database
+        if self.closed:
+            raise ConnectionError("connection is closed")
+        if self.killed or database.down:
+            raise ConnectionError("server closed the connection")
+        if sql not in self.prepared:
+            time.sleep(database.parse_latency)
+            self.prepared.add(sql)
+            database.count("statements_prepared")
+        time.sleep(database.latency)
+        database.count("statements_executed")
+        return self.raw.execute(sql, params)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.raw.close()
+            self.database.disconnected(self)
+
+
+class StandInDatabase:
+    def __init__(self, customers: Iterable[CustomerInput] = DEMO_CUSTOMERS, latency: float = 0.001,
+                 parse_latency: float = 0.002, max_connections: int = 50):
+        self.store = SQLiteCustomerStore()
+        self.store.bulk_load(customers)
+        self.latency = latency
+        self.parse_latency = parse_latency
+        self.max_connections = max_connections
+        self.down = False
+        self.connections: Set[StandInConnection] = set()
+        self.counters = {"connections_opened": 0, "statements_prepared": 0, "statements_executed": 0}
+        self._lock = threading.Lock()  # Connections are opened and used from worker threads
+
+    def connect(self) -> StandInConnection:
+        """Open a connection (the factory handed to ``ConnectionPool``)"""
+        time.sleep(self.latency)
+        with self._lock:
+            if self.down:
+                raise ConnectionError("connection refused")
+            if len(self.connections) >= self.max_connections:
+                raise ConnectionError("too many connections")
+            self.counters["connections_opened"] += 1
+        connection = StandInConnection(self)
+        with self._lock:
+            self.connections.add(connection)
+        return connection
+
+    def disconnected(self, connection: StandInConnection):
+        with self._lock:
+            self.connections.discard(connection)
+
+    def count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def kill_connections(self):
+        """Drop every open connection server-side, as a restart or failover would"""
+        with self._lock:
+            for connection in self.connections:
+                connection.killed = True
@@ -0,0 +1,190 @@
+"""
+Compact in-memory form of ``ConversationState``.
+
+A pydantic ``ConversationState`` carries a ``__dict__``, a fields-set and
+fresh dicts/lists for every session even when they are empty. ``CompactState``
+keeps the same data in ``__slots__``:
+
+- every ``bool`` field is one bit of ``flags`` and every ``Optional[bool]``
+  field two bits (known, value)
+- the step is a small int index into ``STEPS``
+- empty containers and default strings are stored as ``None``
+
+Convert with ``CompactState.from_model`` / ``to_model`` at the boundary;
+flag fields can also be read and written directly as attributes.
+``changes_since`` / ``apply`` express a session as field deltas for the
+session journal. Those name the step by its value and each flag by its field
+name rather than by index and bit, so journals written before a step or bool
+field is added still replay into the right state.
+"""
+from typing import Any, Dict, List, Optional
+from app.models.schemas import ConversationState, ConversationStep
+
+STEPS = tuple(ConversationStep)
+_STEP_INDEX = {step: index for index, step in enumerate(STEPS)}
+
+_FIELDS = ConversationState.model_fields
+FLAG_FIELDS = tuple(name for name, field in _FIELDS.items() if field.annotation is bool)
+TRISTATE_FIELDS = tuple(name for name, field in _FIELDS.items() if field.annotation == Optional[bool])
+
+_FLAG_BITS = {name: 1 << i for i, name in enumerate(FLAG_FIELDS)}
+# (known bit, value bit) for each tri-state, after the plain flags
+_TRISTATE_BITS = {
+    name: (1 << (len(FLAG_FIELDS) + 2 * i), 1 << (len(FLAG_FIELDS) + 2 * i + 1))
+    for i, name in enumerate(TRISTATE_FIELDS)
+}
+
+_CONTAINER_FIELDS = ("slots_filled", "escalation_flags", "script_context", "pending_follow_ups", "risk_signals")
+_DEFAULT_STRINGS = {name: _FIELDS[name].default for name in ("agent_name", "company_name")}
+_INT_FIELDS = ("version", "verification_attempts", "max_attempts", "sms_retry_count", "max_sms_retries")
+
+_covered = set(FLAG_FIELDS) | set(TRISTATE_FIELDS) | set(_CONTAINER_FIELDS) | set(_DEFAULT_STRINGS) | set(_INT_FIELDS)
+_covered |= {"session_id", "current_step", "customer_name"}
+if _covered != set(_FIELDS):
+    raise RuntimeError(f"CompactState does not cover ConversationState fields: {set(_FIELDS) ^ _covered}")
+
+
+def _default_flags() -> int:
+    flags = 0
+    for name, bit in _FLAG_BITS.items():
+        if _FIELDS[name].default:
+            flags |= bit
+    return flags
+
+
+DEFAULT_FLAGS = _default_flags()
+
+
+class CompactState:
+    __slots__ = ("session_id", "step", "flags", "customer_name", "agent_name", "company_name",
+                 "slots_filled", "escalation_flags", "script_context", "pending_follow_ups",
+                 "risk_signals") + _INT_FIELDS
+
+    def __init__(self, session_id: str, step: int = 0):
+        self.session_id = session_id
+        self.step = step
+        self.flags = DEFAULT_FLAGS
+        self.customer_name: Optional[str] = None
+        self.agent_name: Optional[str] = None
+        self.company_name: Optional[str] = None
+        self.slots_filled: Optional[Dict[str, Any]] = None
+        self.escalation_flags: Optional[List[str]] = None
+        self.script_context: Optional[Dict[str, Any]] = None
+        self.pending_follow_ups: Optional[List[str]] = None
+        self.risk_signals: Optional[Dict[str, float]] = None
+        for name in _INT_FIELDS:
+            setattr(self, name, _FIELDS[name].default)
+
+    @property
+    def current_step(self) -> ConversationStep:
+        return STEPS[self.step]
+
+    @current_step.setter
+    def current_step(self, step: ConversationStep):
+        self.step = _STEP_INDEX[step]
+
+    @classmethod
+    def from_model(cls, state: ConversationState) -> "CompactState":
+        compact = cls(state.session_id, _STEP_INDEX[state.current_step])
+        flags = 0
+        for name, bit in _FLAG_BITS.items():
+            if getattr(state, name):
+                flags |= bit
+        for name, (known, value) in _TRISTATE_BITS.items():
+            answer = getattr(state, name)
+            if answer is not None:
+                flags |= known | (value if answer else 0)
+        compact.flags = flags
+
+        compact.customer_name = state.customer_name
+        for name, default in _DEFAULT_STRINGS.items():
+            current = getattr(state, name)
+            if current != default:
+                setattr(compact, name, current)
+        for name in _CONTAINER_FIELDS:
+            current = getattr(state, name)
+            if current:
+                # Own copy: the caller keeps mutating the model it passed in
+                setattr(compact, name, current.copy())
+        for name in _INT_FIELDS:
+            setattr(compact, name, getattr(state, name))
+        return compact
+
+    def to_model(self) -> ConversationState:
+        """Rebuild the pydantic model; containers are fresh copies the caller may mutate"""
+        fields: Dict[str, Any] = {
+            "session_id": self.session_id,
+            "current_step": STEPS[self.step],
+            "customer_name": self.customer_name,
+            "slots_filled": dict(self.slots_filled or ()),
+            "escalation_flags": list(self.escalation_flags or ()),
+            "script_context": dict(self.script_context or ()),
+            "pending_follow_ups": list(self.pending_follow_ups or ()),
+            "risk_signals": dict(self.risk_signals or ()),
+        }
+        for name, default in _DEFAULT_STRINGS.items():
+            fields[name] = getattr(self, name) or default
+        for name in _INT_FIELDS:
+            fields[name] = getattr(self, name)
+        flags = self.flags
+        for name, bit in _FLAG_BITS.items():
+            fields[name] = bool(flags & bit)
+        for name, (known, value) in _TRISTATE_BITS.items():
+            fields[name] = bool(flags & value) if flags & known else None
+        # Every field comes from an already-validated model, so skip validation
+        return ConversationState.model_construct(**fields)
+
+    def changes_since(self, previous: Optional["CompactState"] = None) -> Dict[str, Any]:
+        """Fields that differ from ``previous`` (or from a fresh session), JSON-ready"""
+        base = previous if previous is not None else _BLANK
+        changes = {name: getattr(self, name) for name in _DATA_SLOTS if getattr(self, name) != getattr(base, name)}
+        if self.step != base.step:
+            changes["current_step"] = STEPS[self.step].value
+        if self.flags != base.flags:
+            for name in _NAMED_FLAGS:
+                if getattr(self, name) != getattr(base, name):
+                    changes[name] = getattr(self, name)
+        return changes
+
+    def apply(self, changes: Dict[str, Any]):
+        for name, value in changes.items():
+            if name == "current_step":
+                self.current_step = ConversationStep(value)
+            elif name in _APPLICABLE:
+                setattr(self, name, value)
+            # Anything else is a field since removed from ConversationState
+
+
+def _flag_property(bit: int) -> property:
+    def get(self) -> bool:
+        return bool(self.flags & bit)
+
+    def set(self, on: bool):
+        self.flags = self.flags | bit if on else self.flags & ~bit
+
+    return property(get, set)
+
+
+def _tristate_property(known: int, value: int) -> property:
+    def get(self) -> Optional[bool]:
+        return bool(self.flags & value) if self.flags & known else None
+
+    def set(self, answer: Optional[bool]):
+        flags = self.flags & ~(known | value)
+        if answer is not None:
+            flags |= known | (value if answer else 0)
+        self.flags = flags
+
+    return property(get, set)
+
+
+for _name, _bit in _FLAG_BITS.items():
+    setattr(CompactState, _name, _flag_property(_bit))
+for _name, (_known, _value) in _TRISTATE_BITS.items():
+    setattr(CompactState, _name, _tristate_property(_known, _value))
+
+# Journaled as themselves; step and flags go by name (see ``changes_since``)
+_DATA_SLOTS = tuple(name for name in CompactState.__slots__ if name not in ("session_id", "step", "flags"))
+_NAMED_FLAGS = FLAG_FIELDS + TRISTATE_FIELDS
+_APPLICABLE = frozenset(_DATA_SLOTS) | frozenset(_NAMED_FLAGS)
+_BLANK = CompactState("")
@@ -0,0 +1,35 @@
+"""
+Customer records as stored by the customer database.
+"""
+import re
+from typing import Optional
+from pydantic import BaseModel
+
+_NOT_NAME = re.compile(r"[^a-z' -]+")
+_NOT_DIGIT = re.compile(r"\D+")
+
+
+def normalize_name(name: str) -> str:
+    """Index key for names: lowercase, letters/hyphen/apostrophe only, single spaces"""
+    return " ".join(_NOT_NAME.sub(" ", name.lower()).split())
+
+
+def normalize_phone(phone: str) -> str:
+    """Index key for phone numbers: the last 10 digits"""
+    return _NOT_DIGIT.sub("", phone)[-10:]
+
+
+class Customer(BaseModel):
+    full_name: str
+    dob: str  # ISO date, as produced by extraction
+    ssn_last4: str
+    email: Optional[str] = None
+    phone_number: Optional[str] = None  # Mobile, used for VBT
+    home_number: Optional[str] = None
+    bank_account: Optional[str] = None
+    bank_routing: Optional[str] = None
+    customer_id: Optional[int] = None  # Assigned by the store
+
+    @property
+    def account_ending(self) -> Optional[str]:
+        return self.bank_account[-4:] if self.bank_account and len(self.bank_account) >= 4 else None
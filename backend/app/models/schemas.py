@@ -156,6 +156,7 @@ class ConversationStep(str, Enum):
 class ConversationState(BaseModel):
     session_id: str
     current_step: ConversationStep
+    version: int = 0  # Bumped on every save; the session store's compare-and-set token
     customer_name: Optional[str] = None
     agent_name: str = "Virtual Assistant"
     company_name: str = "Dash Of Cash"
@@ -164,6 +165,7 @@ class ConversationState(BaseModel):
     max_attempts: int = 3
     escalation_flags: List[str] = []
     script_context: Dict[str, Any] = {}
+    risk_signals: Dict[str, float] = {}  # Running risk features and score, see app.core.risk
     
     # Identity verification status
     dob_verified: bool = False
@@ -180,6 +182,7 @@ class ConversationState(BaseModel):
     sms_retry_count: int = 0
     max_sms_retries: int = 2
     has_time_to_continue: bool = True
+    pending_follow_ups: List[str] = []  # Delivered by the scheduler, collected by the client
     
     # Qualifying questions
     is_military_member: Optional[bool] = None
@@ -214,9 +217,13 @@ class LoanDecision(BaseModel):
     approved: bool
     decline_reasons: List[str] = []
 
+# A chat reply is a sentence or two; anything longer is rejected before it reaches extraction
+MAX_MESSAGE_LENGTH = 2000
+MAX_SESSION_ID_LENGTH = 64
+
 class ChatRequest(BaseModel):
-    session_id: str
-    message: str
+    session_id: str = Field(..., max_length=MAX_SESSION_ID_LENGTH)
+    message: str = Field(..., max_length=MAX_MESSAGE_LENGTH)
     
 class ChatResponse(BaseModel):
     response: str
@@ -0,0 +1,148 @@
+"""
+OpenAI-compatible chat completions stub for offline tests and load tests.
+
+Answers ``POST .../chat/completions`` (OpenAI and Azure deployment paths)
+over keep-alive HTTP/1.1 after a configurable latency, and fails a share of
+requests with 503 or 429 so retries and the circuit breaker can be exercised
+without a real model:
+
+    python -m app.utils.llm_stub --port 8089 --latency 0.2 --error-rate 0.05
+
+then point the API at it with ``LLM_BASE_URL=http://127.0.0.1:8089/v1``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def empty_reply(request: Dict[str, Any]) -> str:
+    return "{}"
+
+
+class LLMStub:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, reply: Callable[[Dict[str, Any]], str] = empty_reply,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.reply = reply
+        self.random = random.Random(seed)
+        self.fail_next: List[int] = []  # Status codes to answer the next requests with, in order
+        self.requests: List[Dict[str, Any]] = []  # Path, headers and body of every request
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening; returns the bound port (pass 0 for an ephemeral one)"""
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections would otherwise outlive the server; closing
+            # them ends their handlers (cancelling would log noise on Python 3.11)
+            for writer in self._handlers.values():
+                writer.close()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self.server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        handler = asyncio.current_task()
+        self._handlers[handler] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload, extra = await self._handle(method, path, headers, body)
+                encoded = json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}", "Content-Type: application/json",
+                        f"Content-Length: {len(encoded)}", *(f"{k}: {v}" for k, v in extra.items())]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + encoded)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._handlers.pop(handler, None)
+            writer.close()
+
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        if method != "POST" or not path.split("?")[0].endswith("/chat/completions"):
+            return 404, {"error": {"message": f"no route for {method} {path}"}}, {}
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 400, {"error": {"message": "request body is not JSON"}}, {}
+        self.requests.append({"path": path, "headers": headers, "body": request})
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        finally:
+            self.in_flight -= 1
+
+        if self.fail_next:
+            status = self.fail_next.pop(0)
+        elif self.random.random() < self.rate_limit_rate:
+            status = 429
+        elif self.random.random() < self.error_rate:
+            status = 503
+        else:
+            status = 200
+        if status == 429:
+            return 429, {"error": {"message": "rate limited"}}, {"retry-after-ms": "50"}
+        if status != 200:
+            return status, {"error": {"message": "stub failure"}}, {}
+        return 200, {
+            "id": f"stub-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": self.reply(request)}}],
+        }, {}
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+async def _main(options: argparse.Namespace):
+    stub = LLMStub(options.latency, options.jitter, options.error_rate, options.rate_limit_rate)
+    bound = await stub.start(options.host, options.port)
+    print(f"🤖 LLM stub listening on http://{options.host}:{bound}/v1")
+    await stub.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share answered with 429")
+    asyncio.run(_main(parser.parse_args()))
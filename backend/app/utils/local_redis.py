@@ -0,0 +1,233 @@
+"""
+Minimal Redis-protocol (RESP2) server for local development and tests.
+
+Implements just what the session store uses - strings with expiry plus
+WATCH/MULTI/EXEC optimistic transactions - so the API can be run with
+several workers without installing Redis:
+
+    python -m app.utils.local_redis --port 6379
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _Error(Exception):
+    pass
+
+
+class LocalRedis:
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        # Bumped on every write so WATCH can tell whether a key changed
+        self.revisions: Dict[bytes, int] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening; returns the bound port (pass 0 for an ephemeral one)"""
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    # --- storage -------------------------------------------------------
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._delete(key)
+            return None
+        return value
+
+    def _set(self, key: bytes, value: bytes, expires_at: Optional[float]):
+        self.data[key] = (value, expires_at)
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+    def _delete(self, key: bytes) -> bool:
+        if self.data.pop(key, None) is None:
+            return False
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+        return True
+
+    # --- commands ------------------------------------------------------
+
+    def execute(self, args: List[bytes]):
+        name = args[0].upper().decode()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise _Error(f"ERR unknown command '{name}'")
+        return handler(*args[1:])
+
+    def cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def cmd_select(self, *args):
+        return "OK"
+
+    def cmd_client(self, *args):
+        return "OK"
+
+    def cmd_get(self, key):
+        return self._get(key)
+
+    def cmd_getex(self, key, *options):
+        value = self._get(key)
+        if value is not None and options:
+            self._set(key, value, self._expiry(options))
+        return value
+
+    def cmd_set(self, key, value, *options):
+        flags = {option.upper() for option in options}
+        exists = self._get(key) is not None
+        if (b"NX" in flags and exists) or (b"XX" in flags and not exists):
+            return None
+        if b"KEEPTTL" in flags and exists:
+            expires_at = self.data[key][1]
+        else:
+            expires_at = self._expiry(options)
+        self._set(key, value, expires_at)
+        return "OK"
+
+    def cmd_del(self, *keys):
+        return sum(self._delete(key) for key in keys)
+
+    def cmd_exists(self, *keys):
+        return sum(self._get(key) is not None for key in keys)
+
+    def cmd_expire(self, key, seconds):
+        value = self._get(key)
+        if value is None:
+            return 0
+        self._set(key, value, time.monotonic() + int(seconds))
+        return 1
+
+    def cmd_ttl(self, key):
+        if self._get(key) is None:
+            return -2
+        expires_at = self.data[key][1]
+        return -1 if expires_at is None else max(0, round(expires_at - time.monotonic()))
+
+    def cmd_dbsize(self):
+        return sum(self._get(key) is not None for key in list(self.data))
+
+    def cmd_flushdb(self, *args):
+        for key in list(self.data):
+            self._delete(key)
+        return "OK"
+
+    @staticmethod
+    def _expiry(options) -> Optional[float]:
+        options = list(options)
+        for i, option in enumerate(options[:-1]):
+            if option.upper() == b"EX":
+                return time.monotonic() + int(options[i + 1])
+            if option.upper() == b"PX":
+                return time.monotonic() + int(options[i + 1]) / 1000
+        return None
+
+    # --- connection ----------------------------------------------------
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        watched: Dict[bytes, int] = {}
+        queued: Optional[List[List[bytes]]] = None
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                name = args[0].upper()
+                if name == b"WATCH":
+                    for key in args[1:]:
+                        watched[key] = self.revisions.get(key, 0)
+                    reply = "OK"
+                elif name == b"UNWATCH":
+                    watched.clear()
+                    reply = "OK"
+                elif name == b"MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == b"DISCARD":
+                    queued = None
+                    watched.clear()
+                    reply = "OK"
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = _Error("ERR EXEC without MULTI")
+                    elif any(self.revisions.get(key, 0) != revision for key, revision in watched.items()):
+                        reply = None  # Null array: a watched key changed, nothing was applied
+                    else:
+                        reply = [self._safe_execute(command) for command in queued]
+                    queued = None
+                    watched.clear()
+                    if reply is None:
+                        writer.write(b"*-1\r\n")
+                        await writer.drain()
+                        continue
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    reply = self._safe_execute(args)
+                writer.write(self._encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _safe_execute(self, args: List[bytes]):
+        try:
+            return self.execute(args)
+        except _Error as e:
+            return e
+        except (TypeError, ValueError):
+            return _Error(f"ERR wrong arguments for '{args[0].decode()}' command")
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # Inline command (telnet / redis-cli --no-raw)
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    @classmethod
+    def _encode(cls, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, _Error):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, bool) or isinstance(reply, int):
+            return f":{int(reply)}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(cls._encode(item) for item in reply)
+
+
+async def _main(host: str, port: int):
+    server = LocalRedis()
+    bound = await server.start(host, port)
+    print(f"🗄️ Local Redis stand-in listening on {host}:{bound}")
+    await server.server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    options = parser.parse_args()
+    asyncio.run(_main(options.host, options.port))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Card validation: the old per-call Luhn closure vs ``CardValidator``.
+
+The baseline is the check ``validate_debit_card`` used to do (digits, length
+and a Luhn closure building lists of ints); the validator also looks up the
+BIN range, single-card and as a NumPy batch over stored numbers.
+
+Run from the repository root:
+    python benchmarks/bench_card_validation.py [cards]
+"""
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.card_validation import BinIndex, CardValidator
+
+
+def old_validate(card_number: str) -> bool:
+    if not card_number.isdigit() or len(card_number) != 16:
+        return False
+
+    def luhn_check(card_num):
+        def digits_of(n):
+            return [int(d) for d in str(n)]
+        digits = digits_of(card_num)
+        odd_digits = digits[-1::-2]
+        even_digits = digits[-2::-2]
+        checksum = sum(odd_digits)
+        for d in even_digits:
+            checksum += sum(digits_of(d * 2))
+        return checksum % 10 == 0
+
+    return luhn_check(card_number)
+
+
+def timed(label: str, run):
+    started = time.perf_counter()
+    result = run()
+    print(f"  {label:<28}: {time.perf_counter() - started:6.2f}s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(5)
+    cards = [str(rng.randrange(4 * 10 ** 15, 6 * 10 ** 15)) for _ in range(count)]
+    validator = CardValidator(BinIndex.load())  # The bundled sample ranges
+
+    print(f"{count} cards")
+    old = timed("old closure (no BIN check)", lambda: [old_validate(card) for card in cards])
+    single = timed("CardValidator.check", lambda: [validator.check(card) for card in cards])
+    batch = timed("CardValidator.validate_batch", lambda: validator.validate_batch(cards))
+
+    assert [c.reason != "checksum" and c.reason != "format" for c in single] == old
+    assert batch.valid.tolist() == [c.valid for c in single]
+
+
+if __name__ == "__main__":
+    main()
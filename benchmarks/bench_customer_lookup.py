@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Customer lookup latency at scale: the indexed SQLite store.
+
+Bulk loads N synthetic customers (deferred index build), then times random
+lookups by name, phone and account ending.
+
+Run from the repository root:
+    python benchmarks/bench_customer_lookup.py [customers]
+"""
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.databse import Customer
+from app.database.connection import SQLiteCustomerStore
+
+FIRST = ["John", "Mary", "Ana", "Luis", "Wei", "Fatima", "Olga", "Kwame", "Priya", "Noah"]
+LAST = ["Smith", "Garcia", "Nguyen", "Okafor", "Kowalski", "Haddad", "Silva", "Tanaka", "Brown", "Ivanova"]
+LOOKUPS = 20_000
+
+
+def customer(i: int) -> Customer:
+    return Customer.model_construct(
+        full_name=f"{FIRST[i % 10]} {LAST[i // 10 % 10]}-{i}",
+        dob=f"19{50 + i % 50}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        ssn_last4=f"{i % 10000:04d}",
+        email=f"customer{i}@example.com",
+        phone_number=f"{2000000000 + i}",
+        home_number=f"{3000000000 + i}",
+        bank_account=f"{10**9 + i * 7}",
+        bank_routing="021000021",
+    )
+
+
+def per_lookup_us(lookup, keys) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    store = SQLiteCustomerStore()
+    started = time.perf_counter()
+    store.bulk_load((customer(i) for i in range(count)), defer_indexes=True)
+    load_seconds = time.perf_counter() - started
+
+    sample = [customer(random.randrange(count)) for _ in range(LOOKUPS)]
+    print(f"{count} customers loaded in {load_seconds:.1f}s")
+    print(f"  by name           : {per_lookup_us(store.get_by_name, [c.full_name for c in sample]):7.1f} µs/lookup")
+    print(f"  by phone          : {per_lookup_us(store.find_by_phone, [c.home_number for c in sample]):7.1f} µs/lookup")
+    endings = [c.account_ending for c in sample]
+    matches = sum(len(store.find_by_account_ending(e)) for e in endings[:100]) / 100
+    # Only 10k possible endings, so at this scale each one matches many customers
+    print(f"  by account ending : {per_lookup_us(store.find_by_account_ending, endings):7.1f} µs/lookup"
+          f" ({matches:.0f} matches each)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Date of birth parsing: regex cascades vs the single-pass token parser.
+
+Two baselines: the original cascade (33 ``re.search`` calls on string
+literals, one per format and month) and the fused registry patterns that
+replaced it (three numeric patterns and two month-name alternations). Both
+only understand digits; the spoken part of the corpus is there to show what
+the parser adds, and counts as a miss for them.
+
+Run from the repository root:
+    python benchmarks/bench_dates.py [iterations]
+"""
+import datetime as dt
+import os
+import re
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.dates import MONTHS, find_date_of_birth
+
+CORPUS = [
+    ("01/15/1990", "1990-01-15"),
+    ("1990-01-15", "1990-01-15"),
+    ("my dob is 3-4-1985", "1985-03-04"),
+    ("01/15/90", "1990-01-15"),
+    ("I was born on July 22, 2000", "2000-07-22"),
+    ("22 december 1985", "1985-12-22"),
+    ("my birthday is sept 3 1979", "1979-09-03"),
+    ("John Smith, born 01/15/1990, SSN ends 1234", "1990-01-15"),
+    ("sure, it's november 30th, 1975", "1975-11-30"),
+    ("the 3rd of sept 1979", "1979-09-03"),
+    ("the fifteenth of January nineteen ninety", "1990-01-15"),
+    ("january twenty-first two thousand and three", "2003-01-21"),
+    ("not sure what you mean", None),
+    ("yes that's correct", None),
+    ("can you repeat the question please, I did not catch it", None),
+]
+
+_MONTH_NAMES = [
+    'january|jan', 'february|feb', 'march|mar', 'april|apr', 'may', 'june|jun', 'july|jul',
+    'august|aug', 'september|sep|sept', 'october|oct', 'november|nov', 'december|dec'
+]
+_CASCADE = (
+    [(r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})', 'mdy'),
+     (r'(\d{4})[/\-](\d{1,2})[/\-](\d{1,2})', 'ymd'),
+     (r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})', 'mdy2')]
+    + [(rf'({m})\s*,?\s*(\d{{1,2}})\s*,?\s*(\d{{4}})', 'month_name') for m in _MONTH_NAMES]
+    + [(rf'(\d{{1,2}})\s*,?\s*({m})\s*,?\s*(\d{{4}})', 'day_month_name') for m in _MONTH_NAMES]
+)
+
+
+def _build(format_type: str, groups) -> dt.date:
+    if format_type == 'mdy':
+        return dt.date(int(groups[2]), int(groups[0]), int(groups[1]))
+    if format_type == 'ymd':
+        return dt.date(int(groups[0]), int(groups[1]), int(groups[2]))
+    if format_type == 'mdy2':
+        year = int(groups[2])
+        return dt.date(year + (2000 if year < 50 else 1900), int(groups[0]), int(groups[1]))
+    if format_type == 'month_name':
+        return dt.date(int(groups[2]), MONTHS[groups[0]], int(groups[1]))
+    return dt.date(int(groups[2]), MONTHS[groups[1]], int(groups[0]))
+
+
+def cascade(text: str):
+    """The original: one re.search on a string literal per format and month"""
+    text = text.lower().strip()
+    for pattern, format_type in _CASCADE:
+        match = re.search(pattern, text)
+        if match:
+            try:
+                return _build(format_type, match.groups())
+            except ValueError:
+                continue
+    return None
+
+
+_ALTERNATION = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_NUMERIC = [(re.compile(pattern), format_type) for pattern, format_type in _CASCADE[:3]]
+_NAMED = [
+    (re.compile(rf'(?P<month>{_ALTERNATION})\s*,?\s*(?P<day>\d{{1,2}})\s*,?\s*(?P<year>\d{{4}})'), 'month_name'),
+    (re.compile(rf'(?P<day>\d{{1,2}})\s*,?\s*(?P<month>{_ALTERNATION})\s*,?\s*(?P<year>\d{{4}})'), 'day_month_name'),
+]
+
+
+def fused(text: str):
+    """What the parser replaces: compiled numeric patterns, then two month-name alternations"""
+    text = text.lower().strip()
+    numeric = _NUMERIC if ('/' in text or '-' in text) else ()
+    for pattern, format_type in numeric:
+        match = pattern.search(text)
+        if match:
+            try:
+                return _build(format_type, match.groups())
+            except ValueError:
+                continue
+    for pattern, format_type in _NAMED:
+        for match in pattern.finditer(text):
+            groups = match.group('day', 'month', 'year')
+            if format_type == 'month_name':
+                groups = (groups[1], groups[0], groups[2])
+            try:
+                return _build(format_type, groups)
+            except ValueError:
+                continue
+    return None
+
+
+def parser(text: str):
+    found = find_date_of_birth(text.lower().strip())
+    return found.date if found else None
+
+
+def measure(label: str, parse, iterations: int):
+    correct = sum((str(parse(text)) if expected else parse(text)) == (expected or None) for text, expected in CORPUS)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for text, _ in CORPUS:
+            parse(text)
+    per_call = (time.perf_counter() - started) / (iterations * len(CORPUS)) * 1e6
+    print(f"   {label:<14}: {per_call:7.2f} µs/call   {correct}/{len(CORPUS)} correct")
+
+
+def main(iterations: int = 5000):
+    print(f"📊 Corpus: {len(CORPUS)} messages x {iterations} iterations")
+    measure("33-regex", cascade, iterations)
+    measure("fused regex", fused, iterations)
+    measure("token parser", parser, iterations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Re-scoring completed applications: per-record checks vs the columnar policy.
+
+The per-record baseline is ``evaluate``, the plain-Python form of the
+policy that ``evaluate_loan_eligibility`` uses, called once per
+``slots_filled`` dict. The loaded applications are moved out
+of the cyclic GC's view (``gc.freeze``), as a long-running re-scoring job
+would do, so neither side pays for rescanning a million live input dicts.
+
+Run from the repository root:
+    python benchmarks/bench_eligibility.py [applications]
+"""
+import gc
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.eligibility import evaluate, evaluate_batch
+
+
+def make_applications(count: int):
+    rng = random.Random(7)
+    applications = []
+    for i in range(count):
+        record = {"full_name": f"Customer {i}", "dob": "1990-01-15", "ssn_last4": "1234",
+                  "email": f"c{i}@example.com", "military_status": False, "account_type": "checking",
+                  "receives_paycheck_in_account": True, "paycheck_type": "direct deposit"}
+        roll = rng.random()
+        if roll > 0.02:
+            record["bank_account"] = str(rng.randrange(10**7, 10**12))
+        if roll > 0.01:
+            record["bank_routing"] = str(rng.randrange(10**8, 10**9))
+        applications.append(record)
+    return applications
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    applications = make_applications(count)
+    gc.collect()
+    gc.freeze()
+
+    started = time.perf_counter()
+    baseline = [evaluate(record) for record in applications]
+    baseline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = evaluate_batch(applications)
+    scored_seconds = time.perf_counter() - started
+    decisions = batch.decisions()
+    decisions_seconds = time.perf_counter() - started
+
+    assert [d.approved for d in decisions] == [d.approved for d in baseline]
+    print(f"{count} applications: {batch.summary()}")
+    print(f"  per-record evaluate             : {baseline_seconds:6.2f}s")
+    print(f"  columnar policy (masks only)    : {scored_seconds:6.2f}s")
+    print(f"  columnar policy + LoanDecisions : {decisions_seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
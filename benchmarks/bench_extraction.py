@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Per-call extraction latency: legacy string-pattern cascade vs compiled registry.
+
+The legacy path only looks for the slot of the current step, and so does
+the compiled per-step extractor it is compared with. The multi-slot pass
+(``extract_information``) runs that extractor too, after first claiming every
+other slot it recognises; it does strictly more work per call in exchange
+for fewer conversation turns, and is reported on its own line.
+
+Run from the repository root:
+    python benchmarks/bench_extraction.py
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+import datetime as dt
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.azure_ai_client import AzureAIClient
+
+# Realistic answers, grouped by the step they are given at
+CORPUS = [
+    (ConversationStep.ASK_NAME, "My name is John Smith"),
+    (ConversationStep.ASK_NAME, "this is mary-anne o'neil speaking"),
+    (ConversationStep.ASK_NAME, "Jane Doe"),
+    (ConversationStep.ASK_DOB, "01/15/1990"),
+    (ConversationStep.ASK_DOB, "1990-01-15"),
+    (ConversationStep.ASK_DOB, "I was born on July 22, 2000"),
+    (ConversationStep.ASK_DOB, "22 december 1985"),
+    (ConversationStep.ASK_DOB, "my birthday is sept 3 1979"),
+    (ConversationStep.ASK_DOB, "not sure what you mean"),
+    (ConversationStep.ASK_SSN, "the last four digits are 1234"),
+    (ConversationStep.ASK_SSN, "1234"),
+    (ConversationStep.ASK_EMAIL, "no, my new email is jane.doe@gmail.com"),
+    (ConversationStep.ASK_EMAIL, "yes that's correct"),
+    (ConversationStep.VBT_CODE_INPUT, "the code is 482913"),
+    (ConversationStep.BANK_ACCOUNT_INFO, "account number is 1234567890 and routing is 123456789"),
+    (ConversationStep.DEBIT_CARD_COLLECTION, "4111111111111111 JANE A DOE 04/27 123"),
+]
+
+_LEGACY_MONTHS = [
+    'january|jan', 'february|feb', 'march|mar', 'april|apr', 'may', 'june|jun', 'july|jul',
+    'august|aug', 'september|sep|sept', 'october|oct', 'november|nov', 'december|dec'
+]
+_LEGACY_DOB = (
+    [(r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})', 'mdy'),
+     (r'(\d{4})[/\-](\d{1,2})[/\-](\d{1,2})', 'ymd'),
+     (r'(\d{1,2})[/\-](\d{1,2})[/\-](\d{2})', 'mdy2')]
+    + [(rf'({m})\s*,?\s*(\d{{1,2}})\s*,?\s*(\d{{4}})', 'month_name') for m in _LEGACY_MONTHS]
+    + [(rf'(\d{{1,2}})\s*,?\s*({m})\s*,?\s*(\d{{4}})', 'day_month_name') for m in _LEGACY_MONTHS]
+)
+_LEGACY_MONTH_MAP = {
+    'january': 1, 'jan': 1, 'february': 2, 'feb': 2, 'march': 3, 'mar': 3, 'april': 4, 'apr': 4,
+    'may': 5, 'june': 6, 'jun': 6, 'july': 7, 'jul': 7, 'august': 8, 'aug': 8, 'september': 9,
+    'sep': 9, 'sept': 9, 'october': 10, 'oct': 10, 'november': 11, 'nov': 11, 'december': 12, 'dec': 12
+}
+_LEGACY_NAME = [r"my name is (.+?)(?:\.|$|,|\sand\s)", r"i'm (.+?)(?:\.|$|,|\sand\s)",
+                r"i am (.+?)(?:\.|$|,|\sand\s)", r"call me (.+?)(?:\.|$|,|\sand\s)",
+                r"this is (.+?)(?:\.|$|,|\sand\s)", r"^(.+?)(?:\.|$)"]
+_LEGACY_SEARCH = {
+    ConversationStep.ASK_SSN: [r"(?:last|final|end)\s*(?:four|4)\s*(?:digits?|numbers?)\s*(?:are|is)?\s*(\d{4})",
+                               r"(?:ssn|social)\s*(?:ends?|ending)\s*(?:in|with)?\s*(\d{4})", r"\b(\d{4})\b"],
+    ConversationStep.ASK_EMAIL: [r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b',
+                                 r'(?:email|address|update|new|change)\s+(?:is\s+|to\s+)?([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+                                 r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'],
+    ConversationStep.VBT_CODE_INPUT: [r"(?:code|verification)\s*(?:is|was)?\s*(\d{6})",
+                                      r"(?:received|got)\s*(\d{6})", r"\b(\d{6})\b"],
+}
+_LEGACY_ACCOUNT = [r"account\s+(?:number\s+)?(?:is\s+)?(\d{8,12})", r"checking\s+(?:account\s+)?(?:is\s+)?(\d{8,12})",
+                   r"savings\s+(?:account\s+)?(?:is\s+)?(\d{8,12})", r"\b(\d{8,12})\b"]
+_LEGACY_ROUTING = [r"routing\s+(?:number\s+)?(?:is\s+)?(\d{9})", r"transit\s+(?:number\s+)?(?:is\s+)?(\d{9})",
+                   r"\b(\d{9})\b"]
+
+
+def _legacy_first(patterns, text, flags=0):
+    for pattern in patterns:
+        match = re.search(pattern, text, flags)
+        if match:
+            return match
+    return None
+
+
+def _legacy_name(text: str):
+    for pattern in _LEGACY_NAME:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            name = re.sub(r'\b(speaking|here|from|the|customer|client)\b', '', match.group(1).strip(),
+                          flags=re.IGNORECASE)
+            words = name.split()
+            if len(words) >= 2 and all(re.match(r"[a-zA-Z\-'\.]+", word) for word in words):
+                return {'full_name': ' '.join(words).title()}
+    return {}
+
+
+def _legacy_bank(text: str):
+    extracted = {}
+    account = _legacy_first(_LEGACY_ACCOUNT, text)
+    if account:
+        extracted['bank_account'] = account.group(1)
+    routing = _legacy_first(_LEGACY_ROUTING, text)
+    if routing:
+        extracted['bank_routing'] = routing.group(1)
+    return extracted
+
+
+def _legacy_card(text: str):
+    extracted = {}
+    card = re.search(r'\b(\d{16})\b', text)
+    if card:
+        extracted['card_number'] = card.group(1)
+    for cvv in re.findall(r'\b(\d{3,4})\b', text):
+        if cvv != extracted.get('card_number', '')[:4]:
+            extracted['card_cvv'] = cvv
+            break
+    expiry = re.search(r'(\d{1,2})/(\d{2})', text)
+    if expiry:
+        month, year = expiry.groups()
+        extracted['card_expiry'] = f"{month.zfill(2)}/{year}"
+    names = [word for word in text.upper().split() if word.isalpha() and len(word) > 1]
+    if len(names) >= 2:
+        extracted['card_name'] = ' '.join(names[:3])
+    return extracted
+
+
+def legacy_extract(user_message: str, step: ConversationStep):
+    """The pre-registry behaviour: an if/elif on step and re.search on string literals, same results kept"""
+    text = user_message.lower().strip()
+    if step == ConversationStep.ASK_NAME:
+        return _legacy_name(text)
+    if step == ConversationStep.ASK_DOB:
+        for pattern, format_type in _LEGACY_DOB:
+            match = re.search(pattern, text)
+            if match:
+                groups = match.groups()
+                try:
+                    if format_type == 'mdy':
+                        return dt.date(int(groups[2]), int(groups[0]), int(groups[1]))
+                    if format_type == 'ymd':
+                        return dt.date(int(groups[0]), int(groups[1]), int(groups[2]))
+                    if format_type == 'mdy2':
+                        return dt.date(1900 + int(groups[2]), int(groups[0]), int(groups[1]))
+                    if format_type == 'month_name':
+                        return dt.date(int(groups[2]), _LEGACY_MONTH_MAP[groups[0]], int(groups[1]))
+                    return dt.date(int(groups[2]), _LEGACY_MONTH_MAP[groups[1]], int(groups[0]))
+                except ValueError:
+                    continue
+        return None
+    if step == ConversationStep.BANK_ACCOUNT_INFO:
+        return _legacy_bank(text)
+    if step == ConversationStep.DEBIT_CARD_COLLECTION:
+        return _legacy_card(text)
+    match = _legacy_first(_LEGACY_SEARCH.get(step, []), text)
+    return match.group(1) if match else None
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for step, message in CORPUS:
+            fn(message, step)
+    return (time.perf_counter() - start) / (iterations * len(CORPUS)) * 1e6
+
+
+def main(iterations: int = 2000):
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = AzureAIClient()
+
+        def compiled_step_extract(message, step):
+            # The same job as the legacy cascade: the current step's slot only
+            text = message.lower().strip()
+            if step == ConversationStep.ASK_DOB:
+                return client._extract_date_of_birth(text)
+            extractor = client._step_extractors.get(step)
+            return extractor(text) if extractor is not None else None
+
+        def multi_slot_extract(message, step):
+            # Drive the coroutine by hand so the event loop is not part of the measurement
+            coro = client.extract_information(message, step)
+            try:
+                coro.send(None)
+            except StopIteration:
+                pass
+
+        legacy_us = _time_per_call(legacy_extract, iterations)
+        compiled_us = _time_per_call(compiled_step_extract, iterations)
+        multi_slot_us = _time_per_call(multi_slot_extract, iterations)
+
+    print(f"📊 Corpus: {len(CORPUS)} messages x {iterations} iterations")
+    print(f"   legacy cascade   : {legacy_us:8.2f} µs/call")
+    print(f"   compiled step    : {compiled_us:8.2f} µs/call")
+    print(f"   speedup          : {legacy_us / compiled_us:8.2f}x")
+    print(f"   multi-slot pass  : {multi_slot_us:8.2f} µs/call (every slot, not just the step's)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Intent classification: the old substring scans vs ``IntentClassifier``.
+
+The baseline is what a turn used to pay to answer its three questions (yes?
+code refused? card refused?): three lower-cased ``any(word in message)``
+scans. The classifier tokenizes once and runs one automaton pass that answers
+all three, single-message and through ``classify_batch`` (which classifies a
+repeated message once).
+
+Run from the repository root:
+    python benchmarks/bench_intents.py [messages]
+"""
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.intents import IntentClassifier
+
+POSITIVE = ['yes', 'yeah', 'yep', 'correct', 'right', "that's right", 'affirmative', 'sure', 'okay', 'ok', 'true']
+NEGATIVE = ['no', 'nope', 'incorrect', 'wrong', "that's not right", 'negative', 'not correct', 'false']
+CODE_REFUSAL = ['refuse', "don't want", 'no thanks', 'not interested', "don't send", 'no texts']
+CARD_REFUSAL = ['refuse', "don't want", 'not comfortable', "won't provide", 'no thanks', "don't give"]
+
+REPLIES = [
+    "yes", "Yeah that's right", "nope", "no thanks", "I don't want to give my card", "not sure",
+    "I booked it last week", "I know my account number", "that is correct, thank you so much",
+    "hmm let me check, I think it is right", "I'd rather not say", "not ok", "sure thing",
+]
+
+
+def old_classify(message: str):
+    message = message.lower()
+    if any(word in message for word in POSITIVE):
+        is_yes = True
+    else:
+        is_yes = False
+        any(word in message for word in NEGATIVE)
+    return (is_yes, any(word in message for word in CODE_REFUSAL),
+            any(word in message for word in CARD_REFUSAL))
+
+
+def timed(label: str, run):
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<32}: {elapsed:6.2f}s  ({len(result) / elapsed:,.0f} msg/s)")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(11)
+    # Half are stock replies, half unique (a reply with a number in it), so the batch's dedup only helps half
+    messages = [rng.choice(REPLIES) if i % 2 else f"{rng.choice(REPLIES)} {i}" for i in range(count)]
+    classifier = IntentClassifier()
+
+    print(f"{count} messages")
+    old = timed("old substring scans", lambda: [old_classify(m) for m in messages])
+    single = timed("IntentClassifier.classify", lambda: [classifier.classify(m) for m in messages])
+    batch = timed("IntentClassifier.classify_batch", lambda: classifier.classify_batch(messages))
+
+    assert batch == single
+    disagreements = sum(o[0] != (i.label == "yes") for o, i in zip(old, single))
+    print(f"  yes/no disagreements with the old scan: {disagreements / count:.1%}")
+
+
+if __name__ == "__main__":
+    main()
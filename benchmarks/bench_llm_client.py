@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+LLM call throughput under load: the pooled client against the local stub.
+
+Fires N concurrent chat calls at the stub (fixed latency, some 429s and
+503s) from many tenants, first with a new HTTP client per call, then with
+one pooled ``LLMClient``, and reports throughput, p50/p99 latency, retries
+and the most calls the stub ever saw in flight.
+
+More slots is not faster here: httpx's pool scans every connection for each
+request it assigns, so CPU per call grows with the pool size. While the stub
+answers in milliseconds that dominates; size ``max_concurrency`` by the
+endpoint's rate limit, not upwards of it.
+
+Run from the repository root:
+    python benchmarks/bench_llm_client.py [calls]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.llm_client import LLMClient, LLMError
+from app.utils.llm_stub import LLMStub
+
+MESSAGES = [{"role": "user", "content": "My birthday is the fifteenth of January"}]
+TENANTS = 50
+
+
+def report(name: str, latencies, seconds: float, failures: int, stub: LLMStub, extra: str = ""):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"  {name:<22}: {len(latencies) / seconds:7.0f} calls/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  "
+          f"failed {failures:4d}  connections {stub.connections:5d}  max in flight {stub.max_in_flight:4d}{extra}")
+
+
+async def unpooled(url: str, calls: int, stub: LLMStub):
+    """A fresh client (and connection) per call, no limits and no retries"""
+    async def call():
+        started = time.monotonic()
+        try:
+            async with httpx.AsyncClient() as http:
+                response = await http.post(url, json={"model": "stub", "messages": MESSAGES}, timeout=10)
+            return time.monotonic() - started, response.status_code != 200
+        except httpx.HTTPError:
+            return time.monotonic() - started, True
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call() for _ in range(calls)))
+    report("new client per call", [r[0] for r in results], time.perf_counter() - started,
+           sum(r[1] for r in results), stub)
+
+
+async def pooled(url: str, calls: int, stub: LLMStub, max_concurrency: int):
+    client = LLMClient(url, model="stub", max_concurrency=max_concurrency, per_tenant=8)
+
+    async def call(i: int):
+        started = time.monotonic()
+        try:
+            await client.chat(MESSAGES, tenant=f"10.0.0.{i % TENANTS}")
+            return time.monotonic() - started, False
+        except LLMError:
+            return time.monotonic() - started, True
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call(i) for i in range(calls)))
+    stats = client.stats()
+    report(f"pooled, {max_concurrency} slots", [r[0] for r in results], time.perf_counter() - started,
+           sum(r[1] for r in results), stub, f"  retries {stats['retries']}")
+    assert stub.max_in_flight <= max_concurrency
+    await client.close()
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    print(f"{calls} calls from {TENANTS} tenants, 20 ms stub latency, 2% 429s and 2% 503s")
+    for run in (lambda base, stub: unpooled(f"{base}/chat/completions", calls, stub),
+                lambda base, stub: pooled(base, calls, stub, 16),
+                lambda base, stub: pooled(base, calls, stub, 64)):
+        stub = LLMStub(latency=0.02, jitter=0.005, error_rate=0.02, rate_limit_rate=0.02, seed=7)
+        port = await stub.start()
+        await run(f"http://127.0.0.1:{port}/v1", stub)
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Restart time for a journaled in-memory session store.
+
+Builds a journal for N sessions (each saved a few times, with a snapshot
+taken part-way so recovery replays both a snapshot and a journal tail),
+then times how long a fresh store takes to come back with every session.
+
+Run from the repository root:
+    python benchmarks/bench_recovery.py [sessions]
+"""
+import os
+import sys
+import tempfile
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationState, ConversationStep
+from app.models.compact_state import CompactState
+from app.core.session_journal import SessionJournal
+from app.core.session_store import InMemorySessionStore
+
+TURNS = [
+    {"step": ConversationStep.ASK_NAME},
+    {"step": ConversationStep.ASK_DOB, "customer_name": "John Smith", "slots_filled": {"full_name": "John Smith"}},
+    {"step": ConversationStep.ASK_SSN, "slots_filled": {"full_name": "John Smith", "dob": "1990-01-15"}},
+]
+
+
+def build(directory: str, count: int) -> float:
+    journal = SessionJournal(directory, max_buffered=5000, snapshot_every=10**9)
+    live = {}
+    started = time.perf_counter()
+    for turn_number, turn in enumerate(TURNS):
+        for i in range(count):
+            session_id = f"session-{i:08d}"
+            previous = live.get(session_id)
+            state = previous.to_model() if previous else ConversationState(
+                session_id=session_id, current_step=ConversationStep.GREETING)
+            state.current_step = turn["step"]
+            state.customer_name = turn.get("customer_name", state.customer_name)
+            state.slots_filled = dict(turn.get("slots_filled", state.slots_filled))
+            state.version += 1
+            compact = CompactState.from_model(state)
+            journal.record_put(compact, previous)
+            live[session_id] = compact
+        if turn_number == 0:
+            journal.snapshot(live.values())
+    journal.close()
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        write_seconds = build(directory, count)
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+
+        started = time.perf_counter()
+        store = InMemorySessionStore(max_sessions=count * 2, max_bytes=2**40, journal=SessionJournal(directory))
+        recover_seconds = time.perf_counter() - started
+        assert len(store) == count
+
+    print(f"{count} sessions, {len(TURNS)} saves each")
+    print(f"  journal + snapshot on disk : {sizes}")
+    print(f"  writing (incl. snapshot)   : {write_seconds:6.2f}s")
+    print(f"  recovery to a live store   : {recover_seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
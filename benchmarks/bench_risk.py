@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Re-scoring historical sessions: per-session weighted sums vs ``score_batch``.
+
+Both sides start from the stored ``risk_signals`` dicts, as a job re-scoring
+sessions after a weight change would.
+
+Run from the repository root:
+    python benchmarks/bench_risk.py [sessions]
+"""
+import os
+import random
+import sys
+import time
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.risk import SIGNALS, score_batch
+
+
+def make_sessions(count: int):
+    rng = random.Random(11)
+    sessions = []
+    for _ in range(count):
+        signals = {signal.name: float(rng.random() < 0.2) * rng.randint(1, 3) for signal in SIGNALS}
+        signals = {name: value for name, value in signals.items() if value}
+        sessions.append(signals)
+    return sessions
+
+
+def per_session(signals) -> float:
+    total = sum(signal.weight * signals.get(signal.name, 0.0) for signal in SIGNALS)
+    return min(1.0, max(0.0, total))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sessions = make_sessions(count)
+
+    started = time.perf_counter()
+    baseline = [per_session(signals) for signals in sessions]
+    baseline_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scores = score_batch(sessions)
+    batch_seconds = time.perf_counter() - started
+
+    assert max(abs(a - b) for a, b in zip(baseline, scores.tolist())) < 1e-9
+    print(f"{count} sessions, mean risk {scores.mean():.3f}")
+    print(f"  per-session loop : {baseline_seconds:6.2f}s")
+    print(f"  score_batch      : {batch_seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
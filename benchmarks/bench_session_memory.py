@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Bytes per live session: pydantic ConversationState vs CompactState.
+
+Allocations are measured with tracemalloc over a batch of sessions, half of
+them fresh and half mid-conversation (name, slots and a few flags set).
+
+Run from the repository root:
+    python benchmarks/bench_session_memory.py [sessions]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationState, ConversationStep
+from app.models.compact_state import CompactState
+
+
+def make_state(i: int) -> ConversationState:
+    state = ConversationState(session_id=f"session-{i:08d}", current_step=ConversationStep.GREETING)
+    if i % 2:
+        state.current_step = ConversationStep.VBT_CODE_CHECK
+        state.customer_name = "John Smith"
+        state.slots_filled = {"full_name": "John Smith", "dob": "1990-01-15", "ssn_last4": "1234"}
+        state.dob_verified = state.ssn_verified = state.email_verified = True
+        state.sms_code_sent = True
+    return state
+
+
+def measure(count: int, build) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(sessions) == count
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    # Session ids are part of both representations; keep them out of the comparison
+    ids_only = measure(count, lambda i: f"session-{i:08d}")
+
+    pydantic_bytes = measure(count, make_state) - ids_only
+    compact_bytes = measure(count, lambda i: CompactState.from_model(make_state(i))) - ids_only
+
+    print(f"{count} sessions (half fresh, half mid-conversation), excluding session id strings")
+    print(f"  ConversationState : {pydantic_bytes:8.0f} bytes/session")
+    print(f"  CompactState      : {compact_bytes:8.0f} bytes/session  ({pydantic_bytes / compact_bytes:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-session verification attempt limits
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.attempt_limiter import Bucket, InMemoryAttemptLimiter, RedisAttemptLimiter
+from app.core.conversation_manager import ConversationManager
+from app.core.session_store import SessionConflict
+from app.utils.local_redis import LocalRedis
+
+CUSTOMER = ("customer", "john smith")
+CLIENT = ("ip", "203.0.113.7")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_buckets_refill_and_full_ones_are_forgotten():
+    async def run():
+        clock = FakeClock()
+        limiter = InMemoryAttemptLimiter({"customer": Bucket(2, 10.0), "ip": Bucket(3, 10.0)}, clock=clock)
+        for _ in range(2):
+            assert await limiter.allowed([CUSTOMER, CLIENT])
+            await limiter.spend([CUSTOMER, CLIENT])
+        assert not await limiter.allowed([CUSTOMER, CLIENT])  # Customer bucket is empty
+        assert await limiter.allowed([CLIENT])
+
+        clock.now = 10.0  # One token back
+        assert await limiter.allowed([CUSTOMER])
+        clock.now = 40.0  # Both buckets full again: the next write drops them
+        await limiter.spend([("customer", "jane doe")])
+        assert len(limiter) == 1
+
+    asyncio.run(run())
+
+
+def test_new_sessions_do_not_reset_the_customer_budget():
+    async def run():
+        limiter = InMemoryAttemptLimiter({"customer": Bucket(2, 600.0), "ip": Bucket(20, 60.0)})
+        manager = ConversationManager(attempt_limiter=limiter)
+        engine = manager.verification_engine
+        lookups = []
+        verify_dob = engine.verify_dob
+
+        async def counted(*args):
+            lookups.append(args[1])
+            return await verify_dob(*args)
+
+        engine.verify_dob = counted
+
+        for session_id in ("first", "second"):
+            await manager.start_conversation(session_id)
+            await manager.process_message(session_id, "yes")
+            await manager.process_message(session_id, "John Smith")
+        # Two wrong guesses in the first session use up John Smith's budget...
+        await manager.process_message("first", "01/01/1980")
+        await manager.process_message("first", "02/02/1981")
+        # ...so a fresh session is escalated without touching the database
+        response = await manager.process_message("second", "03/03/1982", client_ip="203.0.113.7")
+        assert response.current_step == ConversationStep.ESCALATION and response.escalate
+        assert len(lookups) == 2
+        assert (await limiter.stats())["denied"] == 1
+        # The bucket belongs to the record the name matched, not to how the name was typed
+        customer_id = await engine.customer_id("john  SMITH")
+        assert customer_id is not None and ("customer", str(customer_id)) in limiter._levels
+        assert not any(kind == "customer" and value == "john smith" for kind, value in limiter._levels)
+
+    asyncio.run(run())
+
+
+def test_a_replayed_turn_spends_one_attempt():
+    async def run():
+        limiter = InMemoryAttemptLimiter({"customer": Bucket(5, 600.0), "ip": Bucket(20, 60.0)})
+        manager = ConversationManager(attempt_limiter=limiter)
+        await manager.start_conversation("replay")
+        await manager.process_message("replay", "yes")
+        await manager.process_message("replay", "John Smith")
+
+        # The save loses a race with another worker, so the wrong guess is replayed on fresh state
+        put = manager.active_conversations.put
+
+        async def lose_one_race(state, touch=True):
+            manager.active_conversations.put = put
+            raise SessionConflict(state.session_id)
+
+        manager.active_conversations.put = lose_one_race
+        response = await manager.process_message("replay", "01/01/1980", client_ip="203.0.113.7")
+        assert response.current_step == ConversationStep.ASK_DOB
+        assert (await limiter.stats())["failures"] == 1
+        assert (await manager.active_conversations.get("replay")).verification_attempts == 1
+
+    asyncio.run(run())
+
+
+def test_workers_share_buckets_through_redis():
+    async def run():
+        server = LocalRedis()
+        port = await server.start()
+        url = f"redis://127.0.0.1:{port}/0"
+        buckets = {"customer": Bucket(2, 600.0)}
+        first, second = RedisAttemptLimiter(url, buckets), RedisAttemptLimiter(url, buckets)
+        try:
+            await first.spend([CUSTOMER])
+            await second.spend([CUSTOMER])
+            assert not await first.allowed([CUSTOMER])
+            assert await second.allowed([("customer", "jane doe")])
+            assert 0 < await first.redis.ttl("attempts:customer:john smith") <= 1200
+        finally:
+            await first.close()
+            await second.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_buckets_refill_and_full_ones_are_forgotten()
+    test_new_sessions_do_not_reset_the_customer_budget()
+    test_a_replayed_turn_spends_one_attempt()
+    test_workers_share_buckets_through_redis()
+    print("✅ All attempt limiter tests passed!")
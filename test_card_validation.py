@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for Luhn, BIN range lookups and batch card validation
+"""
+import asyncio
+import os
+import random
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.card_validation import (
+    SAMPLE_BIN_RANGES_PATH, BinIndex, BinRange, CardValidator, create_card_validator, luhn_valid,
+)
+from app.core.conversation_manager import ConversationManager
+from app.core.verification_engine import VerificationEngine
+
+
+def reference_luhn(number: str) -> bool:
+    total = 0
+    for position, digit in enumerate(int(d) for d in reversed(number)):
+        if position % 2:
+            digit = digit * 2 - 9 if digit > 4 else digit * 2
+        total += digit
+    return total % 10 == 0
+
+
+MALFORMED = ["", "abcd", "41111111111111110", "4111-1111-1111-1", "٤١١١١١١١١١١١١١١١"]
+
+
+def random_numbers(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    numbers = [str(rng.randrange(10 ** 15, 10 ** 16)) for _ in range(count)]
+    return numbers + ["4111111111111111", "5555555555554444", "4012888888881881"]
+
+
+def test_table_driven_luhn_matches_the_definition():
+    for number in random_numbers(2000):
+        assert luhn_valid(number) == reference_luhn(number), number
+
+
+def test_bin_index_boundaries_and_overlaps():
+    index = BinIndex([BinRange(45000000, 45999999, "visa", "debit", "A"),
+                      BinRange(40000000, 41111099, "visa", "credit", "B")])
+    assert index.lookup("4000000000000000").issuer == "B"
+    assert index.lookup("4111109999999999").issuer == "B"
+    assert index.lookup("4111110000000000") is None
+    assert index.lookup("4599999999999999").issuer == "A"
+    assert index.lookup("3999999999999999") is None
+
+    try:
+        BinIndex([BinRange(40000000, 45000000, "visa", "credit", "A"),
+                  BinRange(44000000, 46000000, "visa", "debit", "B")])
+    except ValueError as e:
+        assert "overlap" in str(e)
+    else:
+        raise AssertionError("overlapping ranges were accepted")
+
+
+def sample_validator() -> CardValidator:
+    return CardValidator(BinIndex.load())  # The bundled sample ranges
+
+
+def test_credit_cards_are_turned_away():
+    validator = sample_validator()
+    assert validator.check("4111111111111111").valid
+    credit = validator.check("5555555555554444")
+    assert not credit.valid and credit.reason == "not_debit" and credit.bin_range.network == "mastercard"
+    assert validator.check("4111111111111112").reason == "checksum"
+    assert validator.check("411111111111111").reason == "format"
+
+
+def test_without_a_bin_table_only_luhn_applies():
+    os.environ.pop("CARD_BIN_RANGES_PATH", None)
+    validator = create_card_validator()
+    assert len(validator.bins) == 0
+    assert validator.check("5555555555554444") == (True, None, None)
+    assert validator.check("4111111111111112").reason == "checksum"
+    batch = validator.validate_batch(["5555555555554444", "4111111111111112", "abcd"])
+    assert batch.valid.tolist() == [True, False, False] and batch.bin_position.tolist() == [-1, -1, -1]
+
+    os.environ["CARD_BIN_RANGES_PATH"] = SAMPLE_BIN_RANGES_PATH
+    try:
+        assert not create_card_validator().check("5555555555554444").valid
+    finally:
+        del os.environ["CARD_BIN_RANGES_PATH"]
+
+
+def test_batch_agrees_with_single_checks():
+    validator = sample_validator()
+    numbers = random_numbers(5000) + MALFORMED
+    batch = validator.validate_batch(numbers)
+    assert batch.valid.tolist() == [validator.check(number).valid for number in numbers]
+    for number, position in zip(numbers, batch.bin_position.tolist()):
+        found = validator.bins.lookup(number) if number.isascii() and number.isdigit() and len(number) == 16 else None
+        assert (validator.bins.ranges[position] if position >= 0 else None) == found
+
+
+def test_conversation_explains_a_credit_card():
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(card_validator=sample_validator()))
+        await manager.start_conversation("card")
+        state = await manager.active_conversations.get("card")
+        state.current_step = ConversationStep.DEBIT_CARD_COLLECTION
+        await manager.active_conversations.put(state)
+        return await manager.process_message("card", "5555555555554444 JOHN SMITH 04/27 123")
+
+    response = asyncio.run(run())
+    assert response.current_step == ConversationStep.DEBIT_CARD_COLLECTION
+    assert "credit card" in response.response
+
+
+if __name__ == "__main__":
+    test_table_driven_luhn_matches_the_definition()
+    test_bin_index_boundaries_and_overlaps()
+    test_credit_cards_are_turned_away()
+    test_without_a_bin_table_only_luhn_applies()
+    test_batch_agrees_with_single_checks()
+    test_conversation_explains_a_credit_card()
+    print("✅ All card validation tests passed!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact session representation
+"""
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationState, ConversationStep
+from app.models.compact_state import CompactState, FLAG_FIELDS, TRISTATE_FIELDS
+
+
+def test_round_trip_preserves_every_field():
+    fresh = ConversationState(session_id="fresh", current_step=ConversationStep.GREETING)
+    busy = ConversationState(
+        session_id="busy",
+        current_step=ConversationStep.PAYCHECK_TYPE_CHECK,
+        version=12,
+        customer_name="Jane Doe",
+        company_name="Other Co",
+        slots_filled={"full_name": "Jane Doe", "bank_account": "1234567890"},
+        escalation_flags=["dob_mismatch"],
+        pending_follow_ups=["Still there?"],
+        risk_signals={"failed_attempts": 1.0, "score": 0.15},
+        sms_retry_count=2,
+        has_time_to_continue=False,
+        is_military_member=False,
+        paycheck_account_same=True,
+        **{name: True for name in FLAG_FIELDS if name != "has_time_to_continue"},
+    )
+    for state in (fresh, busy):
+        assert CompactState.from_model(state).to_model() == state
+
+
+def test_flags_and_tristates_are_attributes():
+    compact = CompactState.from_model(ConversationState(session_id="s", current_step=ConversationStep.ASK_DOB))
+    assert compact.has_time_to_continue and not compact.dob_verified
+    assert all(getattr(compact, name) is None for name in TRISTATE_FIELDS)
+
+    compact.dob_verified = True
+    compact.is_military_member = False
+    compact.current_step = ConversationStep.ASK_SSN
+    state = compact.to_model()
+    assert state.dob_verified and state.is_military_member is False
+    assert state.current_step == ConversationStep.ASK_SSN
+
+    # to_model hands out fresh containers
+    state.slots_filled["dob"] = "1990-01-15"
+    assert compact.slots_filled is None
+    assert not hasattr(compact, "__dict__")
+
+
+def test_changes_name_the_step_and_flags():
+    """Journal deltas must not depend on step order or flag bit layout"""
+    compact = CompactState("s")
+    compact.current_step = ConversationStep.ASK_SSN
+    compact.dob_verified = True
+    compact.is_military_member = False
+    compact.customer_name = "Jane Doe"
+    changes = compact.changes_since()
+    assert changes == {"current_step": ConversationStep.ASK_SSN.value, "dob_verified": True,
+                       "is_military_member": False, "customer_name": "Jane Doe"}
+
+    replayed = CompactState("s")
+    replayed.apply(changes)
+    replayed.apply({"field_since_removed": 1})
+    assert replayed.current_step == ConversationStep.ASK_SSN
+    assert replayed.dob_verified and replayed.is_military_member is False
+    assert replayed.changes_since(compact) == {}
+
+
+if __name__ == "__main__":
+    test_round_trip_preserves_every_field()
+    test_flags_and_tristates_are_attributes()
+    test_changes_name_the_step_and_flags()
+    print("✅ All compact state tests passed!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled database access layer, against the stand-in database
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.database.connection import (
+    DEMO_CUSTOMERS, ConnectionPool, CustomerStore, PooledCustomerStore, PoolTimeout, SQLiteCustomerStore,
+)
+from app.database.standin import StandInDatabase
+from app.core.verification_engine import VerificationEngine
+
+
+def test_saturated_pool_queues_reuses_connections_and_caches_statements():
+    async def run():
+        database = StandInDatabase(latency=0.01)
+        customers = PooledCustomerStore(ConnectionPool(database.connect, min_size=0, max_size=3))
+        found = await asyncio.gather(*(customers.get_by_name("John Smith") for _ in range(30)))
+        assert all(customer.dob == "1990-01-15" for customer in found)
+
+        stats = customers.pool.stats()
+        assert stats["size"] == stats["peak_in_use"] == 3
+        assert stats["waited_acquires"] >= 27 and stats["acquire_timeouts"] == 0
+        # Each connection parsed the lookup once and reused it afterwards
+        assert database.counters["connections_opened"] == 3
+        assert database.counters["statements_prepared"] == 3
+        assert database.counters["statements_executed"] == 30
+        await customers.close()
+        assert not database.connections
+
+    asyncio.run(run())
+
+
+def test_acquire_times_out_when_every_connection_is_busy():
+    async def run():
+        database = StandInDatabase(latency=0.2)
+        pool = ConnectionPool(database.connect, min_size=0, max_size=1, acquire_timeout=0.05)
+        results = await asyncio.gather(pool.fetch_one("SELECT 1"), pool.fetch_one("SELECT 2"),
+                                       return_exceptions=True)
+        assert results[0] == (1,) and isinstance(results[1], PoolTimeout)
+        assert pool.stats()["acquire_timeouts"] == 1 and pool.stats()["in_use"] == 0
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_dead_connections_are_replaced_after_a_failover():
+    async def run():
+        database = StandInDatabase(latency=0)
+        pool = ConnectionPool(database.connect, min_size=2, max_size=4, health_check_after=0.05)
+        engine = VerificationEngine(customer_db=PooledCustomerStore(pool))
+        assert await engine.verify_dob("John Smith", "1990-01-15")
+        await pool.check_health()
+        assert pool.stats()["size"] == 2
+
+        database.kill_connections()
+        await asyncio.sleep(0.1)
+        # Stale idle connections are pinged before reuse and the broken ones discarded
+        assert [c.full_name for c in await engine.customer_db.find_by_phone("1234567890")] == ["John Smith"]
+        assert pool.stats()["health_check_failures"] >= 1
+        await pool.check_health()
+        assert pool.stats()["size"] >= 2 and all(not c.killed for c in database.connections)
+        await engine.close()
+
+    asyncio.run(run())
+
+
+def test_engine_builds_its_pool_through_the_store_interface():
+    class RecordingStore(SQLiteCustomerStore):
+        def pooled(self, **pool_options):
+            self.pool_options = pool_options
+            return super().pooled(**pool_options)
+
+    async def run():
+        store = RecordingStore()
+        store.bulk_load(DEMO_CUSTOMERS)
+        engine = VerificationEngine(customer_store=store)
+        assert store.pool_options["max_size"] == 10
+        assert await engine.verify_dob("John Smith", "1990-01-15")
+        await engine.customer_db.close()
+
+    asyncio.run(run())
+
+    class NoPool(CustomerStore):
+        def get_by_name(self, full_name):
+            return None
+
+    try:
+        NoPool()
+        assert False, "a store without the interface's methods was accepted"
+    except TypeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_saturated_pool_queues_reuses_connections_and_caches_statements()
+    test_acquire_times_out_when_every_connection_is_busy()
+    test_dead_connections_are_replaced_after_a_failover()
+    test_engine_builds_its_pool_through_the_store_interface()
+    print("✅ All connection pool tests passed!")
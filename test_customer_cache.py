@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session customer record memo
+"""
+import asyncio
+import os
+import re
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.conversation_manager import ConversationManager
+from app.core.verification_engine import VerificationEngine
+from app.core.sms_outbox import FakeSmsGateway
+
+
+# Stands for the code the customer reads off their phone
+SMS_CODE = object()
+
+
+async def sent_code(manager) -> str:
+    """The code in the last text the (fake) SMS gateway received"""
+    outbox = manager.verification_engine.sms_outbox
+    await outbox.flush()
+    return re.search(r"\b\d{6}\b", outbox.gateway.sent[-1].body).group()
+
+
+def count_lookups(manager: ConversationManager) -> list:
+    cache = manager.verification_engine.customers
+    lookups = []
+    fetch = cache.fetch
+
+    async def counted(full_name):
+        lookups.append(full_name)
+        return await fetch(full_name)
+
+    cache.fetch = counted
+    return lookups
+
+
+def test_whole_application_reads_the_customer_once():
+    messages = [
+        "yes", "John Smith", "01/15/1990", "1234", "yes", "yes", "yes", "yes", SMS_CODE, "no",
+        "account 1234567890 routing 123456789", "1234567890", "checking", "yes", "direct deposit",
+        "4111111111111111 JOHN SMITH 04/27 123", "4111111111111111 JOHN SMITH 04/27 123",
+    ]
+
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=FakeSmsGateway()))
+        lookups = count_lookups(manager)
+        await manager.start_conversation("once")
+        for message in messages:
+            if message is SMS_CODE:
+                message = await sent_code(manager)
+            response = await manager.process_message("once", message)
+        assert response.current_step == ConversationStep.COMPLETE
+        assert lookups == ["John Smith"]
+        assert manager.verification_engine.customers.stats()["hits"] >= 5
+
+    asyncio.run(run())
+
+
+def test_name_change_replaces_the_cached_record():
+    async def run():
+        manager = ConversationManager()
+        lookups = count_lookups(manager)
+        await manager.start_conversation("rename")
+        await manager.process_message("rename", "yes")
+        await manager.process_message("rename", "Jane Doe")
+        await manager.process_message("rename", "sorry, my name is John Smith")
+
+        # The DOB check needs John Smith's record, not the unknown Jane Doe
+        response = await manager.process_message("rename", "07/04/1976")
+        assert response.current_step == ConversationStep.ASK_DOB
+        assert lookups[-1] == "John Smith"
+        assert manager.verification_engine.customers.stats()["fetches"] == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_whole_application_reads_the_customer_once()
+    test_name_change_replaces_the_cached_record()
+    print("✅ All customer cache tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed customer store
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.database.connection import SQLiteCustomerStore, DEMO_CUSTOMERS, _SELECT
+from app.core.verification_engine import VerificationEngine
+
+
+def make_store() -> SQLiteCustomerStore:
+    store = SQLiteCustomerStore()
+    store.bulk_load(DEMO_CUSTOMERS)
+    store.bulk_load([
+        {"full_name": "Mary-Anne O'Neil", "dob": "1985-12-22", "ssn_last4": "9876",
+         "phone_number": "(555) 010-2000", "bank_account": "5550001111", "bank_routing": "021000021"},
+        {"full_name": "John  SMITH", "dob": "1970-06-01", "ssn_last4": "0000", "home_number": "+1 123 456 7890"},
+    ], batch_size=1, defer_indexes=True)
+    return store
+
+
+def test_lookups_normalize_and_use_indexes():
+    store = make_store()
+    assert store.count() == 3
+
+    # Duplicate names resolve to the earliest record
+    assert store.get_by_name("  john smith ").dob == "1990-01-15"
+    assert store.get_by_name("mary-anne o'neil").ssn_last4 == "9876"
+    assert store.get_by_name("Nobody Here") is None
+
+    assert {c.full_name for c in store.find_by_phone("123-456-7890")} == {"John Smith", "John  SMITH"}
+    assert [c.full_name for c in store.find_by_phone("5550102000")] == ["Mary-Anne O'Neil"]
+    assert [c.full_name for c in store.find_by_account_ending("1111")] == ["Mary-Anne O'Neil"]
+
+    for column in ("name_key", "phone_key", "home_key", "account_ending"):
+        plan = " ".join(store.query_plan(_SELECT + f" WHERE {column} = ?", ("x",)))
+        assert "USING INDEX" in plan, plan
+
+
+def test_verification_engine_reads_the_store():
+    engine = VerificationEngine(make_store())
+
+    async def run():
+        assert await engine.verify_dob("Mary-Anne O'Neil", "1985-12-22")
+        assert not await engine.verify_ssn("Mary-Anne O'Neil", "1234")
+        assert await engine.get_customer_account_ending("Mary-Anne O'Neil") == "1111"
+        assert await engine.get_customer_email("John Smith") == "john.smith@example.com"
+        assert await engine.verify_dob("Someone Unknown", "2000-01-01")  # Unknown customers pass in test mode
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_lookups_normalize_and_use_indexes()
+    test_verification_engine_reads_the_store()
+    print("✅ All customer store tests passed!")
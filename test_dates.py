@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass date of birth parser
+"""
+import asyncio
+import datetime as dt
+import os
+import random
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.azure_ai_client import AzureAIClient
+from app.core.dates import MONTHS, find_date_of_birth
+
+TODAY = dt.date(2026, 10, 17)
+
+
+def dob(text: str):
+    found = find_date_of_birth(text.lower(), today=TODAY)
+    return found.date.isoformat() if found else None
+
+
+def test_numeric_forms():
+    assert dob("01/15/1990") == "1990-01-15"
+    assert dob("1-15-1990") == "1990-01-15"
+    assert dob("1990-01-15") == "1990-01-15"
+    assert dob("1990/1/5") == "1990-01-05"
+    assert dob("1.15.1990") == "1990-01-15"
+    assert dob("01/15-1990") is None  # Mixed separators
+    assert dob("123/45/1990") is None
+
+
+def test_month_name_forms():
+    assert dob("July 22, 2000") == "2000-07-22"
+    assert dob("I was born on jul 22 2000") == "2000-07-22"
+    assert dob("sept. 3rd, 1979") == "1979-09-03"
+    assert dob("22 July 2000") == "2000-07-22"
+    assert dob("the 3rd of sept 1979") == "1979-09-03"
+    assert dob("jan 15") is None  # No year
+
+
+def test_spoken_forms():
+    assert dob("the fifteenth of January nineteen ninety") == "1990-01-15"
+    assert dob("January twenty-first two thousand and three") == "2003-01-21"
+    assert dob("may the fourth, nineteen-eighty") == "1980-05-04"
+    assert dob("march 5 nineteen oh five") == "1905-03-05"
+    assert dob("twenty second of december twenty ten") == "2010-12-22"
+    # 22 would leave "thousand" as the year, so the day is 20
+    assert dob("july twenty two thousand") == "2000-07-20"
+    assert dob("january nineteen ninety") is None  # No day
+
+
+def test_ambiguity_policy():
+    assert dob("03/04/1990") == "1990-03-04"  # Month first
+    assert dob("15/01/1990") == "1990-01-15"  # Day first only when the month cannot be
+    assert dob("13/13/1990") is None
+    assert dob("01/15/90") == "1990-01-15"
+    assert dob("01/15/26") == "2026-01-15"
+    assert dob("01/15/30") == "1930-01-15"  # 2030 has not happened yet
+    assert dob("01/01/2030") is None  # Future
+    assert dob("02/30/1990 sorry, 02/28/1990") == "1990-02-28"  # Leftmost valid date
+    assert dob("22 july 2000 or 01/15/1990") == "2000-07-22"
+
+
+def test_span_and_noise():
+    text = "john smith, born 01/15/1990, ssn ends 1234"
+    found = find_date_of_birth(text, today=TODAY)
+    assert text[found.start:found.end] == "01/15/1990"
+    for text in ("i may be 22 in 2000", "not sure what you mean", "", "the the the", "-/-/-"):
+        assert dob(text) is None, text
+
+
+def test_agrees_with_a_reference_on_random_dates():
+    rng = random.Random(23)
+    names = {number: [name for name, value in MONTHS.items() if value == number] for number in range(1, 13)}
+    for _ in range(2000):
+        date = dt.date(1900, 1, 1) + dt.timedelta(days=rng.randrange(45000))
+        month_name = rng.choice(names[date.month])
+        text = rng.choice((f"{date.month}/{date.day}/{date.year}", f"{date:%Y-%m-%d}",
+                           f"{month_name} {date.day}, {date.year}", f"{date.day} {month_name} {date.year}"))
+        assert dob(text) == date.isoformat(), text
+
+
+def test_spoken_dob_reaches_the_conversation():
+    extracted = asyncio.run(AzureAIClient().extract_information(
+        "the fifteenth of january nineteen ninety", ConversationStep.ASK_DOB))
+    assert extracted == {'dob': '1990-01-15'}
+
+
+if __name__ == "__main__":
+    test_numeric_forms()
+    test_month_name_forms()
+    test_spoken_forms()
+    test_ambiguity_policy()
+    test_span_and_noise()
+    test_agrees_with_a_reference_on_random_dates()
+    test_spoken_dob_reaches_the_conversation()
+    print("✅ All date of birth tests passed!")
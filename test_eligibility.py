@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for batch loan-eligibility evaluation
+"""
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.eligibility import POLICY, ApplicationColumns, Rule, evaluate, evaluate_batch
+from app.core.verification_engine import VerificationEngine
+
+GOOD = {"full_name": "John Smith", "bank_account": "1234567890", "bank_routing": "123456789"}
+
+
+def test_batch_matches_rule_by_rule_expectations():
+    records = [
+        GOOD,
+        {"full_name": "No Bank"},
+        {**GOOD, "bank_routing": None},
+        {**GOOD, "bank_account": ""},
+        {**GOOD, "bank_account": 123456789012, "bank_routing": "x" * 40},
+    ]
+    batch = evaluate_batch(records)
+    assert batch.approved.tolist() == [True, False, False, False, True]
+    assert batch.decline_reasons(1) == ["Missing bank account information"]
+    assert batch.decline_reasons(2) == ["Missing bank account information"]
+    assert batch.summary()["approved"] == 2
+
+    decisions = batch.decisions()
+    assert decisions[0].approved and decisions[0].decline_reasons == []
+    assert [d.decline_reasons for d in decisions] == [batch.decline_reasons(i) for i in range(5)]
+    assert [evaluate(record) for record in records] == decisions
+
+
+def test_numeric_columns_are_not_truncated():
+    records = [{"income": 12345678901234567}, {"income": "2500.50"}, {"income": "n/a"}, {}, {"income": True}]
+    income = ApplicationColumns(records).number("income")
+    assert income.dtype == np.float64 and income[0] == 12345678901234567 and income[1] == 2500.5
+    assert np.isnan(income[2:]).all()
+
+    low_income = Rule("Income too low", lambda a: not float(a.get("income") or 0) >= 3000,
+                      lambda c: ~(c.number("income") >= 3000))
+    policy = POLICY + (low_income,)
+    records = [{**GOOD, "income": 5000}, {**GOOD, "income": "1200"}, {"income": None}]
+    assert evaluate_batch(records, policy).decisions() == [evaluate(record, policy) for record in records]
+
+
+def test_engine_single_and_batch_agree():
+    engine = VerificationEngine()
+
+    async def run():
+        records = [GOOD, {"full_name": "No Bank"}] * 50
+        batch = await engine.evaluate_loan_eligibility_batch(records)
+        singles = [await engine.evaluate_loan_eligibility(record) for record in records[:2]]
+        assert [d.approved for d in batch[:2]] == [d.approved for d in singles] == [True, False]
+        assert sum(d.approved for d in batch) == 50
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_batch_matches_rule_by_rule_expectations()
+    test_numeric_columns_are_not_truncated()
+    test_engine_single_and_batch_agree()
+    print("✅ All eligibility tests passed!")
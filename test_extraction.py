@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Extraction tests for the regex AI client (no Azure OpenAI required)
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.azure_ai_client import AzureAIClient
+from app.core.conversation_manager import ConversationManager
+
+
+def extract(message: str, step: ConversationStep):
+    return asyncio.run(AzureAIClient().extract_information(message, step))
+
+
+def test_single_slot_answers():
+    """Each step still understands the plain answer it asks for"""
+    assert extract("My name is John Smith", ConversationStep.ASK_NAME) == {'full_name': 'John Smith'}
+    assert extract("22 July 2000", ConversationStep.ASK_DOB) == {'dob': '2000-07-22'}
+    assert extract("sept 3, 1979", ConversationStep.ASK_DOB) == {'dob': '1979-09-03'}
+    assert extract("1234", ConversationStep.ASK_SSN) == {'ssn_last4': '1234'}
+    assert extract("the code is 482913", ConversationStep.VBT_CODE_INPUT) == {'sms_code': '482913'}
+    assert extract("4111111111111111 JANE A DOE 04/27 123", ConversationStep.DEBIT_CARD_COLLECTION) == {
+        'card_number': '4111111111111111', 'card_expiry': '04/27', 'card_cvv': '123', 'card_name': 'JANE DOE'
+    }
+
+
+def test_multi_slot_message():
+    """One message can fill several slots, and a date's year is never read as an SSN"""
+    extracted = extract("John Smith, born 01/15/1990, SSN ends 1234", ConversationStep.ASK_NAME)
+    assert extracted == {'full_name': 'John Smith', 'dob': '1990-01-15', 'ssn_last4': '1234'}
+
+    extracted = extract("01/15/1990", ConversationStep.ASK_SSN)
+    assert 'ssn_last4' not in extracted
+
+
+def test_satisfied_steps_are_skipped():
+    """Slots given early skip straight past the steps that would ask for them"""
+    async def run():
+        manager = ConversationManager()
+        await manager.start_conversation("multi-slot")
+        await manager.process_message("multi-slot", "yes")
+        return await manager.process_message("multi-slot", "John Smith, born 01/15/1990, SSN ends 1234")
+
+    response = asyncio.run(run())
+    assert response.current_step == ConversationStep.ASK_EMAIL
+
+
+if __name__ == "__main__":
+    test_single_slot_answers()
+    test_multi_slot_message()
+    test_satisfied_steps_are_skipped()
+    print("✅ All extraction tests passed!")
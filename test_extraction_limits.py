@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Worst-case extraction latency: adversarial and fuzzed messages at the size limit
+"""
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from pydantic import ValidationError
+from app.models.schemas import ChatRequest, ConversationStep, MAX_MESSAGE_LENGTH
+from app.core.azure_ai_client import AzureAIClient
+
+# A message four times as long should take about four times as long to extract
+# from; a quadratic pattern takes sixteen. The gap leaves room for timer noise
+SCALE = 4
+GROWTH_LIMIT = 8.0
+
+# Fragments that make the individual patterns backtrack: runs of local-part
+# characters without an "@", whitespace between a month and a number, repeated
+# name cues without a terminator, digits separated by date punctuation, ...
+FRAGMENTS = ["a", "a.", "a@", "@", ".", "-", " ", "\n", ",", "1", "1/", "12-", "jan", "sept ", "i'm ", "my name is ",
+             "last four ", "ssn ends ", "code is ", "account ", "routing ", "email ", "born on ", "and "]
+
+
+def repeat(fragment: str, length: int) -> str:
+    return (fragment * (length // len(fragment) + 1))[:length]
+
+
+def adversarial_messages(length: int):
+    yield from (repeat(fragment, length) for fragment in FRAGMENTS)
+    yield "jan" + " " * (length - 4) + "x"
+    yield "1" + " " * (length - 4) + "jan"
+    yield "last" + " " * (length - 5) + "!"
+    yield "a@" + repeat("a.", length - 2)
+    rng = random.Random(22)
+    for _ in range(20):
+        parts, size = [], 0
+        while size < length:
+            parts.append(rng.choice(FRAGMENTS) * rng.randint(1, 200))
+            size += len(parts[-1])
+        yield "".join(parts)[:length]
+
+
+def extraction_time(client: AzureAIClient, message: str, rounds: int = 5) -> float:
+    """Best of ``rounds`` runs of every step's extractor on ``message``, event loop setup excluded"""
+    async def run():
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for step in ConversationStep:
+                await client.extract_information(message, step)
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    with contextlib.redirect_stdout(io.StringIO()):  # The extractors log what they find
+        return asyncio.run(run())
+
+
+def test_request_size_is_capped():
+    ChatRequest(session_id="s", message="x" * MAX_MESSAGE_LENGTH)
+    for oversized in ({"session_id": "s", "message": "x" * (MAX_MESSAGE_LENGTH + 1)},
+                      {"session_id": "s" * 65, "message": "hi"}):
+        try:
+            ChatRequest(**oversized)
+        except ValidationError:
+            continue
+        raise AssertionError(f"accepted an oversized request: {len(oversized['message'])} chars")
+
+
+def test_adversarial_messages_take_linear_time():
+    client = AzureAIClient()
+    for short in adversarial_messages(MAX_MESSAGE_LENGTH // SCALE):
+        full = short * SCALE  # Same content over again, so only the length differs
+        short_time, full_time = extraction_time(client, short), extraction_time(client, full)
+        assert full_time < GROWTH_LIMIT * short_time, \
+            f"{short_time * 1000:.2f}ms -> {full_time * 1000:.2f}ms at {SCALE}x length on {full[:40]!r}..."
+
+
+def test_extraction_ignores_text_past_the_limit():
+    client = AzureAIClient()
+    message = "a" * MAX_MESSAGE_LENGTH + " my email is jane@example.com"
+    extracted = asyncio.run(client.extract_information(message, ConversationStep.ASK_EMAIL))
+    assert extracted == {}
+    # Fifty times the limit costs about what the limit itself does: the excess is never scanned
+    at_limit = "jan" + " " * MAX_MESSAGE_LENGTH + "1 1990"
+    far_past = "jan" + " " * (50 * MAX_MESSAGE_LENGTH) + "1 1990"
+    assert extraction_time(client, far_past) < GROWTH_LIMIT * extraction_time(client, at_limit)
+
+
+def test_linear_rewrites_keep_their_matches():
+    client = AzureAIClient()
+
+    def extract(message, step):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return asyncio.run(client.extract_information(message, step))
+
+    assert extract("july   ,  22 ,  2000", ConversationStep.ASK_DOB) == {'dob': '2000-07-22'}
+    assert extract("last four digits are   1234", ConversationStep.ASK_SSN) == {'ssn_last4': '1234'}
+    assert extract("reach me at x.jane-doe+loans@mail.example.com", ConversationStep.ASK_EMAIL) == {
+        'email': 'x.jane-doe+loans@mail.example.com'
+    }
+    assert extract("i'm " + "a " * 60, ConversationStep.ASK_NAME) == {}  # Longer than any name we accept
+
+
+if __name__ == "__main__":
+    test_request_size_is_capped()
+    test_adversarial_messages_take_linear_time()
+    test_extraction_ignores_text_past_the_limit()
+    test_linear_rewrites_keep_their_matches()
+    print("✅ All extraction limit tests passed!")
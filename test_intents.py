@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-level yes / no / refusal intent classifier
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.intents import NO, REFUSAL, UNKNOWN, YES, IntentClassifier, classify, tokenize
+from app.core.azure_ai_client import AzureAIClient
+from app.core.turn_context import TurnContext
+
+
+def test_whole_tokens_only():
+    # The old substring scan read all of these as yes or no
+    assert classify("I booked it").label == UNKNOWN
+    assert classify("I know").label == UNKNOWN
+    assert classify("yes, do it now").label == YES
+    assert classify("snow").label == UNKNOWN
+    assert tokenize("That’s RIGHT, thats right") == ["that's", "right", "that's", "right"]
+
+
+def test_labels_and_negation():
+    assert classify("yes").label == YES
+    assert classify("Yeah that's right").label == YES
+    assert classify("nope").label == NO
+    assert classify("that's not right").label == NO
+    assert classify("not ok").label == NO
+    assert classify("I never said yes").label == NO
+    assert classify("no thanks").label == REFUSAL
+    assert classify("I dont want texts").label == REFUSAL
+    assert classify("I'm not comfortable giving that").label == REFUSAL
+    assert classify("not sure").label == UNKNOWN
+    # A negator right after the yes phrase turns it around
+    assert classify("absolutely not").label == NO
+    assert classify("definitely not").label == NO
+    assert classify("of course not").label == NO
+    assert classify("not really").label == NO
+    assert classify("never").label == NO
+    assert classify("i have no idea").label == UNKNOWN
+    assert classify("no idea").label == UNKNOWN
+    # Contractions, with or without the apostrophe
+    assert classify("I haven't got it").label == NO
+    assert classify("I havent got it yet").label == NO
+    assert classify("it hasn't come through").label == NO
+    assert classify("doesnt look right").label == NO
+    assert classify("I don't have it").label == NO
+    assert classify("i can't").label == NO
+    assert classify("sounds good").label == YES
+
+
+def test_confidence():
+    assert classify("yes").confidence == 1.0
+    assert classify("").confidence == 0.0
+    assert classify("yes and no") == (UNKNOWN, 0.5)
+    mostly_yes = classify("yes of course, no problem")
+    assert mostly_yes.label == YES and 0.5 < mostly_yes.confidence < 1.0
+
+
+def test_custom_phrases_and_overlaps():
+    classifier = IntentClassifier({YES: ("go ahead",), NO: ("go",), REFUSAL: ("ahead of time",)})
+    # Leftmost-longest: "go ahead" covers both tokens, the trailing "of time" matches nothing
+    assert classifier.classify("go ahead of time").label == YES
+    assert classifier.classify("go").label == NO
+    assert [m.label for m in classifier.matches(tokenize("go ahead"))] == [NO, YES]
+
+
+def test_batch_agrees_with_single():
+    messages = ["yes", "no", "no thanks", "I know", "not ok", "maybe", "", "yes yes no"] * 10
+    classifier = IntentClassifier()
+    assert classifier.classify_batch(messages) == [classifier.classify(m) for m in messages]
+
+
+def test_turn_classifies_once():
+    async def run():
+        client = AzureAIClient()
+        calls = []
+        analyze_intent = client.analyze_intent
+
+        async def counting(message):
+            calls.append(message)
+            return await analyze_intent(message)
+
+        client.analyze_intent = counting
+        turn = TurnContext(client, "no thanks")
+        assert not await turn.is_yes()
+        assert await turn.refuses_code()
+        assert await turn.refuses_debit_card()
+        assert calls == ["no thanks"]
+        assert "intent" in turn.timings
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_whole_tokens_only()
+    test_labels_and_negation()
+    test_confidence()
+    test_custom_phrases_and_overlaps()
+    test_batch_agrees_with_single()
+    test_turn_classifies_once()
+    print("✅ All intent tests passed!")
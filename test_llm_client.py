@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled LLM client, against the local chat completions stub
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.azure_ai_client import AzureAIClient
+from app.core.extraction import ChatExtractor, TieredExtractor
+from app.core.llm_client import (
+    CircuitBreaker, LLMClient, LLMDeadlineExceeded, LLMError, LLMResponseError, LLMUnavailable,
+)
+from app.utils.llm_stub import LLMStub
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+async def serve(stub: LLMStub, **options) -> LLMClient:
+    port = await stub.start()
+    options.setdefault("backoff", 0.01)
+    return LLMClient(f"http://127.0.0.1:{port}/v1", **options)
+
+
+def test_chat_returns_the_reply_over_pooled_connections():
+    async def run():
+        stub = LLMStub(latency=0.01, reply=lambda request: "hi " + request["messages"][-1]["content"])
+        client = await serve(stub, api_key="secret", model="stub-model")
+        replies = await asyncio.gather(*(client.chat(MESSAGES) for _ in range(20)))
+        assert replies == ["hi hello"] * 20
+        assert stub.requests[0]["path"] == "/v1/chat/completions"
+        assert stub.requests[0]["headers"]["authorization"] == "Bearer secret"
+        assert stub.requests[0]["body"]["model"] == "stub-model"
+        # Kept-alive connections are reused, never more than the pool allows
+        assert stub.connections <= client.max_concurrency
+        stats = client.stats()
+        assert stats["requests"] == stats["succeeded"] == 20 and stats["in_flight"] == 0
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_azure_deployments_use_their_path_and_key_header():
+    async def run():
+        stub = LLMStub(latency=0)
+        port = await stub.start()
+        client = LLMClient(f"http://127.0.0.1:{port}", "secret", "gpt-4.1", azure_api_version="2024-12-01-preview")
+        await client.chat(MESSAGES)
+        request = stub.requests[0]
+        assert request["path"] == "/openai/deployments/gpt-4.1/chat/completions?api-version=2024-12-01-preview"
+        assert request["headers"]["api-key"] == "secret"
+        assert "authorization" not in request["headers"]
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_global_and_per_tenant_limits():
+    async def run():
+        stub = LLMStub(latency=0.03)
+        client = await serve(stub, max_concurrency=4, per_tenant=2)
+        await asyncio.gather(*(client.chat(MESSAGES, tenant=f"ip-{i % 5}") for i in range(40)))
+        assert stub.max_in_flight == 4
+
+        # One busy tenant only ever gets its share, even with global slots free
+        stub.max_in_flight = 0
+        await asyncio.gather(*(client.chat(MESSAGES, tenant="10.0.0.1") for _ in range(10)))
+        assert stub.max_in_flight == 2
+        assert client.stats()["tenants"] == 0
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_retryable_failures_are_retried():
+    async def run():
+        stub = LLMStub(latency=0)
+        client = await serve(stub, max_attempts=3)
+        stub.fail_next = [503, 429]
+        started = time.monotonic()
+        assert await client.chat(MESSAGES) == "{}"
+        assert len(stub.requests) == 3
+        assert time.monotonic() - started >= 0.05  # The 429's retry-after-ms was honoured
+        assert client.stats()["retries"] == 2
+
+        stub.fail_next = [503, 503, 503]
+        try:
+            await client.chat(MESSAGES)
+            assert False, "expected LLMError"
+        except LLMError as e:
+            assert not isinstance(e, LLMDeadlineExceeded)
+        assert client.stats()["failed"] == 1
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_bad_requests_are_not_retried_and_do_not_trip_the_breaker():
+    async def run():
+        stub = LLMStub(latency=0)
+        client = await serve(stub, breaker=CircuitBreaker(failure_threshold=1))
+        stub.fail_next = [400]
+        try:
+            await client.chat(MESSAGES)
+            assert False, "expected LLMResponseError"
+        except LLMResponseError as e:
+            assert e.status == 400
+        assert len(stub.requests) == 1
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_calls_stop_at_the_deadline():
+    async def run():
+        stub = LLMStub(latency=1.0)
+        client = await serve(stub, max_concurrency=1)
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(client.chat(MESSAGES, deadline=time.monotonic() + 0.1) for _ in range(3)), return_exceptions=True)
+        assert time.monotonic() - started < 0.5
+        # One timed out on the wire, the others waiting for the only slot
+        assert all(isinstance(result, LLMDeadlineExceeded) for result in results)
+        assert client.stats()["deadline_exceeded"] == 3
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_breaker_opens_fails_fast_and_recovers_after_a_probe():
+    async def run():
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+        stub = LLMStub(latency=0)
+        client = await serve(stub, max_attempts=1, breaker=breaker)
+        stub.fail_next = [503, 503]
+        for _ in range(2):
+            try:
+                await client.chat(MESSAGES)
+            except LLMError:
+                pass
+        assert breaker.state == CircuitBreaker.OPEN
+
+        try:
+            await client.chat(MESSAGES)
+            assert False, "expected LLMUnavailable"
+        except LLMUnavailable:
+            pass
+        assert len(stub.requests) == 2  # Rejected without reaching the endpoint
+        assert client.stats()["rejected"] == 1
+
+        now[0] = 31.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert await client.chat(MESSAGES) == "{}"
+        assert breaker.state == CircuitBreaker.CLOSED
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_callers_giving_up_do_not_trip_the_breaker():
+    async def run():
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+        stub = LLMStub(latency=1.0)
+        client = await serve(stub, max_concurrency=1, max_attempts=1, breaker=breaker)
+
+        # Cancelled by the caller (as TieredExtractor's wait_for does) mid-call
+        try:
+            await asyncio.wait_for(client.chat(MESSAGES), 0.05)
+            assert False, "expected TimeoutError"
+        except asyncio.TimeoutError:
+            pass
+        # Out of budget before any attempt finished: waiting for the only slot
+        stub.latency = 0.2
+        first = asyncio.ensure_future(client.chat(MESSAGES))
+        await asyncio.sleep(0.01)
+        try:
+            await client.chat(MESSAGES, deadline=time.monotonic() + 0.05)
+            assert False, "expected LLMDeadlineExceeded"
+        except LLMDeadlineExceeded:
+            pass
+        assert breaker.failures == 0
+        assert await first == "{}"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # A cancelled probe is handed back, so the next call may probe
+        breaker.opened_at = now[0]
+        now[0] = 31.0
+        stub.latency = 1.0
+        try:
+            await asyncio.wait_for(client.chat(MESSAGES), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.failures == 0
+        stub.latency = 0
+        assert await client.chat(MESSAGES) == "{}"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # A call that timed out on the wire is the endpoint's failure
+        stub.latency = 1.0
+        try:
+            await client.chat(MESSAGES, deadline=time.monotonic() + 0.05)
+        except LLMDeadlineExceeded:
+            pass
+        assert breaker.state == CircuitBreaker.OPEN
+        await client.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+def test_tiered_extraction_over_the_stub():
+    async def run():
+        def reply(request):
+            assert request["response_format"] == {"type": "json_object"}
+            assert "dob" in request["messages"][0]["content"]
+            return json.dumps({"dob": "1990-03-15"})
+
+        stub = LLMStub(latency=0, reply=reply)
+        client = await serve(stub)
+        extractor = TieredExtractor(AzureAIClient(), ChatExtractor(client))
+        extracted = await extractor.extract_information(
+            "the fifteenth day of march, year ninety", ConversationStep.ASK_DOB, tenant="10.0.0.1")
+        assert extracted == {'dob': '1990-03-15'}
+
+        # An endpoint that is down leaves the rule results standing
+        stub.fail_next = [503] * 3
+        assert await extractor.extract_information("the ides of march", ConversationStep.ASK_DOB) == {}
+        assert extractor.stats()["llm"]["errors"] == 1
+        assert extractor.stats()["llm_client"]["retries"] == 2
+        await extractor.close()
+        await stub.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_chat_returns_the_reply_over_pooled_connections()
+    test_azure_deployments_use_their_path_and_key_header()
+    test_global_and_per_tenant_limits()
+    test_retryable_failures_are_retried()
+    test_bad_requests_are_not_retried_and_do_not_trip_the_breaker()
+    test_calls_stop_at_the_deadline()
+    test_breaker_opens_fails_fast_and_recovers_after_a_probe()
+    test_callers_giving_up_do_not_trip_the_breaker()
+    test_tiered_extraction_over_the_stub()
+    print("✅ All LLM client tests passed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-session read-through cache
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.core.read_through_cache import ReadThroughCache
+from app.core.verification_engine import VerificationEngine
+from app.database.connection import ConnectionPool, PooledCustomerStore
+from app.database.standin import StandInDatabase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        database = StandInDatabase(latency=0.02)
+        engine = VerificationEngine(customer_db=PooledCustomerStore(ConnectionPool(database.connect)))
+        checks = [engine.verify_dob("John Smith", "1990-01-15") for _ in range(50)]
+        assert all(await asyncio.gather(*checks))
+        assert await engine.verify_ssn("john  SMITH", "1234")
+
+        stats = engine.customer_records.stats()
+        assert database.counters["statements_executed"] == 1
+        assert stats["loads"] == 1 and stats["coalesced"] == 49 and stats["hits"] == 1
+        await engine.close()
+
+    asyncio.run(run())
+
+
+def test_ttl_lru_and_failed_loads():
+    async def run():
+        clock = FakeClock()
+        calls = []
+
+        async def load(key):
+            calls.append(key)
+            if key == "broken":
+                raise ConnectionError("database unavailable")
+            return None if key == "unknown" else key.upper()
+
+        cache = ReadThroughCache(load, ttl=60, negative_ttl=5, max_entries=2, clock=clock)
+        assert await cache.get("a") == "A" and await cache.get("a") == "A"
+        assert await cache.get("unknown") is None
+        clock.now = 10  # The negative entry is gone, "a" is still fresh
+        assert await cache.get("a") == "A" and await cache.get("unknown") is None
+        assert await cache.get("b") == "B"  # Third key evicts the least recently used
+        assert len(cache) == 2
+
+        for _ in range(2):
+            try:
+                await cache.get("broken")
+            except ConnectionError:
+                pass
+        clock.now = 100
+        assert await cache.get("b") == "B"
+
+        assert calls == ["a", "unknown", "unknown", "b", "broken", "broken", "b"]
+        stats = cache.stats()
+        assert (stats["evictions"], stats["expirations"], stats["load_errors"]) == (1, 2, 2)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_concurrent_misses_share_one_load()
+    test_ttl_lru_and_failed_loads()
+    print("✅ All read-through cache tests passed!")
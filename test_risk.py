@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental and batch risk scoring
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationState, ConversationStep
+from app.core import risk
+from app.core.conversation_manager import ConversationManager
+from app.core.verification_engine import VerificationEngine
+from app.core.sms_outbox import FakeSmsGateway
+
+
+def weighted_sum(signals):
+    return sum(signal.weight * signals.get(signal.name, 0.0) for signal in risk.SIGNALS)
+
+
+def test_running_score_tracks_signals_as_they_change():
+    state = ConversationState(session_id="r", current_step=ConversationStep.ASK_DOB)
+    risk.update(state, now=100.0)
+    assert risk.risk_score(state) == 0.0
+
+    state.verification_attempts = 2
+    state.slots_filled["paycheck_type"] = "paper check"
+    risk.update(state, now=101.0)  # Also a rushed reply
+    assert state.risk_signals["failed_attempts"] == 2.0
+    assert state.risk_signals["rushed_turns"] == 1.0
+
+    state.slots_filled["paycheck_type"] = "direct deposit"  # Corrected: the signal goes away again
+    risk.record(state, "invalid_cards")
+    risk.update(state, now=200.0)
+    assert state.risk_signals["paper_check"] == 0.0
+    assert abs(state.risk_signals["score"] - weighted_sum(state.risk_signals)) < 1e-9
+    assert abs(risk.risk_score(state) - (0.30 + 0.05 + 0.15)) < 1e-9
+
+
+def test_verification_result_status():
+    state = ConversationState(session_id="v", current_step=ConversationStep.COMPLETE,
+                              dob_verified=True, ssn_verified=True, email_verified=True,
+                              email_usage_confirmed=True, bank_account_verified=True)
+    risk.update(state, now=0.0)
+    result = risk.verification_result(state)
+    assert result.verification_status == "approved" and result.next_action == "fund_loan"
+    assert result.identity_verified and result.failure_reasons == []
+
+    state.sms_code_refused = True
+    risk.update(state, now=60.0)
+    result = risk.verification_result(state)
+    assert result.risk_score == 0.3 and result.verification_status == "rejected"
+    assert result.failure_reasons == ["SMS verification refused"]
+
+    for _ in range(3):
+        risk.record(state, "email_changes")
+    assert risk.verification_result(state).verification_status == "escalate"
+
+
+def test_batch_scores_match_the_running_scores():
+    records = []
+    for attempts in range(4):
+        state = ConversationState(session_id=f"b{attempts}", current_step=ConversationStep.COMPLETE,
+                                  verification_attempts=attempts, sms_code_refused=attempts == 3)
+        risk.update(state, now=0.0)
+        records.append(dict(state.risk_signals))
+    records.append({})
+
+    scores = risk.score_batch(records)
+    assert scores.tolist() == [min(1.0, record.get("score", 0.0)) for record in records]
+    assert risk.statuses(scores).tolist() == ["approved", "approved", "pending", "escalate", "approved"]
+
+
+def test_conversation_keeps_score_current():
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=FakeSmsGateway()))
+        await manager.start_conversation("risky")
+        await manager.process_message("risky", "skip to vbt")
+        await manager.process_message("risky", "no")  # Code not received yet
+        return await manager.active_conversations.get("risky")
+
+    state = asyncio.run(run())
+    assert state.risk_signals["sms_retries"] == 1.0
+    assert state.risk_signals["rushed_turns"] >= 1.0
+    assert abs(state.risk_signals["score"] - weighted_sum(state.risk_signals)) < 1e-9
+
+
+if __name__ == "__main__":
+    test_running_score_tracks_signals_as_they_change()
+    test_verification_result_status()
+    test_batch_scores_match_the_running_scores()
+    test_conversation_keeps_score_current()
+    print("✅ All risk scoring tests passed!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the timing wheel and scheduled VBT follow-ups
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.scheduler import TimingWheel
+from app.core.conversation_manager import ConversationManager
+from app.core.session_store import SessionConflict
+from app.core.verification_engine import VerificationEngine
+from app.core.sms_outbox import FakeSmsGateway
+
+
+def test_timers_fire_on_their_tick_including_wrap_around():
+    """Driving the wheel by hand: short, multi-round and cancelled timers"""
+    wheel = TimingWheel(tick=1.0, slots=4)
+    fired = []
+    wheel.schedule(2, fired.append, "short")
+    wheel.schedule(9, fired.append, "long")
+    cancelled = wheel.schedule(3, fired.append, "cancelled")
+    assert wheel.cancel(cancelled)
+
+    for tick in range(1, 10):
+        wheel.advance()
+        if tick == 2:
+            assert fired == ["short"]
+    assert fired == ["short", "long"]
+    assert len(wheel) == 0
+
+
+def test_vbt_wait_returns_immediately_and_follows_up_later():
+    """Saying 'no' to the code check does not hold the request open"""
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=FakeSmsGateway()))
+        manager.VBT_WAIT_SECONDS = 0.3
+        await manager.start_conversation("vbt")
+        await manager.process_message("vbt", "skip to vbt")
+
+        # The first save loses a race with another worker: the replayed turn sets one timer, not two
+        put = manager.active_conversations.put
+
+        async def lose_one_race(state, touch=True):
+            manager.active_conversations.put = put
+            raise SessionConflict(state.session_id)
+
+        manager.active_conversations.put = lose_one_race
+        response = await asyncio.wait_for(manager.process_message("vbt", "no"), timeout=0.1)
+        assert response.current_step == ConversationStep.VBT_WAIT_RETRY
+        assert response.auto_follow_up and response.follow_up_delay == 0.3
+        assert len(manager.scheduler) == 1
+        assert await manager.pop_follow_ups("vbt") == []
+
+        await asyncio.sleep(0.6)
+        return await manager.pop_follow_ups("vbt")
+
+    assert len(asyncio.run(run())) == 1
+
+
+if __name__ == "__main__":
+    test_timers_fire_on_their_tick_including_wrap_around()
+    test_vbt_wait_returns_immediately_and_follows_up_later()
+    print("✅ All scheduler tests passed!")
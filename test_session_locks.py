@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Stress tests for per-session message ordering
+"""
+import asyncio
+import os
+import random
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.conversation_manager import ConversationManager
+from app.core.session_locks import SessionLocks
+
+
+def slow_extraction(manager: ConversationManager, seen: list):
+    """Make every AI call yield for a random moment so turns would interleave"""
+    extract = manager.ai_client.extract_scored
+
+    async def jittery(user_message, current_step):
+        seen.append(user_message)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        return await extract(user_message, current_step)
+
+    manager.ai_client.extract_scored = jittery
+
+
+def test_concurrent_messages_apply_in_arrival_order():
+    """A burst of wrong birth dates must count every attempt exactly once"""
+    async def run():
+        manager = ConversationManager()
+        await manager.start_conversation("burst")
+        await manager.process_message("burst", "yes")
+        await manager.process_message("burst", "John Smith")
+
+        seen = []
+        slow_extraction(manager, seen)
+        burst = [f"01/{day:02d}/1901" for day in range(1, 4)] + ["just checking"] * 20
+        responses = await asyncio.gather(*(manager.process_message("burst", text) for text in burst))
+
+        state = await manager.active_conversations.get("burst")
+        assert seen == burst
+        assert state.verification_attempts == state.max_attempts
+        assert state.current_step == ConversationStep.ESCALATION
+        assert state.version == 3 + len(burst)
+        assert responses[0].current_step == ConversationStep.ASK_DOB
+        assert responses[-1].current_step == ConversationStep.ESCALATION
+        assert manager.session_locks.stats()["busy_sessions"] == 0
+
+    asyncio.run(run())
+
+
+def test_other_sessions_are_not_held_up():
+    async def run():
+        locks = SessionLocks()
+        order = []
+
+        async def turn(session_id, hold_for):
+            async with locks.hold(session_id):
+                await asyncio.sleep(hold_for)
+                order.append(session_id)
+
+        await asyncio.gather(turn("slow", 0.05), turn("fast", 0), turn("slow", 0))
+        assert order == ["fast", "slow", "slow"]
+        assert locks.stats() == {"busy_sessions": 0, "waiting_turns": 0, "contended_acquires": 1}
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_concurrent_messages_apply_in_arrival_order()
+    test_other_sessions_are_not_held_up()
+    print("✅ All session lock tests passed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the session stores
+"""
+import asyncio
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationState, ConversationStep
+from app.core.session_store import InMemorySessionStore, RedisSessionStore, SessionConflict, encode_state, decode_state
+from app.core.conversation_manager import ConversationManager
+from app.utils.local_redis import LocalRedis
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def new_state(session_id: str) -> ConversationState:
+    return ConversationState(session_id=session_id, current_step=ConversationStep.GREETING)
+
+
+def test_idle_sessions_expire_and_sweep_stops_at_first_live_one():
+    async def run():
+        clock = FakeClock()
+        store = InMemorySessionStore(idle_ttl=10, clock=clock)
+        for session_id in ("a", "b", "c"):
+            await store.put(new_state(session_id))
+            clock.now += 3
+
+        await store.get("a")  # activity at t=9 moves "a" to the back of the queue
+        clock.now += 8         # "b" idle 14s, "c" idle 11s, "a" idle 8s
+
+        assert store.sweep() == 2
+        assert await store.contains("a") and not await store.contains("b")
+        assert (await store.stats())["expirations"] == 2
+
+    asyncio.run(run())
+
+
+def test_lru_eviction_on_entry_and_byte_caps():
+    async def run():
+        store = InMemorySessionStore(max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            await store.put(new_state(session_id))
+        assert not await store.contains("a") and len(store) == 2
+        assert (await store.stats())["evictions"] == 1
+
+        one_session = len(encode_state(new_state("x")))
+        store = InMemorySessionStore(max_bytes=one_session * 2)
+        for session_id in ("x", "y", "z"):
+            await store.put(new_state(session_id))
+        assert (await store.stats())["bytes_used"] <= one_session * 2
+        assert not await store.contains("x")
+
+    asyncio.run(run())
+
+
+def test_encoding_round_trips_and_skips_defaults():
+    state = new_state("enc")
+    state.customer_name = "Jane Doe"
+    state.version = 7
+    payload = encode_state(state)
+    assert payload.startswith(b"7|") and b"pending_follow_ups" not in payload
+    assert decode_state(payload) == state
+
+
+def test_workers_share_sessions_through_redis_and_reject_stale_writes():
+    """Two managers (think: two uvicorn workers) serving one conversation"""
+    async def run():
+        server = LocalRedis()
+        port = await server.start()
+        url = f"redis://127.0.0.1:{port}/0"
+        first = ConversationManager(RedisSessionStore(url))
+        second = ConversationManager(RedisSessionStore(url))
+        try:
+
+            await first.start_conversation("shared")
+            await first.process_message("shared", "yes")
+            response = await second.process_message("shared", "John Smith")
+            assert response.current_step == ConversationStep.ASK_DOB
+
+            state = await first.active_conversations.get("shared")
+            assert state.customer_name == "John Smith" and state.version == 3
+
+            stale = await second.active_conversations.get("shared")
+            await first.active_conversations.put(state)
+            try:
+                await second.active_conversations.put(stale)
+            except SessionConflict:
+                pass
+            else:
+                raise AssertionError("stale write was accepted")
+            assert (await second.active_conversations.stats())["conflicts"] == 1
+        finally:
+            await first.active_conversations.close()
+            await second.active_conversations.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_idle_sessions_expire_and_sweep_stops_at_first_live_one()
+    test_lru_eviction_on_entry_and_byte_caps()
+    test_encoding_round_trips_and_skips_defaults()
+    test_workers_share_sessions_through_redis_and_reject_stale_writes()
+    print("✅ All session store tests passed!")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Tests for SMS verification codes and the batched SMS outbox
+"""
+import asyncio
+import os
+import re
+import sys
+import time
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.scheduler import TimingWheel
+from app.core.sms_codes import CodeCheck, InMemorySmsCodeStore, RedisSmsCodeStore
+from app.core.sms_outbox import FakeSmsGateway, SmsOutbox
+from app.core.conversation_manager import ConversationManager
+from app.core.session_store import SessionConflict
+from app.core.verification_engine import VerificationEngine
+from app.utils.local_redis import LocalRedis
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_codes_are_hashed_single_use_and_attempt_limited():
+    async def run():
+        store = InMemorySmsCodeStore(max_attempts=2)
+        code = await store.issue("s1")
+        assert len(code) == 6 and code.isdigit()
+        assert len(store._codes["s1"].digest) == 32  # Only the HMAC is kept
+
+        assert await store.check("s1", code) == CodeCheck.OK
+        assert await store.check("s1", code) == CodeCheck.EXPIRED  # Consumed
+
+        code = await store.issue("s2")
+        wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+        assert await store.check("s2", wrong) == CodeCheck.MISMATCH
+        assert await store.check("s2", wrong) == CodeCheck.LOCKED
+        assert await store.check("s2", code) == CodeCheck.EXPIRED  # Burned after too many guesses
+
+        first = await store.issue("s3")
+        second = await store.issue("s3")
+        assert len(store) == 1 and len(store.wheel) == 1  # Reissuing replaces code and timer
+        if first != second:
+            assert await store.check("s3", first) == CodeCheck.MISMATCH
+        assert await store.check("s3", second) == CodeCheck.OK
+
+    asyncio.run(run())
+
+
+def test_codes_expire_on_the_wheel_and_on_lookup():
+    async def run():
+        clock = FakeClock()
+        wheel = TimingWheel(tick=1.0, slots=8)
+        store = InMemorySmsCodeStore(ttl=10.0, wheel=wheel, clock=clock)
+        await store.issue("wheel")
+        for _ in range(10):
+            wheel.advance()
+        assert len(store) == 0 and store.stats()["expired"] == 1
+
+        late = await store.issue("late")
+        clock.now = 11.0  # Wheel not turning (no event loop): the lookup still honours the expiry
+        assert await store.check("late", late) == CodeCheck.EXPIRED
+        assert len(store) == 0 and len(wheel) == 0
+
+    asyncio.run(run())
+
+
+def test_workers_share_codes_through_redis():
+    async def run():
+        server = LocalRedis()
+        port = await server.start()
+        url = f"redis://127.0.0.1:{port}/0"
+        first = RedisSmsCodeStore(url, b"shared", max_attempts=2)
+        second = RedisSmsCodeStore(url, b"shared", max_attempts=2)
+        try:
+            code = await first.issue("s1")
+            stored = await first.redis.get("smscode:s1")
+            assert code.encode() not in stored and stored.endswith(b"|2")  # Only the HMAC is kept
+            assert 0 < await first.redis.ttl("smscode:s1") <= 300
+            assert await second.check("s1", code) == CodeCheck.OK
+            assert await first.check("s1", code) == CodeCheck.EXPIRED  # Consumed on the other worker
+
+            # Wrong guesses count against the code whichever worker takes them
+            code = await first.issue("s2")
+            wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+            assert await first.check("s2", wrong) == CodeCheck.MISMATCH
+            assert await second.check("s2", wrong) == CodeCheck.LOCKED
+            assert await first.check("s2", code) == CodeCheck.EXPIRED
+
+            await second.issue("s3")
+            assert await first.discard("s3") and not await second.discard("s3")
+        finally:
+            await first.close()
+            await second.close()
+            await server.stop()
+
+        try:
+            RedisSmsCodeStore(url, b"")
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    asyncio.run(run())
+
+
+def test_outbox_batches_and_never_blocks_the_sender():
+    async def run():
+        gateway = FakeSmsGateway(latency=0.2)
+        outbox = SmsOutbox(gateway, max_batch=100, flush_interval=0.01)
+        started = time.perf_counter()
+        for i in range(250):
+            assert outbox.send(f"555{i:07d}", "hello")
+        assert time.perf_counter() - started < 0.05
+        await outbox.flush()
+        assert len(gateway.sent) == 250 and gateway.batches == 3
+        assert outbox.stats()["queued_now"] == 0
+
+    asyncio.run(run())
+
+
+def test_outbox_retries_failed_batches_then_drops():
+    async def run():
+        gateway = FakeSmsGateway()
+        outbox = SmsOutbox(gateway, flush_interval=0.0, max_attempts=2, retry_delay=0.0, max_queued=2)
+        gateway.fail_next = 1
+        outbox.send("5550000001", "one")
+        await outbox.flush()
+        assert gateway.messages_to("5550000001") == ["one"]
+
+        gateway.fail_next = 2
+        outbox.send("5550000002", "two")
+        outbox.send("5550000003", "three")
+        assert not outbox.send("5550000004", "four")  # Queue bound
+        await outbox.close()
+        stats = outbox.stats()
+        assert stats["sent"] == 1 and stats["dropped"] == 3 and stats["send_errors"] == 3
+
+    asyncio.run(run())
+
+
+def test_conversation_verifies_the_code_it_sent():
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=FakeSmsGateway()))
+        engine = manager.verification_engine
+        await manager.start_conversation("vbt")
+        await manager.process_message("vbt", "skip to vbt")
+        await manager.process_message("vbt", "yes")  # Received the code
+
+        await engine.sms_outbox.flush()
+        sent = engine.sms_outbox.gateway.sent[-1]
+        code = re.search(r"\b\d{6}\b", sent.body).group()
+        wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+
+        response = await manager.process_message("vbt", f"the code is {wrong}")
+        assert response.current_step == ConversationStep.VBT_CODE_INPUT
+        response = await manager.process_message("vbt", f"the code is {code}")
+        assert response.current_step == ConversationStep.MILITARY_QUESTION
+        assert (await manager.active_conversations.get("vbt")).sms_code_verified
+
+    asyncio.run(run())
+
+
+def conflict_on_next_save(store):
+    """The next save loses a race with another worker once, so the turn is replayed"""
+    put = store.put
+
+    async def flaky(state, touch=True):
+        store.put = put
+        raise SessionConflict(state.session_id)
+
+    store.put = flaky
+
+
+def test_a_replayed_turn_texts_and_guesses_once():
+    async def run():
+        gateway = FakeSmsGateway()
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=gateway))
+        engine = manager.verification_engine
+        await manager.start_conversation("replay")
+        await manager.process_message("replay", "skip to vbt")
+        await manager.process_message("replay", "yes")
+        await engine.sms_outbox.flush()
+        code = re.search(r"\b\d{6}\b", gateway.sent[-1].body).group()
+        wrong = str((int(code) + 1) % 10 ** 6).zfill(6)
+
+        conflict_on_next_save(manager.active_conversations)
+        response = await manager.process_message("replay", f"the code is {wrong}")
+        assert response.current_step == ConversationStep.VBT_CODE_INPUT
+        assert engine.sms_codes.stats()["mismatches"] == 1  # Not guessed again on the replay
+
+        await engine.sms_codes.discard("replay")
+        conflict_on_next_save(manager.active_conversations)
+        response = await manager.process_message("replay", f"the code is {code}")
+        assert "expired" in response.response
+        await engine.sms_outbox.flush()
+        assert len(gateway.sent) == 2 and engine.sms_codes.stats()["issued"] == 2  # One new code, one text
+
+    asyncio.run(run())
+
+
+def test_without_a_gateway_no_code_is_issued_and_the_session_escalates():
+    async def run():
+        os.environ.pop("SMS_GATEWAY", None)
+        manager = ConversationManager()
+        assert not manager.verification_engine.sms_enabled
+        await manager.start_conversation("no-sms")
+        response = await manager.process_message("no-sms", "skip to vbt")
+        assert response.escalate and response.current_step == ConversationStep.ESCALATION
+        state = await manager.active_conversations.get("no-sms")
+        assert "sms_unavailable" in state.escalation_flags and not state.sms_code_sent
+        assert len(manager.verification_engine.sms_codes) == 0
+
+    asyncio.run(run())
+
+
+async def at_contact_check(manager: ConversationManager, session_id: str):
+    """A session whose next "yes" texts the customer a code"""
+    await manager.start_conversation(session_id)
+    state = await manager.active_conversations.get(session_id)
+    state.current_step = ConversationStep.CONTACT_INFO_CHECK
+    state.customer_name = "John Smith"
+    await manager.active_conversations.put(state)
+
+
+def test_a_full_outbox_escalates_instead_of_promising_a_text():
+    async def run():
+        gateway = FakeSmsGateway()
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=gateway))
+        engine = manager.verification_engine
+        outbox = engine.sms_outbox = SmsOutbox(gateway, flush_interval=60.0, max_queued=2)
+        outbox.send("5550000001", "one")
+        outbox.send("5550000002", "two")
+
+        await at_contact_check(manager, "full")
+        response = await manager.process_message("full", "yes")
+        assert response.escalate and response.current_step == ConversationStep.ESCALATION
+        state = await manager.active_conversations.get("full")
+        assert "sms_unavailable" in state.escalation_flags and len(engine.sms_codes) == 0
+
+        # Room when the reply was given, none by the time the turn was saved
+        outbox.max_queued = 3
+        await at_contact_check(manager, "race")
+        outbox.send = lambda to, body, on_dropped=None: False
+        response = await manager.process_message("race", "yes")
+        assert response.current_step == ConversationStep.VBT_CODE_CHECK
+        state = await manager.active_conversations.get("race")
+        assert "sms_unavailable" in state.escalation_flags and not state.sms_code_sent
+        assert len(engine.sms_codes) == 0
+        response = await manager.process_message("race", "yes")  # "Got it"
+        assert response.escalate and response.current_step == ConversationStep.ESCALATION
+
+    asyncio.run(run())
+
+
+def test_a_text_the_gateway_drops_escalates_the_next_turn():
+    async def run():
+        gateway = FakeSmsGateway()
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=gateway))
+        manager.verification_engine.sms_outbox = SmsOutbox(gateway, flush_interval=0.0, max_attempts=2,
+                                                           retry_delay=0.0)
+        gateway.fail_next = 2
+
+        await at_contact_check(manager, "dropped")
+        response = await manager.process_message("dropped", "yes")
+        assert response.current_step == ConversationStep.VBT_CODE_CHECK
+        await manager.verification_engine.sms_outbox.flush()
+        await asyncio.gather(*manager._background_tasks)
+
+        response = await manager.process_message("dropped", "no, nothing yet")
+        assert response.escalate and response.current_step == ConversationStep.ESCALATION
+        assert gateway.sent == []
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_codes_are_hashed_single_use_and_attempt_limited()
+    test_codes_expire_on_the_wheel_and_on_lookup()
+    test_workers_share_codes_through_redis()
+    test_outbox_batches_and_never_blocks_the_sender()
+    test_outbox_retries_failed_batches_then_drops()
+    test_conversation_verifies_the_code_it_sent()
+    test_a_replayed_turn_texts_and_guesses_once()
+    test_without_a_gateway_no_code_is_issued_and_the_session_escalates()
+    test_a_full_outbox_escalates_instead_of_promising_a_text()
+    test_a_text_the_gateway_drops_escalates_the_next_turn()
+    print("✅ All SMS tests passed!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-driven conversation flow
+"""
+import asyncio
+import os
+import re
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.state_machine import FLOW, StateMachine, Transition
+from app.core.conversation_manager import ConversationManager
+from app.core.verification_engine import VerificationEngine
+from app.core.sms_outbox import FakeSmsGateway
+
+
+# Stands for the code the customer reads off their phone
+SMS_CODE = object()
+
+
+async def sent_code(manager) -> str:
+    """The code in the last text the (fake) SMS gateway received"""
+    outbox = manager.verification_engine.sms_outbox
+    await outbox.flush()
+    return re.search(r"\b\d{6}\b", outbox.gateway.sent[-1].body).group()
+
+
+def test_every_step_has_a_handler():
+    """The shipped table compiles against ConversationManager"""
+    manager = ConversationManager()
+    graph = manager.state_machine.graph()
+    assert set(graph) == {step.value for step in ConversationStep}
+    assert graph["ask_dob"]["next"] == ["ask_ssn", "escalation"]
+
+
+def test_broken_table_is_rejected_at_load_time():
+    """Missing handlers and unknown targets fail before any message is processed"""
+    broken = dict(FLOW)
+    broken[ConversationStep.ASK_NAME] = Transition("_hangle_name_response", (ConversationStep.ASK_DOB,))
+    del broken[ConversationStep.COMPLETE]
+
+    try:
+        StateMachine(ConversationManager(), broken)
+    except ValueError as e:
+        assert "_hangle_name_response" in str(e)
+        assert "'complete'" in str(e)
+    else:
+        raise AssertionError("invalid flow was accepted")
+
+
+def test_full_application_reaches_complete():
+    """A happy-path application walks every handler from greeting to complete"""
+    messages = [
+        "yes", "John Smith", "01/15/1990", "1234", "yes", "yes", "yes", "yes", SMS_CODE, "no",
+        "account 1234567890 routing 123456789", "1234567890", "checking", "yes", "direct deposit",
+        "4111111111111111 JOHN SMITH 04/27 123", "4111111111111111 JOHN SMITH 04/27 123",
+    ]
+
+    async def run():
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=FakeSmsGateway()))
+        await manager.start_conversation("flow")
+        for message in messages:
+            if message is SMS_CODE:
+                message = await sent_code(manager)
+            response = await manager.process_message("flow", message)
+        return response
+
+    assert asyncio.run(run()).current_step == ConversationStep.COMPLETE
+
+
+if __name__ == "__main__":
+    test_every_step_has_a_handler()
+    test_broken_table_is_rejected_at_load_time()
+    test_full_application_reaches_complete()
+    print("✅ All state machine tests passed!")
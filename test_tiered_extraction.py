@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests for tiered extraction: rules first, the LLM only for missed or doubtful slots
+"""
+import asyncio
+import os
+import re
+import sys
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.core.azure_ai_client import AzureAIClient
+from app.core.conversation_manager import ConversationManager
+from app.core.extraction import LLMExtractor, TieredExtractor, accept, create_llm_extractor
+from app.core.sms_outbox import FakeSmsGateway
+from app.core.verification_engine import VerificationEngine
+
+
+class FakeLLM(LLMExtractor):
+    def __init__(self, answers=None, delay: float = 0.0, error: Exception = None):
+        self.answers = answers or {}
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def extract(self, message, slots, deadline=None, tenant=None):
+        self.calls.append((message, tuple(slots)))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {slot: value for slot, value in self.answers.items() if slot in slots}
+
+
+def test_rule_hits_never_reach_the_llm():
+    async def run():
+        llm = FakeLLM({'full_name': 'Someone Else'})
+        extractor = TieredExtractor(AzureAIClient(), llm)
+        assert await extractor.extract_information("My name is John Smith", ConversationStep.ASK_NAME) == {
+            'full_name': 'John Smith'}
+        assert await extractor.extract_information("01/15/1990", ConversationStep.ASK_DOB) == {'dob': '1990-01-15'}
+        await extractor.extract_information("yes", ConversationStep.GREETING)  # Nothing needed
+        assert llm.calls == []
+        stats = extractor.stats()
+        assert stats["rules"]["calls"] == 3 and stats["rules"]["lookups"] == 2
+        assert stats["rules"]["hit_ratio"] == 1.0 and stats["llm_ratio"] == 0.0
+
+    asyncio.run(run())
+
+
+def test_misses_ask_only_for_the_missing_slots():
+    async def run():
+        llm = FakeLLM({'dob': '1990-03-15', 'card_name': 'jane  doe', 'card_number': '4111111111111111'})
+        extractor = TieredExtractor(AzureAIClient(), llm)
+
+        extracted = await extractor.extract_information("the fifteenth day of march, year ninety",
+                                                        ConversationStep.ASK_DOB)
+        assert extracted == {'dob': '1990-03-15'}
+
+        # Card number, expiry and CVV are rule hits; the name guess ("CARD JANE DOE", 0.5) goes to the LLM
+        extracted = await extractor.extract_information("card 4111111111111111 04/27 123 JANE DOE",
+                                                        ConversationStep.DEBIT_CARD_COLLECTION)
+        assert extracted['card_name'] == 'JANE DOE' and extracted['card_number'] == '4111111111111111'
+        assert [slots for _, slots in llm.calls] == [('dob',), ('card_name',)]
+
+        stats = extractor.stats()
+        assert stats["llm"]["calls"] == 2 and stats["llm"]["hit_ratio"] == 1.0
+        assert stats["rules"]["hit_ratio"] == 0.0 and stats["llm_ratio"] == 1.0
+
+    asyncio.run(run())
+
+
+def test_answers_and_replies_without_the_slot_skip_the_llm():
+    async def run():
+        llm = FakeLLM({'email': 'jane@example.com', 'full_name': 'Jane Doe', 'dob': '1990-03-15'})
+        extractor = TieredExtractor(AzureAIClient(), llm)
+        for message, step in (("yes that is correct", ConversationStep.ASK_EMAIL),
+                              ("no", ConversationStep.ASK_EMAIL),
+                              ("sure", ConversationStep.ASK_NAME),
+                              ("I refuse", ConversationStep.ASK_DOB),
+                              ("I'll have to look it up", ConversationStep.ASK_DOB)):
+            assert await extractor.extract_information(message, step) == {}, message
+        assert llm.calls == []
+
+        # A whole name on the card is a rule hit; only a guess out of a longer line is asked about
+        extracted = await extractor.extract_information("4111111111111111 JOHN SMITH 04/27 123",
+                                                        ConversationStep.DEBIT_CARD_COLLECTION)
+        assert extracted['card_name'] == 'JOHN SMITH' and llm.calls == []
+
+        assert await extractor.extract_information("jane at example dot com", ConversationStep.ASK_EMAIL) == {
+            'email': 'jane@example.com'}
+        assert [slots for _, slots in llm.calls] == [('email',)]
+
+    asyncio.run(run())
+
+
+def test_happy_path_conversation_needs_no_llm():
+    async def run():
+        gateway = FakeSmsGateway()
+        manager = ConversationManager(verification_engine=VerificationEngine(sms_gateway=gateway))
+        llm = manager.extractor.llm = FakeLLM()
+        await manager.start_conversation("happy")
+        for message in ("yes, I have time", "My name is John Smith", "01/15/1990", "1234", "yes that is correct",
+                        "yes I check it regularly", "yes", "yes", None, "no",
+                        "account 1234567890 routing 123456789", "1234567890", "checking", "yes", "direct deposit",
+                        "4111111111111111 JOHN SMITH 04/27 123", "4111111111111111 JOHN SMITH 04/27 123"):
+            if message is None:  # The code that was texted
+                await manager.verification_engine.sms_outbox.flush()
+                message = re.search(r"\b\d{6}\b", gateway.sent[-1].body).group()
+            response = await manager.process_message("happy", message)
+        return response, manager, llm
+
+    response, manager, llm = asyncio.run(run())
+    assert response.current_step == ConversationStep.COMPLETE
+    assert llm.calls == []
+    assert manager.extractor.stats()["llm_ratio"] == 0.0
+
+
+def test_llm_answers_are_checked():
+    message = "my ssn ends in twelve thirty four"
+    assert accept('ssn_last4', '1234', message) is None  # Digits the customer never typed
+    assert accept('ssn_last4', '1234', "it's 1234") == '1234'
+    assert accept('ssn_last4', '12345', "12345") is None
+    assert accept('dob', '2990-01-01', "") is None
+    assert accept('dob', '1990-02-30', "") is None
+    assert accept('full_name', ' jane   doe ', "") == 'Jane Doe'
+    assert accept('email', 'Jane@Example.com', "") == 'jane@example.com'
+    assert accept('card_expiry', '13/27', "") is None
+    # Digits must be a whole run the customer typed, not a splice across runs
+    assert accept('bank_account', '2112345678', 'routing 021000021 account 12345678') is None
+    assert accept('card_cvv', '111', '4111111111111111') is None
+    assert accept('card_cvv', '123', '4111111111111111 cvv 123') == '123'
+    # Expiry and date of birth must be written in the message, not just parse
+    assert accept('card_expiry', '04/27', "expires 4/2027") == '04/27'
+    assert accept('card_expiry', '04/27', "expires soon") is None
+    assert accept('dob', '1990-03-15', "the fifteenth of march, ninety") == '1990-03-15'
+    assert accept('dob', '1990-03-15', "the ides of march") is None
+    assert accept('bank_routing', None, "") is None
+    assert accept('unknown_slot', 'x', "") is None
+
+
+def test_private_digits_never_reach_the_llm():
+    async def run():
+        llm = FakeLLM({'card_name': 'John Smith'})
+        extractor = TieredExtractor(AzureAIClient(), llm)
+        extracted = await extractor.extract_information("4111111111111111 12/27 cvv 123 John Smith",
+                                                        ConversationStep.DEBIT_CARD_COLLECTION)
+        assert extracted['card_number'] == '4111111111111111' and extracted['card_cvv'] == '123'
+        # Bank details are the rules' alone: a low-confidence guess never goes to the LLM
+        await extractor.extract_information("12345678 021000021", ConversationStep.BANK_ACCOUNT_INFO)
+        await extractor.extract_information("born in march, 4111111111111111", ConversationStep.ASK_DOB)
+
+        assert [slots for _, slots in llm.calls] == [('card_name',), ('dob',)]
+        for message, _ in llm.calls:
+            for secret in ('4111', '1111111111', '12/27', '123'):
+                assert secret not in message, message
+
+    asyncio.run(run())
+
+
+def test_llm_failures_fall_back_to_the_rules():
+    async def run():
+        slow = TieredExtractor(AzureAIClient(), FakeLLM({'dob': '1990-03-15'}, delay=1.0), llm_timeout=0.05)
+        assert await slow.extract_information("the ides of march", ConversationStep.ASK_DOB) == {}
+        broken = TieredExtractor(AzureAIClient(), FakeLLM(error=ConnectionError("down")))
+        # The rule tier's low-confidence name guess is kept when the LLM cannot help
+        extracted = await broken.extract_information("card 4111111111111111 04/27 123 JANE DOE",
+                                                     ConversationStep.DEBIT_CARD_COLLECTION)
+        assert extracted['card_name'] == 'CARD JANE DOE'
+        for extractor in (slow, broken):
+            assert extractor.stats()["llm"]["errors"] == 1
+            assert extractor.stats()["llm"]["hits"] == 0
+
+    asyncio.run(run())
+
+
+def test_llm_tier_is_off_without_configuration():
+    for name in ("LLM_BASE_URL", "AZURE_OPENAI_ENDPOINT", "AZURE_OPENAI_API_KEY"):
+        os.environ.pop(name, None)
+    assert create_llm_extractor() is None
+    assert ConversationManager().extractor.stats()["llm_enabled"] is False
+
+
+def test_conversation_uses_the_llm_tier():
+    async def run():
+        manager = ConversationManager()
+        manager.extractor.llm = FakeLLM({'dob': '1990-01-15'})
+        await manager.start_conversation("tiered")
+        state = await manager.active_conversations.get("tiered")
+        state.current_step = ConversationStep.ASK_DOB
+        state.customer_name = "John Smith"
+        state.slots_filled['full_name'] = "John Smith"
+        await manager.active_conversations.put(state)
+        response = await manager.process_message("tiered", "fifteenth of jan, year nineteen ninety")
+        return response, manager
+
+    response, manager = asyncio.run(run())
+    assert response.current_step == ConversationStep.ASK_SSN
+    assert manager.extractor.stats()["llm"]["hits"] == 1
+
+
+if __name__ == "__main__":
+    test_rule_hits_never_reach_the_llm()
+    test_misses_ask_only_for_the_missing_slots()
+    test_answers_and_replies_without_the_slot_skip_the_llm()
+    test_happy_path_conversation_needs_no_llm()
+    test_llm_answers_are_checked()
+    test_private_digits_never_reach_the_llm()
+    test_llm_failures_fall_back_to_the_rules()
+    test_llm_tier_is_off_without_configuration()
+    test_conversation_uses_the_llm_tier()
+    print("✅ All tiered extraction tests passed!")
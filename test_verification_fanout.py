@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Tests for running a turn's independent verifications concurrently
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add the backend directory to Python path
+backend_path = os.path.join(os.path.dirname(__file__), 'backend')
+sys.path.insert(0, backend_path)
+
+from app.models.schemas import ConversationStep
+from app.database.connection import PoolTimeout
+from app.core.attempt_limiter import InMemoryAttemptLimiter
+from app.core.conversation_manager import ConversationManager
+from app.core.turn_context import TurnContext
+
+
+def slow_verifications(manager: ConversationManager, delay: float) -> list:
+    """Make DOB and SSN lookups take ``delay`` seconds each; returns the call log"""
+    engine = manager.verification_engine
+    calls = []
+
+    def slowed(name):
+        verify = getattr(engine, name)
+
+        async def wrapper(*args):
+            calls.append(name)
+            await asyncio.sleep(delay)
+            return await verify(*args)
+        return wrapper
+
+    engine.verify_dob = slowed("verify_dob")
+    engine.verify_ssn = slowed("verify_ssn")
+    return calls
+
+
+async def at_dob_step(manager: ConversationManager, session_id: str):
+    await manager.start_conversation(session_id)
+    await manager.process_message(session_id, "yes")
+    await manager.process_message(session_id, "John Smith")
+
+
+def test_dob_and_ssn_in_one_message_wait_for_the_slowest_lookup_only():
+    async def run():
+        manager = ConversationManager()
+        calls = slow_verifications(manager, 0.2)
+        await at_dob_step(manager, "both")
+
+        started = time.perf_counter()
+        response = await manager.process_message("both", "01/15/1990 and my ssn ends in 1234")
+        elapsed = time.perf_counter() - started
+
+        assert response.current_step == ConversationStep.ASK_EMAIL
+        assert sorted(calls) == ["verify_dob", "verify_ssn"]  # Handlers reused the fan-out results
+        assert elapsed < 0.35, elapsed
+        state = await manager.active_conversations.get("both")
+        assert state.dob_verified and state.ssn_verified
+
+    asyncio.run(run())
+
+
+def test_missed_deadline_leaves_the_step_unchanged():
+    async def run():
+        manager = ConversationManager()
+        manager.VERIFY_DEADLINE = 0.05
+        slow_verifications(manager, 0.2)
+        await at_dob_step(manager, "late")
+
+        response = await manager.process_message("late", "01/15/1990 and my ssn ends in 1234")
+        assert response.current_step == ConversationStep.ASK_DOB
+        state = await manager.active_conversations.get("late")
+        assert not state.dob_verified and not state.ssn_verified
+
+    asyncio.run(run())
+
+
+def test_name_dob_and_ssn_in_one_message_check_dob_and_ssn_together():
+    async def run():
+        manager = ConversationManager()
+        engine = manager.verification_engine
+        events = []
+
+        def logged(name):
+            verify = getattr(engine, name)
+
+            async def wrapper(*args):
+                events.append(("start", name))
+                await asyncio.sleep(0.05)
+                events.append(("end", name))
+                return await verify(*args)
+            return wrapper
+
+        engine.verify_dob = logged("verify_dob")
+        engine.verify_ssn = logged("verify_ssn")
+        await manager.start_conversation("all")
+        await manager.process_message("all", "yes")
+        response = await manager.process_message("all", "John Smith, born 01/15/1990, SSN ends 1234")
+        assert response.current_step == ConversationStep.ASK_EMAIL
+        assert [event for event, _ in events] == ["start", "start", "end", "end"], events
+
+    asyncio.run(run())
+
+
+def test_only_steps_on_the_fast_forward_path_are_checked_ahead():
+    async def run():
+        manager = ConversationManager()
+        await at_dob_step(manager, "ahead")
+        state = await manager.active_conversations.get("ahead")
+        turn = TurnContext(manager.ai_client, "")
+        extracted = {'dob': '1990-01-15', 'ssn_last4': '1234',
+                     'bank_account': '12345678', 'bank_routing': '021000021'}
+        assert [key[0] for key in manager._pending_verifications(state, turn, extracted)] == ['dob', 'ssn']
+        state.current_step = ConversationStep.ASK_NAME
+        assert [key[0] for key in manager._pending_verifications(state, turn, extracted)] == ['dob', 'ssn']
+        # No date of birth: the turn stops at ASK_DOB, so the SSN would not be read this turn
+        del extracted['dob']
+        assert manager._pending_verifications(state, turn, extracted) == {}
+        state.current_step = ConversationStep.ASK_EMAIL
+        assert manager._pending_verifications(state, turn, extracted) == {}
+
+    asyncio.run(run())
+
+
+def test_checks_no_step_acted_on_cost_no_attempts():
+    async def run():
+        limiter = InMemoryAttemptLimiter()
+        manager = ConversationManager(attempt_limiter=limiter)
+        calls = slow_verifications(manager, 0)
+        await at_dob_step(manager, "guess")
+
+        # Both wrong: the DOB step fails and stays put, the SSN result is never used
+        response = await manager.process_message("guess", "01/01/1980 and my ssn ends in 9999")
+        assert response.current_step == ConversationStep.ASK_DOB
+        assert sorted(calls) == ["verify_dob", "verify_ssn"]
+        assert (await limiter.stats())["failures"] == 1
+
+    asyncio.run(run())
+
+
+def test_lookup_failures_ask_again_instead_of_crashing():
+    async def run():
+        manager = ConversationManager()
+        engine = manager.verification_engine
+        verify_ssn = engine.verify_ssn
+        failures = [PoolTimeout("no connection free")]
+
+        async def flaky_ssn(*args):
+            if failures:
+                raise failures.pop()
+            return await verify_ssn(*args)
+
+        engine.verify_ssn = flaky_ssn
+        await at_dob_step(manager, "flaky")
+        response = await manager.process_message("flaky", "01/15/1990 and my ssn ends in 1234")
+        assert response.current_step == ConversationStep.ASK_DOB and "trouble" in response.response
+        response = await manager.process_message("flaky", "01/15/1990 and my ssn ends in 1234")
+        assert response.current_step == ConversationStep.ASK_EMAIL
+
+        # A single check, with the attempt limiter's store down
+        async def unreachable(keys):
+            raise ConnectionError("attempt store unreachable")
+
+        limiter_check, manager.attempt_limiter.check = manager.attempt_limiter.check, unreachable
+        await at_dob_step(manager, "down")
+        response = await manager.process_message("down", "01/15/1990")
+        assert response.current_step == ConversationStep.ASK_DOB and "trouble" in response.response
+        manager.attempt_limiter.check = limiter_check
+        assert (await manager.process_message("down", "01/15/1990")).current_step == ConversationStep.ASK_SSN
+
+    asyncio.run(run())
+
+
+def test_failed_checks_are_forgotten_for_the_replay():
+    async def run():
+        turn = TurnContext(None, "")
+        calls = []
+
+        def check(result):
+            async def run_check():
+                calls.append(result)
+                if isinstance(result, Exception):
+                    raise result
+                return result
+            return run_check
+
+        try:
+            await turn.verify_all({"a": check(True), "b": check(ConnectionError("down"))}, 1.0)
+            assert False, "expected ConnectionError"
+        except ConnectionError:
+            pass
+        await turn.verify_all({"a": check(True), "b": check(False)}, 1.0)
+        assert await turn.verify("b", check(True)) is False  # The replay's result, not the error
+        assert calls.count(True) == 2
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_dob_and_ssn_in_one_message_wait_for_the_slowest_lookup_only()
+    test_missed_deadline_leaves_the_step_unchanged()
+    test_name_dob_and_ssn_in_one_message_check_dob_and_ssn_together()
+    test_only_steps_on_the_fast_forward_path_are_checked_ahead()
+    test_checks_no_step_acted_on_cost_no_attempts()
+    test_lookup_failures_ask_again_instead_of_crashing()
+    test_failed_checks_are_forgotten_for_the_replay()
+    print("✅ All verification fan-out tests passed!")